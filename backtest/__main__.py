@@ -0,0 +1,45 @@
+# backtest/__main__.py
+
+import argparse
+from pathlib import Path
+
+from backtest.engine import BacktestEngine
+from backtest.history import HISTORY_DIR, history_store, stored_symbols
+from config.settings import SETTINGS
+from core.signal_engine import SignalEngine
+
+
+def main():
+    bt_cfg = SETTINGS.get('backtest', {})
+    parser = argparse.ArgumentParser(description="Backtest the configured strategy on stored candle history")
+    parser.add_argument('--timeframe', default=bt_cfg.get('timeframe', SETTINGS['trading']['timeframes'][0]))
+    parser.add_argument('--symbol', nargs='+', help="Symbols to test (default: everything in the history store)")
+    parser.add_argument('--history-dir', default=bt_cfg.get('history_dir', HISTORY_DIR),
+                        help="Uncapped candle history, filled by `python -m backtest.history`")
+    parser.add_argument('--out', default=bt_cfg.get('output_dir', 'data/storage/backtest'))
+    args = parser.parse_args()
+
+    store = history_store(args.history_dir, read_only=True)
+    if args.symbol:
+        symbols = [s if s.endswith('/USDT') else s + '/USDT' for s in args.symbol]
+    else:
+        symbols = stored_symbols(store, args.timeframe)
+
+    data = {symbol: store.load(symbol, args.timeframe) for symbol in symbols}
+    engine = BacktestEngine(
+        signal_engine=SignalEngine(strategy_name=SETTINGS['trading']['strategy']),
+        capital=SETTINGS['trading']['capital_usd'],
+        fee_rate=bt_cfg.get('fee_rate', 0.0)
+    )
+    result = engine.run(data)
+
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    result.trades_frame().to_csv(out / f"trades_{args.timeframe}.csv", index=False)
+    result.equity_curve().to_csv(out / f"equity_{args.timeframe}.csv")
+    for key, value in result.summary().items():
+        print(f"{key}: {value}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+# backtest/engine.py
+
+import numpy as np
+import pandas as pd
+
+from core.risk_management import calculate_position_size, calculate_tp_sl
+from core.signal_engine import SIGNAL_LABELS, SignalEngine
+from strategies.rules import OHLCV_FIELDS, RuleSet
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Exit search starts with this many bars and doubles until TP/SL is found
+EXIT_SEARCH_CHUNK = 256
+
+
+class Trade:
+    __slots__ = ('symbol', 'side', 'entry_time', 'entry_price', 'tp', 'sl', 'qty',
+                 'exit_time', 'exit_price', 'exit_reason', 'pnl')
+
+    def __init__(self, symbol, side, entry_time, entry_price, tp, sl, qty,
+                 exit_time=None, exit_price=None, exit_reason=None, pnl=0.0):
+        self.symbol = symbol
+        self.side = side
+        self.entry_time = entry_time
+        self.entry_price = entry_price
+        self.tp = tp
+        self.sl = sl
+        self.qty = qty
+        self.exit_time = exit_time
+        self.exit_price = exit_price
+        self.exit_reason = exit_reason
+        self.pnl = pnl
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class BacktestResult:
+    def __init__(self, trades: list, capital: float):
+        self.trades = sorted(trades, key=lambda t: t.exit_time)
+        self.capital = capital
+
+    def trades_frame(self) -> pd.DataFrame:
+        df = pd.DataFrame([t.to_dict() for t in self.trades], columns=list(Trade.__slots__))
+        for col in ('entry_time', 'exit_time'):
+            df[col] = pd.to_datetime(df[col], unit='ms')
+        return df
+
+    def equity_curve(self) -> pd.Series:
+        """
+        Account equity after each closed trade, indexed by exit time.
+        """
+        pnl = np.array([t.pnl for t in self.trades], dtype=np.float64)
+        index = pd.to_datetime([t.exit_time for t in self.trades], unit='ms')
+        return pd.Series(self.capital + np.cumsum(pnl), index=index, name='equity')
+
+    def summary(self) -> dict:
+        equity = self.equity_curve()
+        pnl = np.array([t.pnl for t in self.trades], dtype=np.float64)
+        peak = np.maximum.accumulate(np.concatenate([[self.capital], equity.to_numpy()]))
+        drawdown = (peak - np.concatenate([[self.capital], equity.to_numpy()])) / peak
+        return {
+            'trades': len(pnl),
+            'wins': int((pnl > 0).sum()),
+            'losses': int((pnl <= 0).sum()),
+            'win_rate': float((pnl > 0).mean()) if len(pnl) else 0.0,
+            'total_pnl': float(pnl.sum()),
+            'final_equity': float(self.capital + pnl.sum()),
+            'max_drawdown': float(drawdown.max()),
+        }
+
+
+class BacktestEngine:
+    """
+    Replays stored OHLCV candles through the live strategy and risk rules.
+
+    Signals for the whole history are computed in one vectorized pass
+    (SignalEngine.indicator_panels + strategy.evaluate_panel). Entries are taken
+    at the signal bar's close with TP/SL from `calculate_tp_sl` and size from
+    `calculate_position_size`, using the same 10-bar high/low range as the live
+    scan for volatility. Exits are found by scanning forward over bar highs/lows
+    with NumPy; if TP and SL are both touched in one bar, the SL is assumed hit.
+    One position per symbol at a time; SELL signals are simulated as shorts.
+    """
+
+    def __init__(self, signal_engine: SignalEngine = None, capital: float = 425.0, fee_rate: float = 0.0,
+                 volatility_window: int = 10, tp_sl_multiplier: float = 0.5):
+        self.signal_engine = signal_engine or SignalEngine()
+        self.capital = capital
+        self.fee_rate = fee_rate
+        self.volatility_window = volatility_window
+        self.tp_sl_multiplier = tp_sl_multiplier
+
+    def signals(self, candles: np.ndarray) -> np.ndarray:
+        """
+        Signal at every bar: 1 for BUY, -1 for SELL, 0 for none.
+        """
+        closes = candles[:, 4][None, :]
+        strategy = self.signal_engine.strategy
+        if isinstance(strategy, RuleSet):
+            fields = {name: candles[:, i][None, :] for i, name in enumerate(OHLCV_FIELDS, start=1)}
+            return strategy.evaluate(fields, full=True)[0][0]
+        panels = self.signal_engine.indicator_panels(closes)
+        return self.signal_engine.strategy.evaluate_panel(
+            panels['rsi'][0], panels['macd_diff'][0], closes[0], panels['ema_50'][0]
+        )
+
+    def _volatility(self, candles: np.ndarray) -> np.ndarray:
+        window = self.volatility_window
+        high = pd.Series(candles[:, 2]).rolling(window, min_periods=1).max().to_numpy()
+        low = pd.Series(candles[:, 3]).rolling(window, min_periods=1).min().to_numpy()
+        return high - low
+
+    @staticmethod
+    def _find_exit(high, low, start, side, tp, sl):
+        """
+        First bar index >= start where TP or SL is touched, with the exit price and reason.
+        """
+        n = len(high)
+        chunk = EXIT_SEARCH_CHUNK
+        while start < n:
+            stop = min(n, start + chunk)
+            h, l = high[start:stop], low[start:stop]
+            if side == 1:
+                hit_sl, hit_tp = l <= sl, h >= tp
+            else:
+                hit_sl, hit_tp = h >= sl, l <= tp
+            hit = hit_sl | hit_tp
+            if hit.any():
+                offset = int(hit.argmax())
+                if hit_sl[offset]:
+                    return start + offset, sl, 'sl'
+                return start + offset, tp, 'tp'
+            start = stop
+            chunk *= 2
+        return None
+
+    def run_symbol(self, symbol: str, candles: np.ndarray, signals: np.ndarray = None) -> list:
+        """
+        Simulate one symbol over an (n, 6) OHLCV array and return its closed trades.
+        """
+        candles = np.asarray(candles, dtype=np.float64)
+        if len(candles) < 2:
+            return []
+        signals = self.signals(candles) if signals is None else signals
+        volatility = self._volatility(candles)
+        timestamps, high, low, close = candles[:, 0], candles[:, 2], candles[:, 3], candles[:, 4]
+
+        trades = []
+        entries = np.flatnonzero(signals)
+        i = 0
+        while i < len(entries):
+            bar = int(entries[i])
+            i += 1
+            side = int(signals[bar])
+            entry = float(close[bar])
+            tp, sl = calculate_tp_sl(entry, float(volatility[bar]), SIGNAL_LABELS[side], self.tp_sl_multiplier)
+            qty = calculate_position_size(self.capital, entry, sl)
+            if qty <= 0:
+                continue
+
+            found = self._find_exit(high, low, bar + 1, side, tp, sl)
+            if found is None:
+                exit_bar, exit_price, reason = len(close) - 1, float(close[-1]), 'end'
+            else:
+                exit_bar, exit_price, reason = found
+
+            fees = self.fee_rate * qty * (entry + exit_price)
+            pnl = side * (exit_price - entry) * qty - fees
+            trades.append(Trade(symbol, SIGNAL_LABELS[side], int(timestamps[bar]), entry, tp, sl, qty,
+                                int(timestamps[exit_bar]), exit_price, reason, pnl))
+            # Signals while the position is open are skipped
+            i = int(np.searchsorted(entries, exit_bar + 1))
+        return trades
+
+    def run(self, data: dict) -> BacktestResult:
+        """
+        Backtest every {symbol: (n, 6) OHLCV array} and combine the trades.
+        """
+        trades = []
+        for symbol, candles in data.items():
+            if candles is None:
+                continue
+            trades.extend(self.run_symbol(symbol, candles))
+        logger.info(f"Backtest finished: {len(trades)} trades over {len(data)} symbols")
+        return BacktestResult(trades, self.capital)
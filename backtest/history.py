@@ -0,0 +1,85 @@
+# backtest/history.py
+
+import argparse
+import time
+
+from data.candle_store import CandleStore
+from data.fetcher import OHLCV_PAGE
+from utils.logger import setup_logger
+from utils.timeframes import timeframe_to_ms
+
+logger = setup_logger(__name__)
+
+# Kept apart from the live candle store, which only holds storage.max_candle_bars per symbol
+HISTORY_DIR = 'data/storage/history'
+
+
+def history_store(base_dir: str = HISTORY_DIR, read_only: bool = False) -> CandleStore:
+    """
+    The uncapped candle store backtests and parameter sweeps read from.
+    """
+    return CandleStore(base_dir, max_bars=None, read_only=read_only)
+
+
+def stored_symbols(store: CandleStore, timeframe: str) -> list:
+    """
+    Symbols with candles in `store` for `timeframe`, skipping half-written .tmp.npy files.
+    """
+    paths = (store.base_path / timeframe).glob('*.npy')
+    return sorted(p.name[:-len('.npy')].replace('-', '/') for p in paths if not p.name.endswith('.tmp.npy'))
+
+
+def sync_history(broker, store: CandleStore, symbol: str, timeframe: str, since_ms: int) -> int:
+    """
+    Page candles into `store` from `since_ms` (or from its last stored candle,
+    when the stored history already reaches back that far) up to now.
+    Returns the number of candles fetched.
+    """
+    stored = store.load(symbol, timeframe)
+    if stored is not None and len(stored) and stored[0, 0] <= since_ms:
+        cursor = int(stored[-1, 0])  # re-request the last stored candle: it may have been forming
+    else:
+        cursor = since_ms  # nothing stored that far back: start the history over from `since_ms`
+    fetched = 0
+    while True:
+        raw = broker.safe_fetch_ohlcv(symbol, timeframe, OHLCV_PAGE, since=cursor)
+        if not raw:
+            break
+        store.merge(symbol, timeframe, raw)
+        fetched += len(raw)
+        if int(raw[-1][0]) <= cursor:
+            break
+        cursor = int(raw[-1][0])
+    return fetched
+
+
+def main():
+    from config.settings import SETTINGS
+    from core.okx_interface import OKXInterface
+
+    bt_cfg = SETTINGS.get('backtest', {})
+    parser = argparse.ArgumentParser(description="Download uncapped candle history for backtests")
+    parser.add_argument('--timeframe', default=bt_cfg.get('timeframe', SETTINGS['trading']['timeframes'][0]))
+    parser.add_argument('--days', type=float, default=bt_cfg.get('history_days', 365))
+    parser.add_argument('--symbol', nargs='+', help="Symbols to download (default: those in the live candle store)")
+    parser.add_argument('--history-dir', default=bt_cfg.get('history_dir', HISTORY_DIR))
+    args = parser.parse_args()
+
+    if args.symbol:
+        symbols = [s if s.endswith('/USDT') else s + '/USDT' for s in args.symbol]
+    else:
+        symbols = stored_symbols(CandleStore('data/storage/candles'), args.timeframe)
+
+    broker = OKXInterface(SETTINGS['api']['okx'], rate_limits=SETTINGS.get('rate_limits'))
+    broker.connect()
+    store = history_store(args.history_dir)
+    since = int((time.time() - args.days * 86400) * 1000) // timeframe_to_ms(args.timeframe) * \
+        timeframe_to_ms(args.timeframe)
+    for symbol in symbols:
+        fetched = sync_history(broker, store, symbol, args.timeframe, since)
+        candles = store.load(symbol, args.timeframe)
+        print(f"{symbol}: {fetched} fetched, {0 if candles is None else len(candles)} stored")
+
+
+if __name__ == '__main__':
+    main()
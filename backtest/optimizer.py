@@ -0,0 +1,286 @@
+# backtest/optimizer.py
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+from backtest.engine import BacktestEngine, BacktestResult
+from backtest.history import HISTORY_DIR, history_store, stored_symbols
+from core.signal_engine import SignalEngine
+from strategies.rsi_macd_strategy import RSIMACDStrategy
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_SPACE = {
+    'rsi_low': [20, 25, 30, 35],
+    'rsi_high': [65, 70, 75, 80],
+    'tp_sl_multiplier': [0.5, 1.0, 1.5, 2.0],
+}
+
+# Per-worker state, filled once by _init_worker so tasks only carry parameters
+_WORKER = {}
+
+
+def grid_params(space: dict) -> list:
+    names = sorted(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+
+def random_params(space: dict, n: int, seed: int = 0) -> list:
+    """
+    Draw `n` distinct combinations; list values are sampled as choices and
+    [low, high] pairs given as {'min': .., 'max': ..} uniformly.
+    """
+    rng = random.Random(seed)
+    seen, params = set(), []
+    for _ in range(n * 20):
+        combo = {}
+        for name in sorted(space):
+            values = space[name]
+            if isinstance(values, dict):
+                combo[name] = round(rng.uniform(values['min'], values['max']), 4)
+            else:
+                combo[name] = rng.choice(values)
+        key = json.dumps(combo, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            params.append(combo)
+        if len(params) == n:
+            break
+    return params
+
+
+def walk_forward_windows(start_ts: int, end_ts: int, folds: int) -> list:
+    """
+    Split [start_ts, end_ts) into `folds + 1` equal slices and return
+    (train_window, test_window) pairs that roll forward one slice at a time.
+    """
+    edges = np.linspace(start_ts, end_ts, folds + 2).astype(np.int64)
+    return [((int(edges[i]), int(edges[i + 1])), (int(edges[i + 1]), int(edges[i + 2]))) for i in range(folds)]
+
+
+def task_key(params: dict, window, context: dict = None) -> str:
+    """
+    Cache key of one evaluation. `context` holds the inputs shared by a whole
+    run (symbols, timeframe, capital, fees, history location and extent), so a
+    cache file reused with different inputs or grown history never returns
+    their results.
+    """
+    payload = json.dumps({'params': params, 'window': window, 'context': context}, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def _init_worker(history_dir: str, symbols: list, timeframe: str, capital: float, fee_rate: float):
+    """
+    Open every symbol's candles memory-mapped (shared through the OS page
+    cache, not copied per worker) and precompute the parameter-independent
+    indicator series once.
+    """
+    store = history_store(history_dir, read_only=True)
+    engine = SignalEngine()
+    data = {}
+    for symbol in symbols:
+        candles = store.load(symbol, timeframe)
+        if candles is None or len(candles) < 2:
+            continue
+        panels = engine.indicator_panels(candles[:, 4][None, :])
+        data[symbol] = (candles, {name: panel[0] for name, panel in panels.items()})
+    _WORKER.update(data=data, capital=capital, fee_rate=fee_rate)
+
+
+def _evaluate(params: dict, window=None) -> dict:
+    strategy = RSIMACDStrategy(rsi_low=params['rsi_low'], rsi_high=params['rsi_high'])
+    engine = BacktestEngine(capital=_WORKER['capital'], fee_rate=_WORKER['fee_rate'],
+                            tp_sl_multiplier=params['tp_sl_multiplier'])
+    trades = []
+    for symbol, (candles, ind) in _WORKER['data'].items():
+        lo, hi = 0, len(candles)
+        if window is not None:
+            lo, hi = np.searchsorted(candles[:, 0], window)
+        if hi - lo < 2:
+            continue
+        close = candles[lo:hi, 4]
+        signals = strategy.evaluate_panel(ind['rsi'][lo:hi], ind['macd_diff'][lo:hi], close, ind['ema_50'][lo:hi])
+        trades.extend(engine.run_symbol(symbol, candles[lo:hi], signals))
+    return BacktestResult(trades, _WORKER['capital']).summary()
+
+
+class ParameterOptimizer:
+    """
+    Grid/random parameter sweeps and walk-forward validation over the stored candle history.
+
+    Work is sharded over a process pool, started once and reused by every
+    evaluate() call (and walk-forward fold) until close(). Every finished
+    evaluation is appended to a JSONL cache so an interrupted sweep resumes
+    where it stopped, as long as the stored history has not changed since.
+    """
+
+    def __init__(self, history_dir: str, symbols: list, timeframe: str, capital: float, fee_rate: float = 0.0,
+                 workers: int = None, cache_path: str = None, objective: str = 'total_pnl'):
+        self.history_dir = history_dir
+        self.symbols = symbols
+        self.timeframe = timeframe
+        self.capital = capital
+        self.fee_rate = fee_rate
+        self.workers = workers or os.cpu_count()
+        self.objective = objective
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.cache = self._load_cache()
+        self.context = {'symbols': sorted(symbols), 'timeframe': timeframe, 'capital': capital,
+                        'fee_rate': fee_rate, 'history_dir': os.path.abspath(history_dir)}
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def history_extent(self) -> dict:
+        """
+        {symbol: [first timestamp, last timestamp, rows]} of the stored history.
+        """
+        store = history_store(self.history_dir, read_only=True)
+        extent = {}
+        for symbol in self.symbols:
+            candles = store.load(symbol, self.timeframe)
+            if candles is not None and len(candles):
+                extent[symbol] = [int(candles[0, 0]), int(candles[-1, 0]), len(candles)]
+        return extent
+
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.history_dir, self.symbols, self.timeframe, self.capital, self.fee_rate)
+            )
+        return self._pool
+
+    def _load_cache(self) -> dict:
+        cache = {}
+        if self.cache_path and self.cache_path.exists():
+            with open(self.cache_path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # partial line from an interrupted run
+                    cache[record['key']] = record
+        return cache
+
+    def _record(self, f, key, params, window, summary):
+        record = {'key': key, 'params': params, 'window': window, 'summary': summary}
+        self.cache[key] = record
+        if f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+        return record
+
+    def evaluate(self, params_list: list, window=None) -> list:
+        """
+        Evaluate every parameter set on `window` (or the full history); returns records in input order.
+        """
+        window = list(window) if window else None
+        if self._pool is None:
+            # Workers load the history once, when the pool starts: key results by what they will see
+            self.context['history'] = self.history_extent()
+        keys = [task_key(p, window, self.context) for p in params_list]
+        pending = {k: p for k, p in zip(keys, params_list) if k not in self.cache}
+        if pending:
+            logger.info(f"Evaluating {len(pending)} parameter sets ({len(keys) - len(pending)} cached)")
+            f = open(self.cache_path, 'a') if self.cache_path else None
+            try:
+                pool = self.pool()
+                futures = {pool.submit(_evaluate, params, window): key for key, params in pending.items()}
+                for future in as_completed(futures):
+                    key = futures[future]
+                    self._record(f, key, pending[key], window, future.result())
+            finally:
+                if f:
+                    f.close()
+        return [self.cache[k] for k in keys]
+
+    def best(self, records: list) -> dict:
+        return max(records, key=lambda r: r['summary'][self.objective])
+
+    def walk_forward(self, params_list: list, folds: int) -> list:
+        """
+        For each fold, pick the best parameters in-sample and score them on the following slice.
+        """
+        store = history_store(self.history_dir, read_only=True)
+        bounds = []
+        for symbol in self.symbols:
+            candles = store.load(symbol, self.timeframe)
+            if candles is not None and len(candles):
+                bounds.append((candles[0, 0], candles[-1, 0] + 1))
+        if not bounds:
+            return []
+        start, end = min(b[0] for b in bounds), max(b[1] for b in bounds)
+
+        report = []
+        for train, test in walk_forward_windows(int(start), int(end), folds):
+            chosen = self.best(self.evaluate(params_list, train))
+            tested = self.evaluate([chosen['params']], test)[0]
+            report.append({
+                'train': train,
+                'test': test,
+                'params': chosen['params'],
+                'in_sample': chosen['summary'],
+                'out_of_sample': tested['summary']
+            })
+        return report
+
+
+def main():
+    from config.settings import SETTINGS
+
+    opt_cfg = SETTINGS.get('optimizer', {})
+    bt_cfg = SETTINGS.get('backtest', {})
+    parser = argparse.ArgumentParser(description="Sweep strategy/risk parameters over stored candle history")
+    parser.add_argument('--mode', choices=['grid', 'random'], default='grid')
+    parser.add_argument('--samples', type=int, default=opt_cfg.get('samples', 200), help="Random mode sample count")
+    parser.add_argument('--walk-forward', type=int, default=0, metavar='FOLDS')
+    parser.add_argument('--workers', type=int, default=opt_cfg.get('workers'))
+    parser.add_argument('--timeframe', default=bt_cfg.get('timeframe', SETTINGS['trading']['timeframes'][0]))
+    parser.add_argument('--symbol', nargs='+')
+    parser.add_argument('--history-dir', default=bt_cfg.get('history_dir', HISTORY_DIR),
+                        help="Uncapped candle history, filled by `python -m backtest.history`")
+    parser.add_argument('--cache', default=opt_cfg.get('cache_file', 'data/storage/backtest/optimizer_cache.jsonl'))
+    args = parser.parse_args()
+
+    if args.symbol:
+        symbols = [s if s.endswith('/USDT') else s + '/USDT' for s in args.symbol]
+    else:
+        symbols = stored_symbols(history_store(args.history_dir, read_only=True), args.timeframe)
+
+    space = opt_cfg.get('space', DEFAULT_SPACE)
+    params = grid_params(space) if args.mode == 'grid' else random_params(space, args.samples)
+    Path(args.cache).parent.mkdir(parents=True, exist_ok=True)
+    with ParameterOptimizer(args.history_dir, symbols, args.timeframe, SETTINGS['trading']['capital_usd'],
+                            fee_rate=bt_cfg.get('fee_rate', 0.0), workers=args.workers, cache_path=args.cache,
+                            objective=opt_cfg.get('objective', 'total_pnl')) as optimizer:
+        if args.walk_forward:
+            for fold in optimizer.walk_forward(params, args.walk_forward):
+                print(json.dumps(fold))
+        else:
+            records = optimizer.evaluate(params)
+            for record in sorted(records, key=lambda r: r['summary'][optimizer.objective], reverse=True)[:10]:
+                print(json.dumps({'params': record['params'], **record['summary']}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+# benchmarks/fake_exchange.py
+
+import itertools
+import random
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from core.broker import Broker
+from utils.timeframes import timeframe_to_ms
+
+
+class FakeExchange:
+    """
+    In-process stand-in for the ccxt exchange object used by Broker.
+
+    Serves deterministic synthetic OHLCV and tickers for `n_symbols` USDT
+    pairs. Prices are a smooth function of the candle timestamp, so repeated
+    and incremental (`since=`) fetches agree with each other. Every call
+    sleeps `latency` plus up to `jitter` seconds to mimic REST round trips.
+    """
+
+    def __init__(self, n_symbols: int = 100, latency: float = 0.0, jitter: float = 0.0, seed: int = 7):
+        self.latency = latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.calls = 0
+        self._order_ids = itertools.count(1)
+
+        self.symbols = [f"SYM{i:04d}/USDT" for i in range(n_symbols)]
+        self.markets = {s: {'symbol': s, 'base': s.split('/')[0], 'quote': 'USDT', 'active': True}
+                        for s in self.symbols}
+        self.currencies = {}
+        # Per-symbol price level and phase, derived from the symbol name so runs are repeatable
+        self._params = {}
+        for s in self.symbols:
+            h = zlib.crc32(s.encode())
+            self._params[s] = (0.1 + (h % 15000) / 100.0, (h >> 8) % 628 / 100.0)
+
+    def _pause(self):
+        self.calls += 1
+        if self.latency or self.jitter:
+            with self.random_lock:
+                extra = self.random.uniform(0, self.jitter)
+            time.sleep(self.latency + extra)
+
+    def _candles(self, symbol: str, timestamps: np.ndarray, step: int) -> list:
+        base, phase = self._params[symbol]
+        t = timestamps / step
+        close = base * np.exp(0.03 * np.sin(t / 37 + phase) + 0.01 * np.sin(t / 5.3 + 2 * phase))
+        open_ = base * np.exp(0.03 * np.sin((t - 1) / 37 + phase) + 0.01 * np.sin((t - 1) / 5.3 + 2 * phase))
+        high = np.maximum(open_, close) * 1.002
+        low = np.minimum(open_, close) * 0.998
+        volume = 1000 + 500 * (1 + np.sin(t / 3 + phase))
+        return np.column_stack([timestamps, open_, high, low, close, volume]).tolist()
+
+    def load_markets(self, reload: bool = False):
+        self._pause()
+        return self.markets
+
+    def set_markets(self, markets, currencies=None):
+        self.markets = markets
+        self.symbols = sorted(markets)
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', since: int = None, limit: int = 100):
+        self._pause()
+        step = timeframe_to_ms(timeframe)
+        end = int(time.time() * 1000) // step * step
+        start = since // step * step if since is not None else end - (limit - 1) * step
+        stop = min(end, start + (limit - 1) * step)
+        if stop < start:
+            return []
+        return self._candles(symbol, np.arange(start, stop + step, step, dtype=np.int64), step)
+
+    def _ticker(self, symbol: str) -> dict:
+        ts = int(time.time() * 1000)
+        _, _, high, low, last, _ = self._candles(symbol, np.array([ts // 60_000 * 60_000]), 60_000)[0]
+        return {'symbol': symbol, 'last': last, 'high': high, 'low': low, 'quoteVolume': 1_000_000.0,
+                'timestamp': ts}
+
+    def fetch_ticker(self, symbol: str) -> dict:
+        self._pause()
+        return self._ticker(symbol)
+
+    def fetch_tickers(self, symbols=None) -> dict:
+        self._pause()
+        return {s: self._ticker(s) for s in (symbols or self.symbols)}
+
+    def fetch_balance(self) -> dict:
+        self._pause()
+        return {'USDT': {'free': 10_000.0, 'used': 0.0, 'total': 10_000.0}}
+
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        self._pause()
+        return {'id': str(next(self._order_ids)), 'symbol': symbol, 'type': type, 'side': side,
+                'amount': amount, 'price': price, 'status': 'closed'}
+
+    def fetch_open_orders(self, symbol=None):
+        self._pause()
+        return []
+
+    def cancel_order(self, order_id, symbol=None):
+        self._pause()
+        return {'id': order_id, 'status': 'canceled'}
+
+
+class FakeBroker(Broker):
+    """
+    Broker backed by FakeExchange; a drop-in for OKXInterface in benchmarks.
+    """
+
+    def __init__(self, n_symbols: int = 100, latency: float = 0.0, jitter: float = 0.0,
+                 ticker_ttl: float = 60.0, scheduler=None):
+        super().__init__(FakeExchange(n_symbols, latency, jitter), ticker_ttl=ticker_ttl, scheduler=scheduler)
+
+    def connect(self, market_cache=None):
+        self.request('markets', self.exchange.load_markets, True)
+
+    def get_balance(self, asset: str) -> float:
+        return self.request('balance', self.exchange.fetch_balance).get(asset, {}).get('free', 0.0)
+
+    def get_price(self, symbol: str) -> float:
+        return self.fetch_ticker(symbol)['last']
+
+    def safe_fetch_ohlcv(self, symbol, timeframe, limit=100, since=None):
+        return self.request('candles', self.exchange.fetch_ohlcv, symbol, timeframe, since=since, limit=limit)
+
+    def place_order(self, symbol: str, side: str, amount: float, price: float = None, type: str = 'market'):
+        return self.request('place_order', self.exchange.create_order, symbol, type, side, amount, price,
+                            coalesce=False)
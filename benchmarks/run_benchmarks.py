@@ -0,0 +1,255 @@
+# benchmarks/run_benchmarks.py
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.fake_exchange import FakeBroker
+from config.settings import SETTINGS
+from core.paper_broker import PaperBroker
+from core.scanner import MarketScanner
+from core.signal_engine import SignalEngine, build_close_panel
+from data.fetcher import DataFetcher
+from data.storage import DataStorage
+
+BASELINE_FILE = Path(__file__).with_name('baselines.json')
+DEFAULT_SCALES = (100, 500, 2000)
+BENCHMARKS = ('scan', 'signal', 'fetcher', 'storage', 'paper')
+
+
+class NullAlerts:
+    """Collects alerts instead of emailing them."""
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, subject, body, attachment_path=None):
+        self.sent.append(subject)
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def make_frames(n_symbols: int, timeframe: str = '1h', bars: int = 100) -> dict:
+    broker = FakeBroker(n_symbols)
+    return {s: DataFetcher._to_frame(broker.safe_fetch_ohlcv(s, timeframe, bars)) for s in broker.exchange.symbols}
+
+
+# === Benchmarks; each returns {name: seconds} ===
+
+def bench_scan(n_symbols: int, latency: float, jitter: float, workdir: Path, repeat: int) -> dict:
+    """
+    A main()-style cycle: bulk ticker filter, then fetch, evaluate and act on every symbol concurrently.
+    """
+    import main
+
+    def run():
+        broker = FakeBroker(n_symbols, latency, jitter)
+        broker.connect()
+        storage = DataStorage(workdir / 'scan')
+        fetcher = DataFetcher(broker)
+        engine = SignalEngine(strategy_name=SETTINGS['trading']['strategy'])
+        alerts = NullAlerts()
+        capital = SETTINGS['trading']['capital_usd']
+        scan_cfg = SETTINGS.get('scanner', {})
+
+        async def cycle():
+            scanner = MarketScanner(max_concurrency=scan_cfg.get('max_concurrency', 16),
+                                    symbol_timeout=scan_cfg.get('symbol_timeout_sec', 30))
+            try:
+                tickers = await scanner.run_blocking(broker.fetch_tickers)
+                symbols = [s for s, t in tickers.items()
+                           if t['quoteVolume'] > SETTINGS['trading']['volume_min_threshold']
+                           and t['last'] < SETTINGS['trading']['price_max_threshold']]
+                await scanner.scan(symbols, lambda symbol: main.analyze_symbol(
+                    symbol, broker, engine, capital, scanner=scanner, fetcher=fetcher, alerts=alerts, storage=storage))
+            finally:
+                scanner.shutdown()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            asyncio.run(cycle())
+
+    return {f'scan@{n_symbols}': best_of(run, repeat)}
+
+
+def bench_signal_engine(n_symbols: int, repeat: int) -> dict:
+    frames = make_frames(n_symbols)
+    engine = SignalEngine()
+    symbols, closes = build_close_panel(frames)
+
+    def incremental():
+        engine.indicator_states = {}
+        for s, df in frames.items():
+            engine.generate_incremental(s, '1h', df)
+
+    return {
+        f'signal_generate@{n_symbols}': best_of(lambda: [engine.generate(df) for df in frames.values()], repeat),
+        f'signal_incremental@{n_symbols}': best_of(incremental, repeat),
+        f'signal_batch@{n_symbols}': best_of(lambda: engine.generate_batch(symbols, closes), repeat),
+    }
+
+
+def bench_fetcher(n_symbols: int, workdir: Path, repeat: int) -> dict:
+    broker = FakeBroker(n_symbols)
+    symbols = broker.exchange.symbols
+
+    def plain():
+        fetcher = DataFetcher(broker)
+        for s in symbols:
+            fetcher.get_symbol_data(s, '1h', 100)
+
+    def cold_store():
+        storage = DataStorage(tempfile.mkdtemp(dir=workdir))
+        fetcher = DataFetcher(broker, storage=storage)
+        for s in symbols:
+            fetcher.get_symbol_data(s, '1h', 100)
+        return fetcher
+
+    warm = cold_store()
+
+    def warm_store():
+        for s in symbols:
+            warm.get_symbol_data(s, '1h', 100)
+
+    return {
+        f'fetcher@{n_symbols}': best_of(plain, repeat),
+        f'fetcher_store_cold@{n_symbols}': best_of(cold_store, repeat),
+        f'fetcher_store_warm@{n_symbols}': best_of(warm_store, repeat),
+    }
+
+
+def bench_storage(n_symbols: int, workdir: Path, repeat: int) -> dict:
+    rows = [{'symbol': f"SYM{i:04d}/USDT", 'signal': 'BUY', 'timestamp': f"2025-01-01T00:{i % 60:02d}:00"}
+            for i in range(n_symbols)]
+
+    def csv_log():
+        storage = DataStorage(tempfile.mkdtemp(dir=workdir))
+        for row in rows:
+            storage.save_trade_log_csv(row)
+
+    def sqlite_log():
+        storage = DataStorage(tempfile.mkdtemp(dir=workdir), sqlite_file=Path(tempfile.mkdtemp(dir=workdir)) / 'b.db')
+        for row in rows:
+            storage.save_to_sqlite('trades', row)
+        storage.close()
+
+    return {
+        f'storage_csv@{n_symbols}': best_of(csv_log, repeat),
+        f'storage_sqlite@{n_symbols}': best_of(sqlite_log, repeat),
+    }
+
+
+def bench_paper(n_symbols: int, repeat: int, orders_per_symbol: int = 20) -> dict:
+    """
+    Bracket orders through PaperBroker, then candles that trigger their exits.
+    """
+    symbols = [f"SYM{i:04d}/USDT" for i in range(n_symbols)]
+
+    def run():
+        broker = PaperBroker(balance=1e12)
+        for s in symbols:
+            broker.update_price(s, 100.0)
+        for i in range(orders_per_symbol):
+            side, tp, sl = ('buy', 105.0, 95.0) if i % 2 else ('sell', 95.0, 105.0)
+            for s in symbols:
+                broker.place_order(s, side, 1.0, take_profit=tp + i * 0.1, stop_loss=sl - i * 0.1)
+        for s in symbols:
+            broker.on_candle(s, [0, 100.0, 110.0, 90.0, 100.0, 1.0])
+
+    return {f'paper_orders@{n_symbols}': best_of(run, repeat)}
+
+
+def run_all(scales, latency: float = 0.005, jitter: float = 0.005, repeat: int = 3, only=None) -> dict:
+    selected = set(only or BENCHMARKS)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        for n in scales:
+            if 'scan' in selected:
+                results.update(bench_scan(n, latency, jitter, workdir, max(1, repeat // 2)))
+            if 'signal' in selected:
+                results.update(bench_signal_engine(n, repeat))
+            if 'fetcher' in selected:
+                results.update(bench_fetcher(n, workdir, repeat))
+            if 'storage' in selected:
+                results.update(bench_storage(n, workdir, repeat))
+            if 'paper' in selected:
+                results.update(bench_paper(n, repeat))
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta: float = 0.02) -> list:
+    """
+    Return (name, baseline, current, ratio) for every result slower than baseline * (1 + tolerance).
+    Differences under `min_delta` seconds are treated as noise.
+    """
+    regressions = []
+    for name, seconds in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if seconds > base * (1 + tolerance) and seconds - base > min_delta:
+            regressions.append((name, base, seconds, seconds / base))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark scan throughput against a synthetic exchange")
+    parser.add_argument('--symbols', nargs='+', type=int, default=list(DEFAULT_SCALES), help="Universe sizes")
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS)
+    parser.add_argument('--latency', type=float, default=0.005, help="Fake REST latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.005, help="Extra random latency, up to this many seconds")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per benchmark (the best one counts)")
+    parser.add_argument('--baseline', default=str(BASELINE_FILE))
+    parser.add_argument('--tolerance', type=float, help="Allowed slowdown ratio (default: from the baseline file)")
+    parser.add_argument('--update-baseline', action='store_true', help="Record these results as the new baseline")
+    parser.add_argument('--output', help="Also write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+    results = run_all(args.symbols, args.latency, args.jitter, args.repeat, args.only)
+    logging.disable(logging.NOTSET)
+
+    for name, seconds in results.items():
+        n = int(name.split('@')[1])
+        print(f"{name:<32} {seconds:9.4f}s  {seconds / n * 1000:8.3f} ms/symbol")
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+    baseline_path = Path(args.baseline)
+    stored = json.loads(baseline_path.read_text()) if baseline_path.exists() else {'tolerance': 0.5, 'results': {}}
+    if args.update_baseline:
+        stored['results'].update({name: round(seconds, 4) for name, seconds in results.items()})
+        stored['meta'] = {'python': platform.python_version(), 'machine': platform.machine(),
+                          'latency': args.latency, 'jitter': args.jitter}
+        baseline_path.write_text(json.dumps(stored, indent=2, sort_keys=True) + '\n')
+        print(f"Baseline updated: {baseline_path}")
+        return 0
+
+    tolerance = args.tolerance if args.tolerance is not None else stored.get('tolerance', 0.5)
+    regressions = compare(results, stored['results'], tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} benchmark(s) regressed by more than {tolerance:.0%}:")
+        for name, base, seconds, ratio in regressions:
+            print(f"  {name}: {base:.4f}s -> {seconds:.4f}s ({ratio:.2f}x)")
+        return 1
+    print(f"\n✅ No regressions against {baseline_path} (tolerance {tolerance:.0%})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
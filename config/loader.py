@@ -1,21 +1,11 @@
-from pathlib import Path
+# config/loader.py
 
-# Create the content for config/loader.py again after state reset
-loader_code = """
-import yaml
 import os
 
-def load_config(path='config/settings.yaml'):
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Config file not found: {path}")
-    with open(path, 'r') as f:
-        return yaml.safe_load(f)
-"""
+from config.settings import CONFIG_PATH, load_settings
 
-# Create the directory and file
-config_dir = Path("hawkx/config")
-config_dir.mkdir(parents=True, exist_ok=True)
-loader_file = config_dir / "loader.py"
-loader_file.write_text(loader_code)
 
-loader_file.resolve()
+def load_config(path: str = CONFIG_PATH) -> dict:
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Config file not found: {path}")
+    return load_settings(path)
@@ -1,9 +1,57 @@
 # config/settings.py
 
-import yaml
+import json
 import os
+from functools import lru_cache
 
 CONFIG_PATH = os.path.join(os.path.dirname(__file__), 'settings.yaml')
+# Parsed copy of settings.yaml, reused while the YAML file is unchanged
+CACHE_PATH = os.path.join(os.path.dirname(__file__), '__pycache__', 'settings.yaml.json')
 
-with open(CONFIG_PATH, 'r') as f:
-    SETTINGS = yaml.safe_load(f)
+
+def load_settings(path: str = CONFIG_PATH) -> dict:
+    """
+    Parse a settings file once per process. For the default file the parsed
+    result is also cached on disk (keyed by mtime and size), so a warm start
+    skips importing and running the YAML parser.
+    """
+    return _load(os.path.abspath(path))
+
+
+@lru_cache(maxsize=None)
+def _load(path: str) -> dict:
+    stat = os.stat(path)
+    key = [stat.st_mtime_ns, stat.st_size]
+    cache_path = CACHE_PATH if path == os.path.abspath(CONFIG_PATH) else None
+    if cache_path is not None:
+        try:
+            with open(cache_path, 'r') as f:
+                cached = json.load(f)
+            if cached.get('key') == key:
+                return cached['settings']
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    import yaml
+    with open(path, 'r') as f:
+        settings = yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+
+    if cache_path is not None:
+        try:
+            text = json.dumps({'key': key, 'settings': settings})
+            if json.loads(text)['settings'] == settings:  # e.g. dates or int keys would not round-trip
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w') as f:
+                    f.write(text)
+                os.replace(tmp_path, cache_path)
+        except (OSError, TypeError, ValueError):
+            pass  # read-only checkout, or values JSON can't hold: parse again next time
+    return settings
+
+
+def __getattr__(name):
+    # `from config.settings import SETTINGS` parses the file on first use, not on import
+    if name == 'SETTINGS':
+        return load_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
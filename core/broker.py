@@ -1,17 +1,57 @@
+import threading
+import time
 from abc import ABC, abstractmethod
 
+from core.request_scheduler import PRIORITY_ACCOUNT, PRIORITY_ORDER, PRIORITY_SCAN
+from utils import metrics
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 
+class TickerSnapshot:
+    """
+    In-memory snapshot of all tickers, refreshed in bulk and valid for `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self.tickers = {}
+        self.updated_at = 0.0
+        self.lock = threading.Lock()
+
+    def is_fresh(self, max_age: float = None) -> bool:
+        max_age = self.ttl if max_age is None else max_age
+        return bool(self.tickers) and (time.monotonic() - self.updated_at) < max_age
+
+    def update(self, tickers: dict):
+        self.tickers = dict(tickers)
+        self.updated_at = time.monotonic()
+
+    def get(self, symbol: str):
+        if not self.is_fresh():
+            return None
+        return self.tickers.get(symbol)
+
+
 class Broker(ABC):
     """
     Abstract base class for all exchange implementations.
     """
 
-    def __init__(self, exchange_interface):
+    def __init__(self, exchange_interface, ticker_ttl: float = 60.0, scheduler=None):
         self.exchange = exchange_interface
+        self.ticker_snapshot = TickerSnapshot(ttl=ticker_ttl)
+        self.scheduler = scheduler
+
+    def request(self, endpoint: str, fn, *args, priority: int = PRIORITY_SCAN, coalesce: bool = True, **kwargs):
+        """
+        Issue an exchange call through the RequestScheduler when one is configured.
+        """
+        fn = metrics.instrument_api(endpoint, fn)
+        if self.scheduler is None:
+            return fn(*args, **kwargs)
+        return self.scheduler.call(endpoint, fn, *args, priority=priority, coalesce=coalesce, **kwargs)
 
     @abstractmethod
     def connect(self):
@@ -19,7 +59,27 @@ class Broker(ABC):
         pass
 
     def fetch_ticker(self, symbol: str) -> dict:
-        return self.exchange.fetch_ticker(symbol)
+        """
+        Return the ticker from the bulk snapshot when fresh, otherwise fetch it alone.
+        """
+        ticker = self.ticker_snapshot.get(symbol)
+        if ticker is not None:
+            return ticker
+        return self.request('ticker', self.exchange.fetch_ticker, symbol)
+
+    def fetch_tickers(self, max_age: float = None) -> dict:
+        """
+        Return all tickers from one bulk request, reusing the snapshot while it is fresh.
+        """
+        snapshot = self.ticker_snapshot
+        if snapshot.is_fresh(max_age):
+            return snapshot.tickers
+        with snapshot.lock:
+            # Another scan worker may have refreshed it while we waited
+            if not snapshot.is_fresh(max_age):
+                snapshot.update(self.request('tickers', self.exchange.fetch_tickers))
+                logger.info(f"Refreshed ticker snapshot with {len(snapshot.tickers)} tickers")
+        return snapshot.tickers
 
     @abstractmethod
     def get_balance(self, asset: str) -> float:
@@ -31,10 +91,26 @@ class Broker(ABC):
 
     # 🔻 THESE MUST NOT BE ABSTRACT since they are implemented already
     def cancel_order(self, order_id: str):
-        return self.exchange.cancel_order(order_id)
+        return self.request('cancel_order', self.exchange.cancel_order, order_id,
+                            priority=PRIORITY_ORDER, coalesce=False)
 
     def get_open_orders(self, symbol: str = None):
-        return self.exchange.fetch_open_orders(symbol) if symbol else self.exchange.fetch_open_orders()
+        if symbol:
+            return self.request('open_orders', self.exchange.fetch_open_orders, symbol, priority=PRIORITY_ACCOUNT)
+        return self.request('open_orders', self.exchange.fetch_open_orders, priority=PRIORITY_ACCOUNT)
+
+    def exposure(self, tickers: dict, quote: str = 'USDT') -> dict:
+        """
+        Signed notional of the account's spot holdings, {symbol: notional},
+        valued at the `tickers` last prices. Spot holdings are long only.
+        """
+        balance = self.request('balance', self.exchange.fetch_balance, priority=PRIORITY_ACCOUNT)
+        held = {}
+        for asset, total in (balance.get('total') or {}).items():
+            last = (tickers.get(f"{asset}/{quote}") or {}).get('last')
+            if asset != quote and total and last is not None:
+                held[f"{asset}/{quote}"] = total * last
+        return held
 
     def get_position(self, symbol: str):
         return {
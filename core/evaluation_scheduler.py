@@ -0,0 +1,110 @@
+# core/evaluation_scheduler.py
+
+import time
+
+import numpy as np
+
+from core.signal_engine import SignalResult
+from data.candle_buffer import CandleBuffer
+from utils import metrics
+from utils.logger import setup_logger
+from utils.timeframes import bucket_start, candle_offset_ms, timeframe_to_ms
+
+logger = setup_logger(__name__)
+
+EVALUATIONS = metrics.counter('hawkx_timeframe_evaluations_total',
+                              "Per-timeframe evaluations, by whether a new candle had closed", ('outcome',))
+ALERTS_SUPPRESSED = metrics.counter('hawkx_alerts_suppressed_total', "Alerts skipped because the signal was unchanged")
+
+
+class EvaluationScheduler:
+    """
+    Decides which timeframes of a symbol need re-evaluating.
+
+    A timeframe is due only when a candle has closed after the last one it
+    was evaluated on; otherwise its cached SignalResult is reused. It also
+    remembers the last alerted signal per symbol so an unchanged signal is
+    not alerted again. State round-trips through to_dict/from_dict, e.g.
+    with DataStorage.save_signal_json.
+    """
+
+    def __init__(self, long_offset_hours: int = 0):
+        self.long_offset_hours = long_offset_hours
+        self.evaluated = {}   # "symbol|timeframe" -> open time (ms) of the last closed candle evaluated
+        self.results = {}     # "symbol|timeframe" -> SignalResult
+        self.alerted = {}     # symbol -> last alerted signal
+
+    def last_closed(self, timeframe: str, now_ms: int = None) -> int:
+        """
+        Open time (ms) of the most recent candle that has closed at `now_ms`.
+        """
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        return bucket_start(now_ms, timeframe, candle_offset_ms(timeframe, self.long_offset_hours)) \
+            - timeframe_to_ms(timeframe)
+
+    def due(self, symbol: str, timeframes: list, now_ms: int = None) -> list:
+        """
+        The timeframes with a newly closed candle (or no cached result) for `symbol`.
+        """
+        due = []
+        for tf in timeframes:
+            key = f"{symbol}|{tf}"
+            if key not in self.results or self.evaluated.get(key, -1) < self.last_closed(tf, now_ms):
+                due.append(tf)
+        EVALUATIONS.inc(len(due), outcome='due')
+        EVALUATIONS.inc(len(timeframes) - len(due), outcome='cached')
+        return due
+
+    def record(self, symbol: str, timeframe: str, df, result: SignalResult):
+        """
+        Cache the result evaluated on `df` (a DataFrame, CandleBuffer or (n, 6)
+        OHLCV array), whose last row is the still-forming candle.
+        """
+        key = f"{symbol}|{timeframe}"
+        if isinstance(df, CandleBuffer):
+            timestamps = df.timestamp
+        elif isinstance(df, np.ndarray):
+            timestamps = df[:, 0]
+        else:
+            timestamps = df.index.as_unit('ms').asi8
+        # If the exchange has not opened the next candle yet, stay due and look again next cycle
+        self.evaluated[key] = int(timestamps[-2]) if len(timestamps) > 1 else -1
+        self.results[key] = result
+
+    def cached(self, symbol: str, timeframes: list) -> dict:
+        return {tf: self.results[f"{symbol}|{tf}"] for tf in timeframes if f"{symbol}|{tf}" in self.results}
+
+    def should_alert(self, symbol: str, signal: str) -> bool:
+        """
+        True when `signal` differs from the last one alerted for `symbol`; records it.
+        """
+        if self.alerted.get(symbol) == signal:
+            ALERTS_SUPPRESSED.inc()
+            logger.info(f"[{symbol}] {signal} unchanged since last alert; not alerting again")
+            return False
+        self.alerted[symbol] = signal
+        return True
+
+    def clear_signal(self, symbol: str):
+        """
+        Forget the last alerted signal, so the next occurrence alerts again.
+        """
+        self.alerted.pop(symbol, None)
+
+    def to_dict(self) -> dict:
+        return {
+            'evaluated': self.evaluated,
+            'results': {key: result.to_dict() for key, result in self.results.items()},
+            'alerted': self.alerted,
+        }
+
+    def load(self, data: dict):
+        data = data or {}
+        self.evaluated = dict(data.get('evaluated', {}))
+        self.results = {key: SignalResult.from_dict(value) for key, value in data.get('results', {}).items()}
+        self.alerted = dict(data.get('alerted', {}))
+        return self
+
+    @classmethod
+    def from_dict(cls, data: dict, long_offset_hours: int = 0):
+        return cls(long_offset_hours).load(data)
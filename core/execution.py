@@ -0,0 +1,236 @@
+# core/execution.py
+
+import asyncio
+import hashlib
+import time
+
+from utils import metrics
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+OKX_BATCH_LIMIT = 20            # orders per POST /api/v5/trade/batch-orders
+DUPLICATE_CLIENT_ID = '51016'   # OKX sCode: an order with this clOrdId already exists
+TERMINAL_STATES = ('closed', 'canceled', 'rejected', 'expired')
+
+ORDER_SUBMIT = metrics.histogram('hawkx_order_submit_seconds', "Latency of batch order submissions")
+ORDER_STATES = metrics.counter('hawkx_order_updates_total', "Order state updates received", ('status',))
+
+
+def client_order_id(symbol: str, side: str, key, prefix: str = 'hx') -> str:
+    """
+    Deterministic OKX clOrdId (alphanumeric, <= 32 chars) for one signal.
+    `key` should identify the signal, e.g. the candle timestamp it fired on,
+    so re-submitting the same signal can never open a second position.
+    """
+    digest = hashlib.sha1(f"{symbol}|{side}|{key}".encode()).hexdigest()
+    return (prefix + digest)[:32]
+
+
+class OrderRequest:
+    __slots__ = ('symbol', 'side', 'amount', 'price', 'type', 'take_profit', 'stop_loss', 'client_id')
+
+    def __init__(self, symbol, side, amount, price=None, type='market', take_profit=None, stop_loss=None,
+                 client_id=None):
+        self.symbol = symbol
+        self.side = side
+        self.amount = amount
+        self.price = price
+        self.type = type
+        self.take_profit = take_profit
+        self.stop_loss = stop_loss
+        self.client_id = client_id
+
+    def to_ccxt(self) -> dict:
+        params = {'clientOrderId': self.client_id}
+        # Attached as exchange-side algo orders (OKX attachAlgoOrds), triggered on the last price
+        if self.take_profit is not None:
+            params['takeProfit'] = {'triggerPrice': self.take_profit, 'type': 'market'}
+        if self.stop_loss is not None:
+            params['stopLoss'] = {'triggerPrice': self.stop_loss, 'type': 'market'}
+        return {'symbol': self.symbol, 'type': self.type, 'side': self.side, 'amount': self.amount,
+                'price': self.price, 'params': params}
+
+
+class TrackedOrder:
+    """
+    Local view of one order, updated from the batch response and the private orders channel.
+    """
+
+    def __init__(self, request: OrderRequest):
+        self.request = request
+        self.client_id = request.client_id
+        self.status = 'pending'
+        self.id = None
+        self.filled = 0.0
+        self.average = None
+        self.error = None
+        self.done = asyncio.Event()
+
+    def apply(self, order: dict):
+        if self.done.is_set():
+            return  # a late batch response must not undo a fill already seen on the stream
+        self.id = order.get('id') or self.id
+        self.status = order.get('status') or self.status
+        self.filled = order.get('filled') or self.filled
+        self.average = order.get('average') or self.average
+        if self.status in TERMINAL_STATES:
+            self.done.set()
+
+    def fail(self, error):
+        self.status = 'rejected'
+        self.error = str(error)
+        self.done.set()
+
+
+class ExecutionPipeline:
+    """
+    Async order execution over a ccxt (pro) exchange.
+
+    `submit()` queues an order and returns immediately with a TrackedOrder.
+    A batcher task sends queued orders in groups of up to `batch_size` through
+    the exchange's batch endpoint, waiting at most `batch_window` seconds for a
+    burst to fill a batch. TP/SL ride along as attached exchange-side orders.
+    Order state comes from `watch_orders` (private WebSocket channel) instead
+    of polling. Orders are keyed by client order id: submitting an id that is
+    already known returns the existing TrackedOrder without another request.
+    """
+
+    def __init__(self, exchange, batch_size: int = OKX_BATCH_LIMIT, batch_window: float = 0.02,
+                 reconnect_delay: float = 1.0, max_reconnect_delay: float = 30.0):
+        self.exchange = exchange
+        self.batch_size = min(batch_size, OKX_BATCH_LIMIT)
+        self.batch_window = batch_window
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self.orders = {}        # client id -> TrackedOrder
+        self.batches = 0
+        self._queue = None
+        self._tasks = []
+
+    async def start(self, watch: bool = True):
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._batcher())]
+        if watch and getattr(self.exchange, 'has', {}).get('watchOrders'):
+            self._tasks.append(asyncio.create_task(self._watch()))
+        return self
+
+    def submit(self, request: OrderRequest) -> TrackedOrder:
+        if request.client_id is None:
+            raise ValueError("OrderRequest.client_id is required for idempotent execution")
+        tracked = self.orders.get(request.client_id)
+        # A rejected order may be retried: its deterministic id makes a duplicate impossible
+        if tracked is not None and tracked.status != 'rejected':
+            logger.info(f"Order {request.client_id} already submitted ({tracked.status}); skipping duplicate")
+            return tracked
+        tracked = self.orders[request.client_id] = TrackedOrder(request)
+        self._queue.put_nowait(tracked)
+        return tracked
+
+    async def flush(self):
+        """
+        Wait until every queued order has been sent to the exchange.
+        """
+        await self._queue.join()
+
+    async def wait(self, client_id: str, timeout: float = None) -> TrackedOrder:
+        tracked = self.orders[client_id]
+        await asyncio.wait_for(tracked.done.wait(), timeout)
+        return tracked
+
+    async def close(self):
+        if self._queue is not None:
+            await self.flush()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        close = getattr(self.exchange, 'close', None)
+        if close is not None:
+            await close()
+
+    # === Submission ===
+
+    async def _batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._send(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _send(self, batch: list):
+        self.batches += 1
+        requests = [t.request.to_ccxt() for t in batch]
+        started = time.perf_counter()
+        try:
+            if getattr(self.exchange, 'has', {}).get('createOrders'):
+                results = await self.exchange.create_orders(requests)
+            else:
+                results = await asyncio.gather(*(
+                    self.exchange.create_order(r['symbol'], r['type'], r['side'], r['amount'], r['price'], r['params'])
+                    for r in requests
+                ))
+        except Exception as e:
+            logger.error(f"❌ Batch of {len(batch)} orders failed: {e}")
+            for tracked in batch:
+                self._on_error(tracked, e)
+            return
+        finally:
+            ORDER_SUBMIT.observe(time.perf_counter() - started)
+
+        for tracked, result in zip(batch, results):
+            info = (result or {}).get('info') or {}
+            code = str(info.get('sCode', '0'))
+            if code == DUPLICATE_CLIENT_ID:
+                # Sent before (e.g. a retry after a timeout); its state arrives on the orders channel
+                tracked.status = 'open'
+            elif code != '0' or (result or {}).get('status') == 'rejected':
+                self._on_error(tracked, info.get('sMsg') or 'rejected')
+            else:
+                tracked.apply({**result, 'status': result.get('status') or 'open'})
+        logger.info(f"Submitted {len(batch)} order(s) in one request")
+
+    def _on_error(self, tracked: TrackedOrder, error):
+        tracked.fail(error)
+        logger.error(f"Order {tracked.client_id} for {tracked.request.symbol} rejected: {error}")
+
+    # === Tracking ===
+
+    async def _watch(self):
+        delay = self.reconnect_delay
+        while True:
+            try:
+                updates = await self.exchange.watch_orders()
+                delay = self.reconnect_delay
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Order stream error ({e}), reconnecting in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+                continue
+            for order in updates:
+                self.on_order_update(order)
+
+    def on_order_update(self, order: dict):
+        tracked = self.orders.get(order.get('clientOrderId'))
+        if tracked is None:
+            return
+        tracked.apply(order)
+        ORDER_STATES.inc(status=tracked.status)
+        if tracked.status == 'closed':
+            logger.info(f"✅ Order {tracked.client_id} {tracked.request.side} {tracked.request.symbol} "
+                        f"filled {tracked.filled} @ {tracked.average}")
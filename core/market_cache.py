@@ -0,0 +1,68 @@
+# core/market_cache.py
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class MarketCache:
+    """
+    Local JSON cache of the exchange's market/currency metadata.
+
+    Entries older than `ttl` seconds are still served (so startup never waits
+    for `load_markets`) but are reported stale so the caller can refresh them
+    in the background. A content fingerprint, like an ETag, tells whether a
+    refresh actually changed anything.
+    """
+
+    def __init__(self, path: str, ttl: float = 6 * 3600):
+        self.path = Path(path)
+        self.ttl = ttl
+
+    @staticmethod
+    def fingerprint(markets: dict) -> str:
+        payload = json.dumps(sorted(
+            (symbol, m.get('active'), m.get('precision'), m.get('limits')) for symbol, m in markets.items()
+        ), default=str)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def load(self):
+        """
+        Return the cached entry ({'markets', 'currencies', 'fingerprint', 'fetched_at'}) or None.
+        """
+        if not self.path.exists():
+            return None
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable market cache {self.path}: {e}")
+            return None
+
+    def is_stale(self, entry: dict) -> bool:
+        return time.time() - entry.get('fetched_at', 0) > self.ttl
+
+    def save(self, markets: dict, currencies: dict = None) -> bool:
+        """
+        Persist fresh metadata. Returns True if it differs from what was cached.
+        """
+        previous = self.load()
+        fingerprint = self.fingerprint(markets)
+        entry = {
+            'fetched_at': time.time(),
+            'fingerprint': fingerprint,
+            'markets': markets,
+            'currencies': currencies or {}
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f, default=str)
+        os.replace(tmp_path, self.path)
+        return previous is None or previous.get('fingerprint') != fingerprint
@@ -0,0 +1,93 @@
+# core/offline_broker.py
+
+import time
+
+import numpy as np
+
+from core.broker import Broker
+from utils.logger import setup_logger
+from utils.timeframes import timeframe_to_ms
+
+logger = setup_logger(__name__)
+
+DAY_MS = 24 * 3600 * 1000
+
+
+class StoreExchange:
+    """
+    Read-only, ccxt-shaped exchange over the local candle store: markets are
+    the stored symbols, tickers and OHLCV come from the stored candles.
+    """
+
+    def __init__(self, candles, timeframe: str):
+        self.candles = candles
+        self.timeframe = timeframe
+        self.symbols = []
+        self.markets = {}
+        self.currencies = {}
+
+    def load_markets(self, reload: bool = False) -> dict:
+        names = {path.name[:-len('.npy')] for path in self.candles.base_path.glob('*/*.npy')
+                 if not path.name.endswith('.tmp.npy')}
+        self.symbols = sorted(name.replace('-', '/') for name in names)
+        self.markets = {s: {'symbol': s, 'active': True} for s in self.symbols}
+        return self.markets
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        rows = self.candles.load(symbol, timeframe)
+        if rows is None:
+            return []
+        if since is not None:
+            rows = rows[np.searchsorted(rows[:, 0], since):]
+            rows = rows[:limit] if limit else rows
+        elif limit:
+            rows = rows[-limit:]
+        return rows.tolist()
+
+    def fetch_ticker(self, symbol) -> dict:
+        rows = self.candles.load(symbol, self.timeframe)
+        if rows is None or not len(rows):
+            return {'symbol': symbol, 'last': None, 'quoteVolume': 0.0}
+        day = rows[rows[:, 0] > rows[-1, 0] + timeframe_to_ms(self.timeframe) - DAY_MS]
+        return {
+            'symbol': symbol,
+            'timestamp': int(rows[-1, 0]),
+            'last': float(rows[-1, 4]),
+            'close': float(rows[-1, 4]),
+            'quoteVolume': float((day[:, 4] * day[:, 5]).sum()),
+        }
+
+    def fetch_tickers(self) -> dict:
+        return {symbol: self.fetch_ticker(symbol) for symbol in self.symbols}
+
+
+class OfflineBroker(Broker):
+    """
+    Broker for --dry-run: serves whatever is in the candle store and never
+    touches the network. Orders are refused.
+    """
+
+    def __init__(self, storage, timeframe: str, ticker_ttl: float = 60.0):
+        super().__init__(StoreExchange(storage.candles, timeframe), ticker_ttl=ticker_ttl)
+
+    def connect(self, market_cache=None):
+        started = time.perf_counter()
+        self.exchange.load_markets()
+        logger.info(f"Dry run: {len(self.exchange.symbols)} symbols in the candle store "
+                    f"({time.perf_counter() - started:.3f}s)")
+
+    def refresh_markets(self, market_cache=None):
+        self.connect()
+
+    def get_balance(self, asset: str) -> float:
+        return 0.0
+
+    def get_price(self, symbol: str) -> float:
+        return self.fetch_ticker(symbol)['last']
+
+    def safe_fetch_ohlcv(self, symbol, timeframe, limit=100, since=None):
+        rows = self.request('candles', self.exchange.fetch_ohlcv, symbol, timeframe, since=since, limit=limit)
+        return rows or None
+
+    def place_order(self, symbol: str, side: str, amount: float, price: float = None, type: str = 'market'):
+        raise RuntimeError(f"Dry run: not placing {side} {amount} {symbol}")
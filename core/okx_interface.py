@@ -1,39 +1,118 @@
-import ccxt
+import threading
+import time
 
 from core.broker import Broker, logger
+from core.request_scheduler import DEFAULT_GLOBAL_LIMIT, PRIORITY_ACCOUNT, PRIORITY_ORDER, RequestScheduler
 
 
 class OKXInterface(Broker):
-    def __init__(self, config: dict):
-        exchange = ccxt.okx({
+    def __init__(self, config: dict, ticker_ttl: float = 60.0, rate_limits: dict = None):
+        import ccxt  # hundreds of exchange classes; only paid for when a live session starts
+
+        # With our own scheduler, ccxt's fixed-delay throttle would only add latency
+        scheduler = None
+        if rate_limits is not None:
+            global_limit = rate_limits.get('global', DEFAULT_GLOBAL_LIMIT)
+            scheduler = RequestScheduler(
+                limits={k: tuple(v) for k, v in rate_limits.items() if k != 'global'},
+                global_limit=tuple(global_limit),
+                retry_exceptions=(ccxt.RateLimitExceeded, ccxt.DDoSProtection)
+            )
+        self.credentials = {
             'apiKey': config['api_key'],
             'secret': config['api_secret'],
             'password': config['api_passphrase'],
-            'enableRateLimit': True,
+        }
+        exchange = ccxt.okx({
+            **self.credentials,
+            'enableRateLimit': scheduler is None,
             'options': {
                 'defaultType': 'spot'
             }
 
         })
-        super().__init__(exchange)
+        super().__init__(exchange, ticker_ttl=ticker_ttl, scheduler=scheduler)
 
-    def connect(self):
-        """Loads market data and establishes the connection."""
-        self.exchange.load_markets()
+    def connect(self, market_cache=None):
+        """
+        Loads market data and establishes the connection.
+        With a MarketCache, cached metadata is used straight away and refreshed
+        in the background once it is older than the cache TTL.
+        """
+        if market_cache is not None:
+            cached = market_cache.load()
+            if cached and cached.get('markets'):
+                self.exchange.set_markets(cached['markets'], cached.get('currencies') or None)
+                logger.info(f"Loaded {len(cached['markets'])} markets from cache")
+                if market_cache.is_stale(cached):
+                    threading.Thread(target=self.refresh_markets, args=(market_cache,), daemon=True).start()
+                return
+        self.refresh_markets(market_cache)
+
+    def refresh_markets(self, market_cache=None):
+        try:
+            self.request('markets', self.exchange.load_markets, True)
+        except Exception as e:
+            if not self.exchange.markets:
+                raise
+            logger.error(f"Market metadata refresh failed, keeping cached copy: {e}")
+            return
+        if market_cache is not None:
+            changed = market_cache.save(self.exchange.markets, self.exchange.currencies)
+            logger.info(f"Market metadata refreshed ({'changed' if changed else 'unchanged'})")
 
     def get_balance(self, asset: str) -> float:
-        balance = self.exchange.fetch_balance()
+        balance = self.request('balance', self.exchange.fetch_balance, priority=PRIORITY_ACCOUNT)
         return balance.get(asset, {}).get('free', 0.0)
 
     def get_price(self, symbol: str) -> float:
-        return self.exchange.fetch_ticker(symbol)['last']
+        return self.fetch_ticker(symbol)['last']
 
-    def safe_fetch_ohlcv(self, symbol, timeframe, limit=100):
+    def safe_fetch_ohlcv(self, symbol, timeframe, limit=100, since=None):
         try:
-            return self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+            return self.request('candles', self.exchange.fetch_ohlcv, symbol, timeframe, since=since, limit=limit)
         except Exception as e:
             logger.error(f"Failed to fetch OHLCV from OKX for {symbol} [{timeframe}]: {e}")
             return None
 
     def place_order(self, symbol: str, side: str, amount: float, price: float = None, type: str = 'market'):
-        return self.exchange.create_order(symbol, type, side, amount, price)
+        return self.request('place_order', self.exchange.create_order, symbol, type, side, amount, price,
+                            priority=PRIORITY_ORDER, coalesce=False)
+
+    def async_exchange(self):
+        """
+        A ccxt.pro (asyncio + private WebSocket) OKX client with the same credentials,
+        for ExecutionPipeline. Create and close it inside the event loop that uses it.
+        """
+        import ccxt.pro
+
+        exchange = ccxt.pro.okx({**self.credentials, 'options': {'defaultType': 'spot'}})
+        if self.exchange.markets:
+            exchange.set_markets(self.exchange.markets, self.exchange.currencies)
+        return exchange
+
+    def _on_stream_ticker(self, symbol: str, data: dict):
+        # Keep the bulk snapshot current from the tickers channel
+        ticker = self.ticker_snapshot.tickers.setdefault(symbol, {'symbol': symbol})
+        ticker.update({
+            'last': float(data['last']),
+            'high': float(data.get('high24h') or 0) or ticker.get('high'),
+            'low': float(data.get('low24h') or 0) or ticker.get('low'),
+            'quoteVolume': float(data.get('volCcy24h') or 0),
+            'timestamp': int(data.get('ts') or 0),
+        })
+        self.ticker_snapshot.updated_at = time.monotonic()
+
+    def stream(self, symbols, timeframes, on_candle_close, **kwargs):
+        """
+        Build an OKXStream for candle/ticker channels that backfills gaps over REST.
+        Await `.run()` on the result to start streaming.
+        """
+        from core.okx_stream import OKXStream
+
+        def backfill(symbol, timeframe, since):
+            # OKX serves at most 300 candles per REST request
+            return self.safe_fetch_ohlcv(symbol, timeframe, limit=min(kwargs.get('buffer_size', 300), 300), since=since)
+
+        kwargs.setdefault('on_ticker', self._on_stream_ticker)
+        return OKXStream(symbols, timeframes, on_candle_close, backfill=backfill, **kwargs)
@@ -0,0 +1,206 @@
+# core/okx_stream.py
+
+import asyncio
+import inspect
+import json
+
+import aiohttp
+
+from data.candle_buffer import CandleBuffer
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Candle channels live on the "business" endpoint, tickers on "public"
+OKX_BUSINESS_WS = "wss://ws.okx.com:8443/ws/v5/business"
+OKX_PUBLIC_WS = "wss://ws.okx.com:8443/ws/v5/public"
+
+# ccxt timeframe -> OKX channel suffix (same bars REST fetch_ohlcv returns)
+CHANNEL_TIMEFRAMES = {
+    '1m': '1m', '3m': '3m', '5m': '5m', '15m': '15m', '30m': '30m',
+    '1h': '1H', '2h': '2H', '4h': '4H', '6h': '6H', '12h': '12H',
+    '1d': '1D', '1w': '1W',
+}
+TIMEFRAME_CHANNELS = {f"candle{v}": k for k, v in CHANNEL_TIMEFRAMES.items()}
+
+
+def to_inst_id(symbol: str) -> str:
+    return symbol.replace('/', '-')
+
+
+def to_symbol(inst_id: str) -> str:
+    return inst_id.replace('-', '/')
+
+
+class OKXStream:
+    """
+    Streams OKX candles (and optionally tickers) over WebSocket.
+
+    Keeps a CandleBuffer of closed candles per symbol/timeframe and calls
+    `on_candle_close(symbol, timeframe, candles)` whenever a candle is confirmed
+    closed, where `candles` is that buffer, ending with the candle that just
+    closed. Its column views are only valid until the buffer's next update, so
+    the callback should copy what it keeps. The callback may be a coroutine
+    function.
+
+    `backfill(symbol, timeframe, since)` must return REST OHLCV rows; it is used
+    to warm the buffers on start and to fill the gap after every reconnect.
+    """
+
+    def __init__(self, symbols, timeframes, on_candle_close, backfill=None, on_ticker=None,
+                 candle_url: str = OKX_BUSINESS_WS, ticker_url: str = OKX_PUBLIC_WS, buffer_size: int = 500,
+                 ping_interval: float = 25.0, reconnect_delay: float = 1.0, max_reconnect_delay: float = 60.0,
+                 backfill_concurrency: int = 8):
+        self.symbols = list(symbols)
+        self.timeframes = list(timeframes)
+        self.on_candle_close = on_candle_close
+        self.backfill = backfill
+        self.on_ticker = on_ticker
+        self.candle_url = candle_url
+        self.ticker_url = ticker_url
+        self.buffer_size = buffer_size
+        self.ping_interval = ping_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.backfill_concurrency = backfill_concurrency
+
+        self.buffers = {(s, tf): CandleBuffer(buffer_size) for s in self.symbols for tf in self.timeframes}
+        self.forming = {}
+        self.connections = 0
+        self._sockets = set()
+        self._stopped = asyncio.Event()
+
+    # === Subscriptions ===
+
+    def candle_args(self) -> list:
+        return [
+            {'channel': f"candle{CHANNEL_TIMEFRAMES[tf]}", 'instId': to_inst_id(s)}
+            for s in self.symbols for tf in self.timeframes
+        ]
+
+    def ticker_args(self) -> list:
+        return [{'channel': 'tickers', 'instId': to_inst_id(s)} for s in self.symbols]
+
+    # === Message handling ===
+
+    async def _emit(self, symbol, timeframe):
+        # A failing callback is logged and contained: it must not take the stream down for every other symbol
+        try:
+            result = self.on_candle_close(symbol, timeframe, self.buffers[(symbol, timeframe)])
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.error(f"Candle close handler failed for {symbol} [{timeframe}]: {e}", exc_info=True)
+
+    async def handle_message(self, message: dict):
+        arg = message.get('arg', {})
+        channel = arg.get('channel', '')
+        if 'data' not in message:
+            if message.get('event') == 'error':
+                logger.error(f"OKX stream error: {message.get('msg')} ({message.get('code')})")
+            return
+
+        if channel == 'tickers':
+            for item in message['data']:
+                if self.on_ticker:
+                    self.on_ticker(to_symbol(item['instId']), item)
+            return
+
+        timeframe = TIMEFRAME_CHANNELS.get(channel)
+        key = (to_symbol(arg.get('instId', '')), timeframe)
+        if timeframe is None or key not in self.buffers:
+            return
+
+        for item in message['data']:
+            row = [int(item[0])] + [float(v) for v in item[1:6]]
+            confirmed = len(item) > 8 and item[8] == '1'
+            if confirmed:
+                self.forming.pop(key, None)
+                if self.buffers[key].append(row):
+                    await self._emit(*key)
+            else:
+                self.forming[key] = row
+
+    # === Connection management ===
+
+    async def _backfill_one(self, key, semaphore):
+        since = self.buffers[key].last_timestamp
+        loop = asyncio.get_running_loop()
+        async with semaphore:
+            try:
+                rows = await loop.run_in_executor(None, self.backfill, key[0], key[1], since)
+            except Exception as e:
+                logger.error(f"Backfill failed for {key[0]} [{key[1]}]: {e}")
+                return
+        if not rows:
+            return
+        # The newest REST candle is still forming; keep it out of the closed buffer
+        self.forming[key] = [int(rows[-1][0])] + [float(v) for v in rows[-1][1:6]]
+        appended = self.buffers[key].extend(rows[:-1])
+        if since is not None and appended:
+            await self._emit(*key)
+
+    async def _backfill_all(self):
+        if not self.backfill:
+            return
+        semaphore = asyncio.Semaphore(self.backfill_concurrency)
+        await asyncio.gather(*(self._backfill_one(key, semaphore) for key in self.buffers))
+
+    async def _listen(self, url: str, args: list):
+        async with aiohttp.ClientSession() as session:
+            async with session.ws_connect(url) as ws:
+                self.connections += 1
+                self._sockets.add(ws)
+                try:
+                    await ws.send_str(json.dumps({'op': 'subscribe', 'args': args}))
+                    while not self._stopped.is_set():
+                        try:
+                            msg = await ws.receive(timeout=self.ping_interval)
+                        except asyncio.TimeoutError:
+                            # OKX drops connections that stay silent for 30s
+                            await ws.send_str('ping')
+                            continue
+                        if msg.type == aiohttp.WSMsgType.TEXT:
+                            if msg.data == 'pong':
+                                continue
+                            await self.handle_message(json.loads(msg.data))
+                        elif msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED,
+                                          aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.ERROR):
+                            break
+                finally:
+                    self._sockets.discard(ws)
+
+    async def _run_channel(self, url: str, args: list, backfill: bool):
+        delay = self.reconnect_delay
+        while not self._stopped.is_set():
+            try:
+                if backfill:
+                    await self._backfill_all()
+                await self._listen(url, args)
+                delay = self.reconnect_delay
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"OKX stream connection to {url} failed: {e}")
+            if self._stopped.is_set():
+                break
+            logger.info(f"Reconnecting to {url} in {delay:.1f}s")
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def run(self):
+        """
+        Stream until `stop()` is called, reconnecting with exponential backoff.
+        """
+        channels = [self._run_channel(self.candle_url, self.candle_args(), backfill=True)]
+        if self.ticker_url and self.on_ticker:
+            channels.append(self._run_channel(self.ticker_url, self.ticker_args(), backfill=False))
+        await asyncio.gather(*channels)
+
+    def stop(self):
+        self._stopped.set()
+        for ws in list(self._sockets):
+            asyncio.ensure_future(ws.close())
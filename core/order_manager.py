@@ -1,39 +1,78 @@
 # core/order_manager.py
 
+from core.execution import OrderRequest, client_order_id
 from core.risk_management import calculate_position_size, calculate_tp_sl
+from utils import metrics
 from utils.logger import setup_logger
 from utils.email_alert import send_email
 
 logger = setup_logger(__name__)
 
+ORDERS = metrics.counter('hawkx_orders_total', "Orders submitted by side and outcome", ('side', 'outcome'))
+
 class OrderManager:
-    def __init__(self, broker, capital, email_config=None):
+    def __init__(self, broker, capital, email_config=None, alerts=None, pipeline=None):
         self.broker = broker
         self.capital = capital
         self.email_config = email_config
+        self.alerts = alerts  # optional AlertDispatcher; sends without blocking order flow
+        self.pipeline = pipeline  # optional ExecutionPipeline for async batched execution
 
-    def process_signal(self, symbol, timeframe, signal, metadata):
+    def _levels(self, signal, metadata):
         entry_price = metadata['entry_price']
-        volatility = abs(metadata['macd_diff'])  # crude proxy
-        tp, sl = calculate_tp_sl(entry_price, volatility, signal)
-        position_size = calculate_position_size(self.capital, entry_price, sl)
+        if metadata.get('tp') is not None and metadata.get('sl') is not None:
+            tp, sl = metadata['tp'], metadata['sl']
+        else:
+            volatility = abs(metadata['macd_diff'])  # crude proxy
+            tp, sl = calculate_tp_sl(entry_price, volatility, signal)
+        position_size = metadata.get('position_size')
+        if position_size is None:
+            position_size = calculate_position_size(self.capital, entry_price, sl)
+        return entry_price, tp, sl, position_size
+
+    def submit_signal(self, symbol, timeframe, signal, metadata):
+        """
+        Queue the entry with exchange-side TP/SL on the ExecutionPipeline; returns a TrackedOrder.
+        The client order id is derived from the signal, so repeats are not re-sent.
+        """
+        if signal not in ("BUY", "SELL"):
+            logger.warning("Unknown signal, skipping.")
+            return None
+        entry_price, tp, sl, position_size = self._levels(signal, metadata)
+        side = signal.lower()
+        request = OrderRequest(symbol, side, position_size, take_profit=tp, stop_loss=sl,
+                               client_id=client_order_id(symbol, side, (timeframe, metadata.get('timestamp'))))
+        logger.info(f"Queueing {signal} order for {symbol} [{timeframe}] "
+                    f"Entry: {entry_price}, TP: {tp}, SL: {sl}, Qty: {position_size}")
+        return self.pipeline.submit(request)
+
+    def process_signal(self, symbol, timeframe, signal, metadata):
+        entry_price, tp, sl, position_size = self._levels(signal, metadata)
 
         logger.info(f"Placing {signal} order for {symbol} [{timeframe}]")
         logger.info(f"Entry: {entry_price}, TP: {tp}, SL: {sl}, Qty: {position_size}")
+        # Brokers that can hold exits themselves (e.g. PaperBroker) get TP/SL attached to the entry
+        bracket = {'take_profit': tp, 'stop_loss': sl} if getattr(self.broker, 'supports_brackets', False) else {}
 
         try:
-            if signal == "BUY":
-                order = self.broker.place_order(symbol, "buy", amount=position_size, price=None, type='market')
-            elif signal == "SELL":
-                order = self.broker.place_order(symbol, "sell", amount=position_size, price=None, type='market')
-            else:
-                logger.warning("Unknown signal, skipping.")
-                return
+            with metrics.timed('order.place'):
+                if signal == "BUY":
+                    order = self.broker.place_order(symbol, "buy", amount=position_size, price=None, type='market',
+                                                    **bracket)
+                elif signal == "SELL":
+                    order = self.broker.place_order(symbol, "sell", amount=position_size, price=None, type='market',
+                                                    **bracket)
+                else:
+                    logger.warning("Unknown signal, skipping.")
+                    return
 
+            ORDERS.inc(side=signal, outcome='placed')
             logger.info(f"Order placed: {order}")
-            self.send_trade_alert(symbol, timeframe, signal, entry_price, tp, sl, position_size)
+            with metrics.timed('order.alert'):
+                self.send_trade_alert(symbol, timeframe, signal, entry_price, tp, sl, position_size)
 
         except Exception as e:
+            ORDERS.inc(side=signal, outcome='failed')
             logger.error(f"Failed to place order for {symbol}: {e}")
 
     def send_trade_alert(self, symbol, timeframe, signal, entry, tp, sl, qty):
@@ -51,8 +90,12 @@ class OrderManager:
 🎯 Take Profit: ${tp}
 🛡 Stop Loss: ${sl}
 """
+        subject = f"{signal} EXECUTED: {symbol} [{timeframe}]"
+        if self.alerts is not None:
+            self.alerts.send(subject=subject, body=body)
+            return
         send_email(
-            subject=f"{signal} EXECUTED: {symbol} [{timeframe}]",
+            subject=subject,
             body=body,
             config=self.email_config
         )
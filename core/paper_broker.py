@@ -0,0 +1,353 @@
+# core/paper_broker.py
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+
+from core.broker import Broker
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class PaperOrder:
+    __slots__ = ('id', 'symbol', 'side', 'type', 'amount', 'price', 'stop_price', 'status', 'average', 'fee',
+                 'timestamp', 'reserved', 'bracket', 'oco')
+
+    def __init__(self, id, symbol, side, type, amount, price=None, stop_price=None, timestamp=None):
+        self.id = id
+        self.symbol = symbol
+        self.side = side
+        self.type = type
+        self.amount = amount
+        self.price = price
+        self.stop_price = stop_price
+        self.status = 'open'
+        self.average = None
+        self.fee = 0.0
+        self.timestamp = timestamp
+        self.reserved = 0.0     # quote currency held back for an open buy limit
+        self.bracket = None     # (take_profit, stop_loss) placed once this order fills
+        self.oco = None         # sibling exit order cancelled when this one fills
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id, 'symbol': self.symbol, 'side': self.side, 'type': self.type,
+            'amount': self.amount, 'price': self.price, 'stopPrice': self.stop_price,
+            'status': self.status, 'filled': self.amount if self.status == 'closed' else 0.0,
+            'average': self.average, 'fee': {'cost': self.fee}, 'timestamp': self.timestamp,
+        }
+
+
+class PaperPosition:
+    __slots__ = ('qty', 'entry_price', 'realized_pnl')
+
+    def __init__(self):
+        self.qty = 0.0
+        self.entry_price = 0.0
+        self.realized_pnl = 0.0
+
+    def apply(self, signed_qty: float, price: float):
+        qty = self.qty
+        if qty == 0 or (qty > 0) == (signed_qty > 0):
+            total = qty + signed_qty
+            self.entry_price = (self.entry_price * qty + price * signed_qty) / total
+            self.qty = total
+            return
+        closed = min(abs(qty), abs(signed_qty))
+        self.realized_pnl += closed * (price - self.entry_price) * (1 if qty > 0 else -1)
+        remaining = qty + signed_qty
+        if abs(remaining) < 1e-12:
+            self.qty, self.entry_price = 0.0, 0.0
+        elif (remaining > 0) != (qty > 0):
+            # Flipped through zero: the rest opens a new position at this price
+            self.qty, self.entry_price = remaining, price
+        else:
+            self.qty = remaining
+
+
+class PaperBroker(Broker):
+    """
+    Simulated execution backend with in-memory order books.
+
+    Market orders fill at the last known price plus slippage; limit and stop
+    orders rest in per-symbol heaps and fill as prices arrive through
+    `update_price`/`on_candle`. A bracket order (take_profit/stop_loss) places
+    an OCO pair of exits once its entry fills. When both exits are touched by
+    the same candle the stop is filled first, as in the backtest engine.
+
+    Cash is tracked in the quote currency and positions as signed quantities,
+    so SELL signals open shorts. Market data (tickers, OHLCV) comes from the
+    optional `market_data` broker, e.g. the live OKXInterface.
+    """
+
+    supports_brackets = True
+
+    def __init__(self, market_data: Broker = None, balance: float = 10_000.0, quote: str = 'USDT',
+                 fee_rate: float = 0.001, slippage_bps: float = 5.0, max_fills: int = 10_000):
+        super().__init__(market_data.exchange if market_data else None,
+                         ticker_ttl=market_data.ticker_snapshot.ttl if market_data else 60.0,
+                         scheduler=market_data.scheduler if market_data else None)
+        if market_data is not None:
+            self.ticker_snapshot = market_data.ticker_snapshot
+        self.market_data = market_data
+        self.quote = quote
+        self.cash = float(balance)
+        self.reserved = 0.0
+        self.fee_rate = fee_rate
+        self.slippage = slippage_bps / 10_000
+
+        self.last_prices = {}
+        self.orders = {}        # open orders only; finished ones live on in `fills`
+        self.positions = {}
+        self.fills = deque(maxlen=max_fills)
+        self.fees_paid = 0.0
+        self.filled_count = 0
+
+        # Per symbol: (buy limits, sell limits, buy stops, sell stops) as heaps of (key, seq, order)
+        self._books = {}
+        self._seq = itertools.count()
+        self._ids = itertools.count(1)
+        self._stale = 0         # cancelled entries still sitting in the heaps
+        self._lock = threading.RLock()
+
+    def connect(self, market_cache=None):
+        if self.market_data is not None and not getattr(self.exchange, 'markets', None):
+            self.market_data.connect(market_cache)
+
+    def safe_fetch_ohlcv(self, symbol, timeframe, limit=100, since=None):
+        return self.market_data.safe_fetch_ohlcv(symbol, timeframe, limit=limit, since=since)
+
+    # === Account views ===
+
+    def get_balance(self, asset: str) -> float:
+        if asset == self.quote:
+            return self.cash - self.reserved
+        position = self.positions.get(f"{asset}/{self.quote}")
+        return max(position.qty, 0.0) if position else 0.0
+
+    def get_open_orders(self, symbol: str = None):
+        return [o.to_dict() for o in self.orders.values() if symbol is None or o.symbol == symbol]
+
+    def get_position(self, symbol: str):
+        position = self.positions.get(symbol) or PaperPosition()
+        last = self.last_prices.get(symbol)
+        unrealized = (last - position.entry_price) * position.qty if last is not None and position.qty else 0.0
+        return {
+            'symbol': symbol,
+            'position': position.qty,
+            'entry_price': position.entry_price,
+            'realized_pnl': position.realized_pnl,
+            'unrealized_pnl': unrealized,
+        }
+
+    def exposure(self, tickers: dict = None) -> dict:
+        """
+        Signed notional of every open position at the last seen price (`tickers` is not needed).
+        """
+        with self._lock:
+            return {s: p.qty * self.last_prices.get(s, p.entry_price) for s, p in self.positions.items() if p.qty}
+
+    def equity(self) -> float:
+        return self.cash + sum(p.qty * self.last_prices.get(s, p.entry_price) for s, p in self.positions.items())
+
+    # === Orders ===
+
+    def _book(self, symbol: str) -> tuple:
+        book = self._books.get(symbol)
+        if book is None:
+            book = self._books[symbol] = ([], [], [], [])
+        return book
+
+    def _market_price(self, symbol: str) -> float:
+        price = self.last_prices.get(symbol)
+        if price is None:
+            if self.exchange is None:
+                raise ValueError(f"No price for {symbol}; feed one with update_price()")
+            price = self.last_prices[symbol] = float(self.fetch_ticker(symbol)['last'])
+        return price
+
+    def place_order(self, symbol: str, side: str, amount: float, price: float = None, type: str = 'market',
+                    take_profit: float = None, stop_loss: float = None, stop_price: float = None):
+        """
+        Place a simulated order and return it as a ccxt-style dict.
+        type: 'market', 'limit' or 'stop' (stop-market at `stop_price`).
+        """
+        if amount <= 0:
+            raise ValueError(f"Invalid order amount {amount}")
+        with self._lock:
+            order = PaperOrder(f"paper-{next(self._ids)}", symbol, side, type, amount, price, stop_price,
+                               timestamp=int(time.time() * 1000))
+            if take_profit is not None or stop_loss is not None:
+                order.bracket = (take_profit, stop_loss)
+
+            if type == 'market':
+                last = self._market_price(symbol)
+                self._fill(order, last * (1 + self.slippage) if side == 'buy' else last * (1 - self.slippage))
+            elif type == 'limit':
+                last = self.last_prices.get(symbol)
+                if last is not None and (last <= price if side == 'buy' else last >= price):
+                    self._fill(order, last)  # marketable limit
+                else:
+                    if side == 'buy':
+                        self._reserve(order, amount * price * (1 + self.fee_rate))
+                    self._rest(order)
+            elif type == 'stop':
+                self._rest(order)
+            else:
+                raise ValueError(f"Unsupported order type '{type}'")
+            return order.to_dict()
+
+    def cancel_order(self, order_id: str, symbol: str = None):
+        with self._lock:
+            order = self.orders.get(order_id)
+            if order is None or order.status != 'open':
+                raise ValueError(f"Order {order_id} is not open")
+            self._cancel(order)
+            return order.to_dict()
+
+    def _reserve(self, order: PaperOrder, cost: float):
+        if cost > self.cash - self.reserved:
+            order.status = 'rejected'
+            raise ValueError(f"Insufficient {self.quote}: need {cost:.2f}, free {self.cash - self.reserved:.2f}")
+        order.reserved = cost
+        self.reserved += cost
+
+    def _rest(self, order: PaperOrder):
+        self.orders[order.id] = order
+        buy_limits, sell_limits, buy_stops, sell_stops = self._book(order.symbol)
+        seq = next(self._seq)
+        if order.type == 'limit':
+            if order.side == 'buy':
+                heapq.heappush(buy_limits, (-order.price, seq, order))
+            else:
+                heapq.heappush(sell_limits, (order.price, seq, order))
+        elif order.side == 'buy':
+            heapq.heappush(buy_stops, (order.stop_price, seq, order))
+        else:
+            heapq.heappush(sell_stops, (-order.stop_price, seq, order))
+
+    def _cancel(self, order: PaperOrder):
+        # Lazy deletion: the heap entry is skipped when it reaches the top
+        order.status = 'canceled'
+        self.orders.pop(order.id, None)
+        self.reserved -= order.reserved
+        order.reserved = 0.0
+        self._stale += 1
+        if self._stale > 10_000 and self._stale > 2 * len(self.orders):
+            self._compact()
+
+    def _compact(self):
+        for book in self._books.values():
+            for heap in book:
+                heap[:] = [entry for entry in heap if entry[2].status == 'open']
+                heapq.heapify(heap)
+        self._stale = 0
+
+    def _fill(self, order: PaperOrder, price: float):
+        self.orders.pop(order.id, None)
+        notional = order.amount * price
+        fee = notional * self.fee_rate
+        if order.side == 'buy':
+            if order.reserved:
+                self.reserved -= order.reserved
+                order.reserved = 0.0
+            position = self.positions.get(order.symbol)
+            covering = position is not None and position.qty < 0
+            if not covering and notional + fee > self.cash - self.reserved:
+                order.status = 'rejected'
+                raise ValueError(f"Insufficient {self.quote} for {order.symbol}: need {notional + fee:.2f}")
+            self.cash -= notional + fee
+            signed = order.amount
+        else:
+            self.cash += notional - fee
+            signed = -order.amount
+
+        position = self.positions.get(order.symbol)
+        if position is None:
+            position = self.positions[order.symbol] = PaperPosition()
+        position.apply(signed, price)
+
+        order.status = 'closed'
+        order.average = price
+        order.fee = fee
+        self.fees_paid += fee
+        self.filled_count += 1
+        self.fills.append((order.timestamp, order.symbol, order.side, order.amount, price, fee, order.id))
+
+        if order.oco is not None and order.oco.status == 'open':
+            self._cancel(order.oco)
+        if order.bracket is not None:
+            self._place_exits(order)
+
+    def _place_exits(self, entry: PaperOrder):
+        take_profit, stop_loss = entry.bracket
+        exit_side = 'sell' if entry.side == 'buy' else 'buy'
+        tp_order = sl_order = None
+        if take_profit is not None:
+            tp_order = PaperOrder(f"paper-{next(self._ids)}", entry.symbol, exit_side, 'limit', entry.amount,
+                                  price=take_profit, timestamp=entry.timestamp)
+        if stop_loss is not None:
+            sl_order = PaperOrder(f"paper-{next(self._ids)}", entry.symbol, exit_side, 'stop', entry.amount,
+                                  stop_price=stop_loss, timestamp=entry.timestamp)
+        if tp_order and sl_order:
+            tp_order.oco, sl_order.oco = sl_order, tp_order
+        for order in (sl_order, tp_order):
+            if order is not None:
+                self._rest(order)
+
+    # === Market data ===
+
+    def update_price(self, symbol: str, price: float, high: float = None, low: float = None):
+        """
+        Feed a trade price (or a candle's close/high/low) and fill any triggered orders.
+        """
+        with self._lock:
+            self.last_prices[symbol] = price
+            book = self._books.get(symbol)
+            if book is None:
+                return
+            high = price if high is None else high
+            low = price if low is None else low
+            buy_limits, sell_limits, buy_stops, sell_stops = book
+
+            # Stops first: when one candle spans both exits the stop loss wins
+            while sell_stops and -sell_stops[0][0] >= low:
+                self._trigger(heapq.heappop(sell_stops)[2], lambda o: min(o.stop_price, high) * (1 - self.slippage))
+            while buy_stops and buy_stops[0][0] <= high:
+                self._trigger(heapq.heappop(buy_stops)[2], lambda o: max(o.stop_price, low) * (1 + self.slippage))
+            while buy_limits and -buy_limits[0][0] >= low:
+                self._trigger(heapq.heappop(buy_limits)[2], lambda o: min(o.price, high))
+            while sell_limits and sell_limits[0][0] <= high:
+                self._trigger(heapq.heappop(sell_limits)[2], lambda o: max(o.price, low))
+
+    def _trigger(self, order: PaperOrder, fill_price):
+        if order.status != 'open':
+            return
+        try:
+            self._fill(order, fill_price(order))
+        except ValueError as e:
+            logger.warning(f"Paper order {order.id} on {order.symbol} rejected: {e}")
+
+    def update_prices(self, prices: dict):
+        for symbol, price in prices.items():
+            self.update_price(symbol, price)
+
+    def on_candle(self, symbol: str, candle):
+        """
+        Apply a [ts, open, high, low, close, volume] candle to the book.
+        """
+        self.update_price(symbol, float(candle[4]), high=float(candle[2]), low=float(candle[3]))
+
+    def summary(self) -> dict:
+        open_positions = {s: p.qty for s, p in self.positions.items() if p.qty}
+        return {
+            'equity': round(self.equity(), 2),
+            'cash': round(self.cash, 2),
+            'fees': round(self.fees_paid, 4),
+            'fills': self.filled_count,
+            'open_orders': len(self.orders),
+            'positions': len(open_positions),
+        }
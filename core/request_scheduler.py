@@ -0,0 +1,176 @@
+# core/request_scheduler.py
+
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+
+from utils import metrics
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+API_WEIGHT = metrics.counter('hawkx_api_weight_total', "Rate-limit tokens consumed per endpoint", ('endpoint',))
+API_BUDGET_USED = metrics.gauge('hawkx_api_budget_used_ratio',
+                                "Share of the endpoint's token bucket in use after the last call", ('endpoint',))
+API_RATE_LIMITED = metrics.counter('hawkx_api_rate_limited_total', "Calls rejected by the exchange rate limiter",
+                                   ('endpoint',))
+API_COALESCED = metrics.counter('hawkx_api_coalesced_total', "Calls served by an identical in-flight request",
+                                ('endpoint',))
+
+# Lower value = served first when requests compete for the same budget
+PRIORITY_ORDER = 0      # place / cancel orders
+PRIORITY_ACCOUNT = 1    # balances, open orders, positions
+PRIORITY_SCAN = 2       # tickers, candles, market metadata
+
+# OKX v5 per-endpoint limits as (requests, per seconds)
+DEFAULT_LIMITS = {
+    'ticker': (20, 2.0),
+    'tickers': (20, 2.0),
+    'candles': (40, 2.0),
+    'markets': (20, 2.0),
+    'balance': (10, 2.0),
+    'open_orders': (60, 2.0),
+    'place_order': (60, 2.0),
+    'cancel_order': (60, 2.0),
+}
+# Overall budget shared by every endpoint; this is where priorities matter most
+DEFAULT_GLOBAL_LIMIT = (20, 1.0)
+
+
+class TokenBucket:
+    def __init__(self, capacity: float, period: float):
+        self.capacity = float(capacity)
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one token is available (0 if available now)."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def drain(self):
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+
+
+class RequestScheduler:
+    """
+    Thread-safe scheduler for exchange REST calls.
+
+    Every call waits for a token from its endpoint's bucket and from a global
+    bucket. Waiting calls are served by priority class (orders before account
+    queries before scan fetches), FIFO within a class. Identical read requests
+    that are already in flight are coalesced: later callers wait for the first
+    call's result instead of issuing their own.
+    """
+
+    def __init__(self, limits: dict = None, global_limit: tuple = DEFAULT_GLOBAL_LIMIT,
+                 retry_exceptions: tuple = (), max_retries: int = 2):
+        limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.buckets = {endpoint: TokenBucket(*limit) for endpoint, limit in limits.items()}
+        self.global_bucket = TokenBucket(*global_limit) if global_limit else None
+        self.retry_exceptions = retry_exceptions
+        self.max_retries = max_retries
+        self.coalesced = 0
+
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._seq = itertools.count()
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+    def _bucket(self, endpoint: str) -> TokenBucket:
+        if endpoint not in self.buckets:
+            self.buckets[endpoint] = TokenBucket(*DEFAULT_LIMITS['ticker'])
+        return self.buckets[endpoint]
+
+    def _acquire(self, endpoint: str, priority: int):
+        bucket = self._bucket(endpoint)
+        with self._cond:
+            entry = (priority, next(self._seq), endpoint)
+            self._waiters.append(entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = max(bucket.wait_time(now), self.global_bucket.wait_time(now) if self.global_bucket else 0.0)
+                    if wait == 0.0 and self._is_next(entry, now):
+                        bucket.take()
+                        if self.global_bucket:
+                            self.global_bucket.take()
+                        API_WEIGHT.inc(endpoint=endpoint)
+                        API_BUDGET_USED.set(1 - bucket.tokens / bucket.capacity, endpoint=endpoint)
+                        return
+                    self._cond.wait(timeout=wait or 0.05)
+            finally:
+                self._waiters.remove(entry)
+                self._cond.notify_all()
+
+    def _is_next(self, entry, now: float) -> bool:
+        """
+        True unless an earlier-ranked waiter could go right now: a higher
+        priority request (or an older one on the same endpoint) takes precedence.
+        """
+        for other in self._waiters:
+            if other >= entry:
+                continue
+            if other[2] == entry[2] or self._bucket(other[2]).wait_time(now) == 0.0:
+                return False
+        return True
+
+    def _execute(self, endpoint, priority, fn, args, kwargs):
+        for attempt in range(self.max_retries + 1):
+            self._acquire(endpoint, priority)
+            try:
+                return fn(*args, **kwargs)
+            except self.retry_exceptions as e:
+                API_RATE_LIMITED.inc(endpoint=endpoint)
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"Rate limited on '{endpoint}', backing off: {e}")
+                with self._cond:
+                    self._bucket(endpoint).drain()
+
+    def call(self, endpoint: str, fn, *args, priority: int = PRIORITY_SCAN, coalesce: bool = True, **kwargs):
+        """
+        Run `fn(*args, **kwargs)` once the rate limits allow it. Concurrent calls
+        of the same `fn` with the same arguments share one request.
+        """
+        if not coalesce:
+            return self._execute(endpoint, priority, fn, args, kwargs)
+
+        key = (endpoint, fn, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return self._execute(endpoint, priority, fn, args, kwargs)
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+                API_COALESCED.inc(endpoint=endpoint)
+        if not owner:
+            return future.result()
+
+        try:
+            result = self._execute(endpoint, priority, fn, args, kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
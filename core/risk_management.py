@@ -1,18 +1,200 @@
 
-def calculate_position_size(capital: float, entry_price: float, stop_loss_price: float) -> float:
+import numpy as np
+
+
+def calculate_position_size(capital: float, entry_price: float, stop_loss_price: float,
+                            risk_fraction: float = 0.02) -> float:
     # e.g., risk 2% of capital per trade
-    risk_per_trade = capital * 0.02
+    risk_per_trade = capital * risk_fraction
     stop_loss_amount = abs(entry_price - stop_loss_price)
     position_size = risk_per_trade / stop_loss_amount if stop_loss_amount else 0
     return round(position_size, 4)
 
-def calculate_tp_sl(price: float, volatility: float, signal: str) -> tuple:
+def calculate_tp_sl(price: float, volatility: float, signal: str, multiplier: float = 0.5) -> tuple:
     if signal == "BUY":
-        tp = price + volatility * 0.5
-        sl = price - volatility * 0.5
+        tp = price + volatility * multiplier
+        sl = price - volatility * multiplier
     elif signal == "SELL":
-        tp = price - volatility * 0.5
-        sl = price + volatility * 0.5
+        tp = price - volatility * multiplier
+        sl = price + volatility * multiplier
     else:
         tp = sl = price  # fallback
     return round(tp, 4), round(sl, 4)
+
+
+class RollingCovariance:
+    """
+    Rolling covariance of per-observation log returns for a growing universe.
+
+    Returns live in a (window, symbols) ring buffer next to running sums and
+    cross-products, so each observation costs one outer product instead of a
+    full recompute. The sums are rebuilt from the ring once per window to shed
+    floating-point drift. A symbol without a quote in an observation counts a
+    flat return; correlations are only reported once it has `min_periods` real ones.
+    """
+
+    def __init__(self, window: int = 288, min_periods: int = 30):
+        self.window = window
+        self.min_periods = min_periods
+        self.index = {}                              # symbol -> column
+        self.last_price = np.empty(0)
+        self.returns = np.zeros((window, 0))
+        self.valid = np.zeros((window, 0), dtype=bool)
+        self.sum = np.zeros(0)
+        self.cross = np.zeros((0, 0))
+        self.observed = np.zeros(0, dtype=np.int64)  # real returns per symbol inside the window
+        self.bars = 0
+        self.updates = 0
+        self._pos = 0
+
+    def _grow(self, symbols: list):
+        n = len(self.index)
+        for i, symbol in enumerate(symbols):
+            self.index[symbol] = n + i
+        k = len(symbols)
+        self.last_price = np.concatenate([self.last_price, np.full(k, np.nan)])
+        self.returns = np.hstack([self.returns, np.zeros((self.window, k))])
+        self.valid = np.hstack([self.valid, np.zeros((self.window, k), dtype=bool)])
+        self.sum = np.concatenate([self.sum, np.zeros(k)])
+        self.observed = np.concatenate([self.observed, np.zeros(k, dtype=np.int64)])
+        cross = np.zeros((n + k, n + k))
+        cross[:n, :n] = self.cross
+        self.cross = cross
+
+    def update(self, prices: dict):
+        """
+        Add one observation of {symbol: price}.
+        """
+        new = [s for s in prices if s not in self.index]
+        if new:
+            self._grow(new)
+        p = np.full(len(self.index), np.nan)
+        p[[self.index[s] for s in prices]] = np.array(list(prices.values()), dtype=float)
+
+        valid = np.isfinite(p) & np.isfinite(self.last_price) & (p > 0) & (self.last_price > 0)
+        r = np.zeros(len(p))
+        r[valid] = np.log(p[valid] / self.last_price[valid])
+        self.last_price = np.where(np.isfinite(p) & (p > 0), p, self.last_price)
+
+        old_r, old_v = self.returns[self._pos], self.valid[self._pos]
+        self.sum += r - old_r
+        self.cross += np.outer(r, r) - np.outer(old_r, old_r)
+        self.observed += valid.astype(np.int64) - old_v
+        self.returns[self._pos], self.valid[self._pos] = r, valid
+        self._pos = (self._pos + 1) % self.window
+        self.bars = min(self.bars + 1, self.window)
+
+        self.updates += 1
+        if self.updates % self.window == 0:
+            self.sum = self.returns.sum(axis=0)
+            self.cross = self.returns.T @ self.returns
+
+    def covariance(self, symbols: list) -> np.ndarray:
+        idx = [self.index.get(s, -1) for s in symbols]
+        known = np.array([i >= 0 for i in idx], dtype=bool)
+        cov = np.zeros((len(symbols), len(symbols)))
+        if self.bars < 2 or not known.any():
+            return cov
+        cols = np.array(idx)[known]
+        sub = self.cross[np.ix_(cols, cols)] - np.outer(self.sum[cols], self.sum[cols]) / self.bars
+        cov[np.ix_(known, known)] = sub / (self.bars - 1)
+        return cov
+
+    def correlation(self, symbols: list) -> np.ndarray:
+        """
+        Correlation matrix for `symbols`; 0 off the diagonal where history is too short.
+        """
+        cov = self.covariance(symbols)
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        enough = np.array([self.index.get(s) is not None and self.observed[self.index[s]] >= self.min_periods
+                           for s in symbols], dtype=bool) & (std > 0)
+        corr = np.zeros_like(cov)
+        both = np.outer(enough, enough)
+        corr[both] = (cov / np.outer(np.where(enough, std, 1), np.where(enough, std, 1)))[both]
+        np.fill_diagonal(corr, 1.0)
+        return np.clip(corr, -1.0, 1.0)
+
+
+class PortfolioRiskEngine:
+    """
+    Sizes all of a cycle's signals together under portfolio-level limits.
+
+    Each signal starts at the usual fixed-risk size (`risk_per_trade` of
+    capital to its stop), then is scaled down, never up, by:
+      - correlation: signals whose same-direction return correlation exceeds
+        `max_correlation` share one signal's worth of exposure between them;
+      - sector: gross notional per sector <= `max_sector` x capital;
+      - net: |long - short| <= `max_net` x capital;
+      - gross: long + short <= `max_gross` x capital.
+    Caps include the existing `exposure` ({symbol: signed notional}), e.g.
+    open paper positions or the live account's spot holdings. Symbols without a configured sector are their own.
+    """
+
+    def __init__(self, capital: float, risk_per_trade: float = 0.02, max_gross: float = 3.0, max_net: float = 2.0,
+                 max_sector: float = 1.0, max_correlation: float = 0.7, sectors: dict = None, window: int = 288,
+                 min_periods: int = 30):
+        self.capital = capital
+        self.risk_per_trade = risk_per_trade
+        self.max_gross = max_gross
+        self.max_net = max_net
+        self.max_sector = max_sector
+        self.max_correlation = max_correlation
+        # {sector: [base assets]} -> {base asset: sector}
+        self.sectors = {asset: sector for sector, assets in (sectors or {}).items() for asset in assets}
+        self.returns = RollingCovariance(window, min_periods)
+        self.exposure = {}
+
+    def observe(self, prices: dict):
+        self.returns.update(prices)
+
+    def sector_of(self, symbol: str) -> str:
+        base = symbol.split('/')[0]
+        return self.sectors.get(base, base)
+
+    def size(self, signals: list) -> np.ndarray:
+        """
+        `signals` is a list of (symbol, side, entry_price, stop_loss); returns the position sizes.
+        """
+        if not signals:
+            return np.zeros(0)
+        symbols = [s[0] for s in signals]
+        direction = np.array([1.0 if s[1] in ('BUY', 'buy') else -1.0 for s in signals])
+        entry = np.array([s[2] for s in signals], dtype=float)
+        stop_distance = np.abs(entry - np.array([s[3] for s in signals], dtype=float))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            qty = np.where(stop_distance > 0, self.capital * self.risk_per_trade / stop_distance, 0.0)
+        notional = qty * entry
+
+        # Correlated same-direction signals split one signal's exposure between them
+        corr = self.returns.correlation(symbols) * np.outer(direction, direction)
+        notional = notional / (corr > self.max_correlation).sum(axis=1)
+
+        existing = self.exposure
+        sectors = [self.sector_of(s) for s in symbols]
+        labels, ids = np.unique(sectors, return_inverse=True)
+        used = np.array([sum(abs(v) for s, v in existing.items() if self.sector_of(s) == label) for label in labels])
+        notional = notional * self._cap(np.bincount(ids, weights=notional, minlength=len(labels)),
+                                        self.max_sector * self.capital - used)[ids]
+
+        net = sum(existing.values())
+        cap = self.max_net * self.capital
+        longs, shorts = notional[direction > 0].sum(), notional[direction < 0].sum()
+        if net + longs - shorts > cap and longs > 0:
+            notional[direction > 0] *= np.clip((cap - net + shorts) / longs, 0, 1)
+        elif net + longs - shorts < -cap and shorts > 0:
+            notional[direction < 0] *= np.clip((net + longs + cap) / shorts, 0, 1)
+
+        gross = sum(abs(v) for v in existing.values())
+        notional = notional * self._cap(notional.sum(), self.max_gross * self.capital - gross)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.round(np.where(entry > 0, notional / entry, 0.0), 4)
+
+    @staticmethod
+    def _cap(used, allowed):
+        """
+        Scale factor in [0, 1] that brings `used` within `allowed`.
+        """
+        used, allowed = np.asarray(used, dtype=float), np.clip(np.asarray(allowed, dtype=float), 0, None)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(used > allowed, allowed / used, 1.0)
@@ -0,0 +1,74 @@
+# core/scanner.py
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class MarketScanner:
+    """
+    Runs a scan over many symbols concurrently.
+
+    Blocking exchange calls (ccxt, pandas) are dispatched to a bounded worker
+    pool so the event loop can keep many symbols and timeframes in flight at
+    once. Each symbol gets its own timeout and the whole scan can be cancelled.
+    """
+
+    def __init__(self, max_concurrency: int = 16, symbol_timeout: float = 30.0):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.symbol_timeout = symbol_timeout
+        self.executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="scan")
+        self._semaphore = None
+        self._tasks = set()
+
+    async def run_blocking(self, fn, *args, **kwargs):
+        """
+        Run a blocking callable on the worker pool and await its result.
+        """
+        loop = asyncio.get_running_loop()
+        # Carry the caller's context (e.g. the scan cycle ID) into the worker thread
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self.executor, partial(context.run, fn, *args, **kwargs))
+
+    async def _run_one(self, symbol, coro_factory):
+        async with self._semaphore:
+            try:
+                return await asyncio.wait_for(coro_factory(symbol), timeout=self.symbol_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Scan of {symbol} timed out after {self.symbol_timeout}s")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Scan of {symbol} failed: {e}")
+            return None
+
+    async def scan(self, symbols, coro_factory) -> dict:
+        """
+        Run `coro_factory(symbol)` for every symbol with at most `max_concurrency`
+        symbols in flight. Returns a dict of symbol -> result (None on failure).
+        """
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = {symbol: asyncio.create_task(self._run_one(symbol, coro_factory)) for symbol in symbols}
+        self._tasks = set(tasks.values())
+        try:
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+        finally:
+            self._tasks = set()
+
+        return {symbol: task.result() for symbol, task in tasks.items() if not task.cancelled()}
+
+    def cancel(self):
+        """
+        Cancel all in-flight symbol tasks of the current scan.
+        """
+        for task in self._tasks:
+            task.cancel()
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
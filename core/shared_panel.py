@@ -0,0 +1,144 @@
+# core/shared_panel.py
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from core.signal_engine import SignalEngine, SignalResult
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+OHLCV_FIELDS = 6
+CLOSE = 4
+
+
+class SharedCandlePanel:
+    """
+    A (symbols, bars, 6) float64 OHLCV array in POSIX shared memory.
+
+    Histories are right-aligned on the last bar and left-padded with NaN, the
+    same layout as `build_close_panel`. Worker processes attach by name via
+    `descriptor()` and read the candles in place, so nothing is pickled.
+    The creating process owns the block and must `release()` it.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, symbols: list, bars: int, owner: bool):
+        self.shm = shm
+        self.symbols = symbols
+        self.bars = bars
+        self.owner = owner
+        self.array = np.ndarray((len(symbols), bars, OHLCV_FIELDS), dtype=np.float64, buffer=shm.buf)
+
+    @classmethod
+    def create(cls, rows_by_symbol: dict, bars: int = None):
+        """
+        Copy {symbol: (n, 6) array} into a new shared block.
+        """
+        symbols = [s for s, rows in rows_by_symbol.items() if rows is not None and len(rows)]
+        bars = bars or max((len(rows_by_symbol[s]) for s in symbols), default=1)
+        size = max(len(symbols) * bars * OHLCV_FIELDS * 8, 1)
+        panel = cls(shared_memory.SharedMemory(create=True, size=size), symbols, bars, owner=True)
+        panel.array.fill(np.nan)
+        for i, symbol in enumerate(symbols):
+            rows = np.asarray(rows_by_symbol[symbol], dtype=np.float64)[-bars:]
+            panel.array[i, bars - len(rows):] = rows
+        return panel
+
+    @classmethod
+    def attach(cls, descriptor: tuple):
+        name, symbols, bars = descriptor
+        # Pool workers share the creator's resource tracker, so the attach-time
+        # registration (Python < 3.13) is a no-op and the creator still unlinks
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, symbols, bars, owner=False)
+
+    def descriptor(self) -> tuple:
+        return self.shm.name, self.symbols, self.bars
+
+    def closes(self, start: int = 0, stop: int = None) -> np.ndarray:
+        return self.array[start:stop, :, CLOSE]
+
+    def release(self):
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# === Worker side ===
+
+_engine = None
+
+
+def _init_worker(strategy_name: str):
+    global _engine
+    _engine = SignalEngine(strategy_name=strategy_name)
+
+
+def _evaluate_shard(descriptor: tuple, start: int, stop: int) -> list:
+    """
+    Evaluate rows [start, stop) of a shared panel; returns plain tuples to keep the reply small.
+    """
+    panel = SharedCandlePanel.attach(descriptor)
+    try:
+        shard = panel.array[start:stop]
+        fields = {'open': shard[:, :, 1], 'high': shard[:, :, 2], 'low': shard[:, :, 3], 'volume': shard[:, :, 5]}
+        results = _engine.generate_batch(panel.symbols[start:stop], panel.closes(start, stop), fields)
+        return [(symbol, r.signal, r.rsi, r.macd, r.macd_diff, r.ema_50, r.entry_price)
+                for symbol, r in results.items()]
+    finally:
+        panel.release()
+
+
+# === Main process side ===
+
+class ShardedEvaluator:
+    """
+    Evaluates the strategy for a whole universe across a pool of worker processes.
+
+    Candles are written once into a SharedCandlePanel per timeframe; the
+    universe is split into contiguous shards (a few per worker, to smooth out
+    uneven shards) and each worker runs the vectorized SignalEngine batch path
+    on its slice. The pool is created once and reused across scan cycles.
+    """
+
+    def __init__(self, workers: int = None, strategy_name: str = 'rsi_macd', shards_per_worker: int = 2,
+                 min_shard: int = 32):
+        self.workers = workers or os.cpu_count() or 1
+        self.shards_per_worker = shards_per_worker
+        self.min_shard = min_shard
+        # spawn: the scanner process runs threads (executor, SMTP, market refresh) that fork would copy mid-flight
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                        initializer=_init_worker, initargs=(strategy_name,))
+
+    def shards(self, n: int) -> list:
+        count = max(1, min(self.workers * self.shards_per_worker, n // self.min_shard or 1))
+        bounds = np.linspace(0, n, count + 1).astype(int)
+        return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+    async def evaluate(self, rows_by_symbol: dict, bars: int = None) -> dict:
+        """
+        Returns {symbol: SignalResult} for every symbol with candles.
+        """
+        panel = SharedCandlePanel.create(rows_by_symbol, bars)
+        try:
+            if not panel.symbols:
+                return {}
+            descriptor = panel.descriptor()
+            futures = [asyncio.wrap_future(self.pool.submit(_evaluate_shard, descriptor, start, stop))
+                       for start, stop in self.shards(len(panel.symbols))]
+            results = {}
+            for shard in await asyncio.gather(*futures):
+                for symbol, *values in shard:
+                    results[symbol] = SignalResult(*values)
+            return results
+        finally:
+            panel.release()
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
@@ -1,11 +1,50 @@
 # core/signal_engine.py
 
+import numpy as np
 import pandas as pd
-from strategies.rsi_macd_strategy import RSIMACDStrategy
+from data.candle_buffer import CandleBuffer
+from strategies.indicators import IndicatorState, ema_panel, macd_panel, rsi_panel
+from strategies.registry import build_strategy
+from strategies.rules import RuleSet
+from utils import metrics
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+SIGNAL_LABELS = {1: 'BUY', -1: 'SELL', 0: None}
+PANEL_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def build_close_panel(frames: dict, length: int = None) -> tuple:
+    """
+    Stack the close series of {symbol: DataFrame} into a right-aligned
+    (symbols, time) array, left-padding shorter histories with NaN.
+    Returns (symbols, closes).
+    """
+    symbols = [s for s, df in frames.items() if df is not None and not df.empty]
+    length = length or max((len(frames[s]) for s in symbols), default=0)
+    closes = np.full((len(symbols), length), np.nan)
+    for row, symbol in enumerate(symbols):
+        values = frames[symbol]['close'].to_numpy(dtype=float)[-length:]
+        closes[row, length - len(values):] = values
+    return symbols, closes
+
+
+def build_ohlcv_panel(frames: dict, length: int = None) -> tuple:
+    """
+    Like build_close_panel, but stacks every candle field, for strategies
+    whose rules read more than closes. Returns (symbols, closes, fields) with
+    `fields` holding the open/high/low/volume arrays generate_batch takes.
+    """
+    symbols = [s for s, df in frames.items() if df is not None and not df.empty]
+    length = length or max((len(frames[s]) for s in symbols), default=0)
+    panel = np.full((len(PANEL_FIELDS), len(symbols), length), np.nan)
+    for row, symbol in enumerate(symbols):
+        values = frames[symbol][list(PANEL_FIELDS)].to_numpy(dtype=float)[-length:].T
+        panel[:, row, length - values.shape[1]:] = values
+    fields = dict(zip(PANEL_FIELDS, panel))
+    return symbols, fields.pop('close'), fields
+
 
 class SignalResult:
     def __init__(self, signal, rsi, macd, macd_diff, ema_50, entry_price):
@@ -16,16 +55,37 @@ class SignalResult:
         self.ema_50 = ema_50
         self.entry_price = entry_price
 
+    def to_dict(self) -> dict:
+        return {
+            'signal': self.signal,
+            'rsi': float(self.rsi),
+            'macd': float(self.macd),
+            'macd_diff': float(self.macd_diff),
+            'ema_50': float(self.ema_50),
+            'entry_price': float(self.entry_price),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(**data)
+
 
 class SignalEngine:
     def __init__(self, strategy_name="rsi_macd", **kwargs):
-        if strategy_name == "rsi_macd":
-            self.strategy = RSIMACDStrategy(**kwargs)
-        else:
-            raise NotImplementedError(f"Strategy '{strategy_name}' not supported.")
+        # A registered name, or a list of names evaluated together (see strategies.registry)
+        self.strategy = build_strategy(strategy_name, **kwargs)
+        self.indicator_states = {}
 
-    def generate(self, df: pd.DataFrame) -> SignalResult:
-        signal, meta = self.strategy.generate_signal(df)
+    def generate(self, df) -> SignalResult:
+        """
+        Evaluate the strategy on the last candle of a DataFrame or CandleBuffer.
+        Buffers are evaluated on their column views, without building a DataFrame.
+        """
+        if isinstance(df, CandleBuffer):
+            fields = {name: df.column(name)[None, :] for name in ('open', 'high', 'low', 'volume')}
+            return self.generate_batch([None], df.close[None, :], fields)[None]
+        with metrics.timed('signal.generate'):
+            signal, meta = self.strategy.generate_signal(df)
         return SignalResult(
             signal=signal,
             rsi=meta['rsi'],
@@ -34,3 +94,97 @@ class SignalEngine:
             ema_50=meta['ema_50'],
             entry_price=meta['entry_price']
         )
+
+    def indicator_panels(self, closes: np.ndarray) -> dict:
+        """
+        Full-history RSI(14), MACD and EMA(50) panels for a (symbols, time) close array.
+        """
+        macd, macd_signal, macd_diff = macd_panel(closes)
+        return {
+            'rsi': rsi_panel(closes, 14),
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_diff': macd_diff,
+            'ema_50': ema_panel(closes, 2 / 51, 50)
+        }
+
+    def generate_batch(self, symbols: list, closes: np.ndarray, fields: dict = None) -> dict:
+        """
+        Evaluate the strategy for every symbol in one vectorized pass.
+
+        `closes` is a (len(symbols), time) array aligned on its last column, as
+        built by `build_close_panel`. Rule strategies that use other candle
+        fields need them in `fields` ({'high': array, ...}, same shape), as
+        built by `build_ohlcv_panel`.
+        Returns {symbol: SignalResult}.
+        """
+        closes = np.asarray(closes, dtype=np.float64)
+        with metrics.timed('signal.generate_batch'):
+            if isinstance(self.strategy, RuleSet):
+                signals, _, last = self.strategy.evaluate({**(fields or {}), 'close': closes})
+                entry = last['entry_price']
+            else:
+                panels = self.indicator_panels(closes)
+                last = {name: panel[:, -1] for name, panel in panels.items()}
+                entry = closes[:, -1]
+                signals = self.strategy.evaluate_panel(last['rsi'], last['macd_diff'], entry, last['ema_50'])
+
+        return {
+            symbol: SignalResult(
+                signal=SIGNAL_LABELS[int(signals[i])],
+                rsi=float(last['rsi'][i]),
+                macd=float(last['macd'][i]),
+                macd_diff=float(last['macd_diff'][i]),
+                ema_50=float(last['ema_50'][i]),
+                entry_price=float(entry[i])
+            )
+            for i, symbol in enumerate(symbols)
+        }
+
+    def generate_incremental(self, symbol: str, timeframe: str, df) -> SignalResult:
+        """
+        Produce a SignalResult from per-symbol/timeframe indicator state.
+
+        Only candles newer than the state are consumed; the last row is treated
+        as the still-forming candle and evaluated without being committed. The
+        state is rebuilt from `df` when it does not overlap the stored state.
+        `df` may be a DataFrame or a CandleBuffer.
+        """
+        if isinstance(self.strategy, RuleSet):
+            # Rules may use any indicator, so there is no per-symbol state to advance
+            return self.generate(df)
+
+        key = f"{symbol}|{timeframe}"
+        if isinstance(df, CandleBuffer):
+            timestamps, closes = df.timestamp.astype(np.int64), df.close
+        else:
+            timestamps = df.index.as_unit('ms').asi8 if isinstance(df.index, pd.DatetimeIndex) else df.index.to_numpy()
+            closes = df['close'].to_numpy(dtype=float)
+
+        state = self.indicator_states.get(key)
+        start = 0
+        if state is not None and state.last_ts is not None:
+            pos = np.searchsorted(timestamps, state.last_ts)
+            if pos < len(timestamps) - 1 and timestamps[pos] == state.last_ts:
+                start = pos + 1
+            else:
+                state = None
+        if state is None:
+            state = IndicatorState()
+            self.indicator_states[key] = state
+
+        with metrics.timed('signal.incremental'):
+            for ts, close in zip(timestamps[start:-1], closes[start:-1]):
+                state.update(ts, close)
+            meta = state.peek(closes[-1])
+            signal = self.strategy.evaluate(meta['rsi'], meta['macd_diff'], meta['entry_price'], meta['ema_50'])
+        return SignalResult(signal=signal, **meta)
+
+    def export_indicator_state(self) -> dict:
+        """
+        Serializable snapshot of all indicator states, e.g. for DataStorage.save_signal_json.
+        """
+        return {key: state.to_dict() for key, state in self.indicator_states.items()}
+
+    def load_indicator_state(self, data: dict):
+        self.indicator_states = {key: IndicatorState.from_dict(value) for key, value in (data or {}).items()}
@@ -0,0 +1,273 @@
+# HawkX/dashboards/analytics.py
+
+import argparse
+import hashlib
+import html
+import io
+import json
+import logging
+import os
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# performance_log.csv has no header; `pnl` is optional and treated as 0 when missing
+LOG_COLUMNS = ["timestamp", "symbol", "signal", "result", "pnl"]
+HEAD_BYTES = 256
+
+
+def _empty_state() -> dict:
+    return {'offset': 0, 'head': hashlib.sha1(b'').hexdigest(), 'rows': 0, 'results': {}, 'symbols': {}, 'daily': {}}
+
+
+def _add(target: dict, key: str, values: dict):
+    bucket = target.setdefault(key, {})
+    for field, value in values.items():
+        bucket[field] = bucket.get(field, 0) + value
+
+
+class PerformanceRollup:
+    """
+    Incremental win/loss, per-symbol and daily PnL rollups over performance_log.csv.
+
+    The log is read in byte blocks starting from the offset saved with the
+    rollup, so each update only parses rows appended since the last one. A
+    trailing partial line (still being written) is left for the next update.
+    If the log was truncated or replaced, the rollup is rebuilt from scratch.
+    """
+
+    def __init__(self, log_path, state_path=None, block_size: int = 32 * 1024 * 1024):
+        self.log_path = Path(log_path)
+        self.state_path = Path(state_path) if state_path else self.log_path.with_suffix('.rollup.json')
+        self.block_size = block_size
+        self.state = self._load_state()
+
+    def _load_state(self) -> dict:
+        if self.state_path.exists():
+            try:
+                with open(self.state_path, 'r') as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable rollup state {self.state_path}: {e}")
+        return _empty_state()
+
+    def save(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def reset(self):
+        self.state = _empty_state()
+
+    @staticmethod
+    def _head_hash(f, length: int) -> str:
+        f.seek(0)
+        return hashlib.sha1(f.read(min(length, HEAD_BYTES))).hexdigest()
+
+    def update(self) -> int:
+        """
+        Fold rows appended since the last update into the rollup; returns how many were added.
+        """
+        if not self.log_path.exists():
+            return 0
+
+        added = 0
+        with open(self.log_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            # Compare the already-processed prefix to detect a replaced file of similar size
+            if size < self.state['offset'] or self._head_hash(f, self.state['offset']) != self.state['head']:
+                logger.info(f"{self.log_path} was truncated or replaced; rebuilding rollup")
+                self.reset()
+
+            f.seek(self.state['offset'])
+            pending = b''
+            while True:
+                block = f.read(self.block_size)
+                if not block:
+                    break
+                block = pending + block
+                cut = block.rfind(b'\n') + 1
+                pending = block[cut:]
+                if cut:
+                    added += self._fold(block[:cut])
+                    self.state['offset'] += cut
+            self.state['head'] = self._head_hash(f, self.state['offset'])
+
+        self.state['rows'] += added
+        if added:
+            self.save()
+        return added
+
+    def _fold(self, data: bytes) -> int:
+        df = pd.read_csv(io.BytesIO(data), header=None, names=LOG_COLUMNS, index_col=False,
+                         skip_blank_lines=True)
+        if df.empty:
+            return 0
+        df['result'] = df['result'].fillna('UNKNOWN').astype(str).str.upper()
+        df['pnl'] = pd.to_numeric(df['pnl'], errors='coerce').fillna(0.0)
+        df['win'] = (df['result'] == 'WIN').astype(int)
+        df['loss'] = (df['result'] == 'LOSS').astype(int)
+        df['date'] = pd.to_datetime(df['timestamp'], errors='coerce', format='mixed').dt.strftime('%Y-%m-%d')
+
+        for result, count in df['result'].value_counts().items():
+            self.state['results'][result] = self.state['results'].get(result, 0) + int(count)
+
+        by_symbol = df.groupby('symbol').agg(trades=('result', 'size'), wins=('win', 'sum'),
+                                             losses=('loss', 'sum'), pnl=('pnl', 'sum'))
+        for symbol, row in by_symbol.iterrows():
+            _add(self.state['symbols'], str(symbol), {'trades': int(row['trades']), 'wins': int(row['wins']),
+                                                      'losses': int(row['losses']), 'pnl': float(row['pnl'])})
+
+        by_day = df.dropna(subset=['date']).groupby('date').agg(trades=('result', 'size'), wins=('win', 'sum'),
+                                                                pnl=('pnl', 'sum'))
+        for day, row in by_day.iterrows():
+            _add(self.state['daily'], day, {'trades': int(row['trades']), 'wins': int(row['wins']),
+                                            'pnl': float(row['pnl'])})
+        return len(df)
+
+    # === Views ===
+
+    def symbols_frame(self) -> pd.DataFrame:
+        df = pd.DataFrame.from_dict(self.state['symbols'], orient='index',
+                                    columns=['trades', 'wins', 'losses', 'pnl'])
+        decided = df['wins'] + df['losses']
+        df['hit_rate'] = (df['wins'] / decided.where(decided > 0)).fillna(0.0)
+        return df.sort_values('pnl', ascending=False)
+
+    def daily_frame(self) -> pd.DataFrame:
+        df = pd.DataFrame.from_dict(self.state['daily'], orient='index', columns=['trades', 'wins', 'pnl'])
+        df = df.sort_index()
+        df['cumulative_pnl'] = df['pnl'].cumsum()
+        return df
+
+    def summary(self) -> dict:
+        results = self.state['results']
+        wins, losses = results.get('WIN', 0), results.get('LOSS', 0)
+        return {
+            'trades': self.state['rows'],
+            'wins': wins,
+            'losses': losses,
+            'hit_rate': round(wins / (wins + losses), 4) if wins + losses else 0.0,
+            'pnl': round(sum(s['pnl'] for s in self.state['symbols'].values()), 4),
+            'symbols': len(self.state['symbols']),
+        }
+
+
+# === Rendering ===
+
+def render_png(rollup: PerformanceRollup, out_dir, top: int = 10) -> list:
+    """
+    Write the dashboard charts as PNG files (headless Agg backend); returns the paths.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+
+    def save(fig, name):
+        path = out_dir / name
+        fig.tight_layout()
+        fig.savefig(path)
+        plt.close(fig)
+        paths.append(str(path))
+
+    results = pd.Series(rollup.state['results'], dtype=float)
+    fig, ax = plt.subplots(figsize=(6, 6))
+    if not results.empty:
+        ax.pie(results, labels=results.index, autopct='%1.1f%%', startangle=140)
+    ax.set_title("Trade Result Distribution (Win/Loss/Other)")
+    save(fig, 'results.png')
+
+    symbols = rollup.symbols_frame()
+    fig, ax = plt.subplots(figsize=(10, 6))
+    if not symbols.empty:
+        symbols['wins'].sort_values(ascending=False).head(top).plot(kind='bar', color='green', ax=ax)
+    ax.set_title("Top Performing Symbols (by WIN count)")
+    ax.set_xlabel("Symbol")
+    ax.set_ylabel("Number of WINs")
+    ax.tick_params(axis='x', rotation=45)
+    save(fig, 'top_symbols.png')
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    extremes = pd.concat([symbols['pnl'].head(top), symbols['pnl'].tail(top)])
+    extremes = extremes[~extremes.index.duplicated()]
+    if not extremes.empty:
+        extremes.plot(kind='bar', color=['green' if v >= 0 else 'red' for v in extremes], ax=ax)
+    ax.set_title("PnL by Symbol (best and worst)")
+    ax.tick_params(axis='x', rotation=45)
+    save(fig, 'symbol_pnl.png')
+
+    daily = rollup.daily_frame()
+    fig, ax = plt.subplots(figsize=(10, 4))
+    if not daily.empty:
+        daily['cumulative_pnl'].plot(ax=ax)
+    ax.set_title("Cumulative PnL")
+    save(fig, 'cumulative_pnl.png')
+    return paths
+
+
+def render_html(rollup: PerformanceRollup, out_dir, images: list = None, top: int = 50) -> str:
+    """
+    Write a self-contained HTML report (summary plus per-symbol table); returns its path.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    summary = rollup.summary()
+    symbols = rollup.symbols_frame().head(top)
+
+    rows = ''.join(
+        f"<tr><td>{html.escape(str(symbol))}</td><td>{r.trades}</td><td>{r.wins}</td><td>{r.losses}</td>"
+        f"<td>{r.hit_rate:.1%}</td><td>{r.pnl:.2f}</td></tr>"
+        for symbol, r in symbols.iterrows()
+    )
+    charts = ''.join(f'<img src="{html.escape(Path(p).name)}">' for p in images or [])
+    page = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>HawkX Performance</title>
+<style>body{{font-family:sans-serif}} table{{border-collapse:collapse}} td,th{{border:1px solid #ccc;padding:4px 8px}}
+img{{max-width:48%;margin:4px}}</style></head>
+<body>
+<h1>HawkX Performance</h1>
+<p>Trades: {summary['trades']} &middot; Wins: {summary['wins']} &middot; Losses: {summary['losses']}
+&middot; Hit rate: {summary['hit_rate']:.1%} &middot; PnL: {summary['pnl']:.2f}</p>
+{charts}
+<h2>Top {len(symbols)} symbols by PnL</h2>
+<table><tr><th>Symbol</th><th>Trades</th><th>Wins</th><th>Losses</th><th>Hit rate</th><th>PnL</th></tr>{rows}</table>
+</body></html>
+"""
+    path = out_dir / 'performance.html'
+    path.write_text(page)
+    return str(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render HawkX performance analytics from performance_log.csv")
+    parser.add_argument('--log', default='dashboards/performance_log.csv', help="Performance log CSV")
+    parser.add_argument('--state', help="Rollup state file (default: <log>.rollup.json)")
+    parser.add_argument('--out', default='dashboards/reports', help="Output directory for PNG/HTML files")
+    parser.add_argument('--format', nargs='+', choices=['png', 'html'], default=['png', 'html'])
+    parser.add_argument('--rebuild', action='store_true', help="Discard the saved rollup and re-read the whole log")
+    args = parser.parse_args(argv)
+
+    rollup = PerformanceRollup(args.log, state_path=args.state)
+    if args.rebuild:
+        rollup.reset()
+    added = rollup.update()
+    print(f"Processed {added} new rows ({rollup.state['rows']} total)")
+    print(json.dumps(rollup.summary(), indent=2))
+
+    images = render_png(rollup, args.out) if 'png' in args.format else []
+    for path in images:
+        print(f"Wrote {path}")
+    if 'html' in args.format:
+        print(f"Wrote {render_html(rollup, args.out, images)}")
+
+
+if __name__ == '__main__':
+    main()
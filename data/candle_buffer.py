@@ -0,0 +1,117 @@
+# HawkX/data/candle_buffer.py
+
+import numpy as np
+import pandas as pd
+
+from data.candle_store import OHLCV_COLUMNS
+
+_COLUMN = {name: i for i, name in enumerate(OHLCV_COLUMNS)}
+
+
+class CandleBuffer:
+    """
+    Fixed-capacity OHLCV ring buffer for one symbol/timeframe.
+
+    Candles live in one float64 (6, 2 * capacity) array, one row per
+    OHLCV_COLUMNS field. Every candle is written twice, `capacity` slots
+    apart, so the last `len(self)` candles are always a contiguous slice:
+    appending is O(1) and the column properties (`close`, `timestamp`, ...)
+    are zero-copy views. Views are only valid until the next write; use
+    `to_frame()` for a DataFrame copy.
+
+    It also behaves as a sequence of [ts, open, high, low, close, volume] rows.
+    """
+
+    __slots__ = ('capacity', '_data', '_head', '_len')
+
+    def __init__(self, capacity: int, rows=None):
+        if capacity < 1:
+            raise ValueError("CandleBuffer capacity must be at least 1")
+        self.capacity = capacity
+        self._data = np.full((len(OHLCV_COLUMNS), 2 * capacity), np.nan)
+        self._head = 0
+        self._len = 0
+        if rows is not None:
+            self.extend(rows)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def columns(self) -> np.ndarray:
+        """(6, n) view of the buffered candles, oldest first."""
+        return self._data[:, self._head:self._head + self._len]
+
+    def column(self, name: str) -> np.ndarray:
+        return self._data[_COLUMN[name], self._head:self._head + self._len]
+
+    timestamp = property(lambda self: self.column('timestamp'))
+    open = property(lambda self: self.column('open'))
+    high = property(lambda self: self.column('high'))
+    low = property(lambda self: self.column('low'))
+    close = property(lambda self: self.column('close'))
+    volume = property(lambda self: self.column('volume'))
+
+    def __getitem__(self, index):
+        return self.columns().T[index]
+
+    def __iter__(self):
+        return iter(self.columns().T)
+
+    @property
+    def last_timestamp(self):
+        return int(self._data[0, self._head + self._len - 1]) if self._len else None
+
+    def _write(self, slot: int, row):
+        self._data[:, slot] = row
+        self._data[:, slot + self.capacity] = row
+
+    def append(self, row) -> bool:
+        """
+        Add a candle. A row with the last candle's timestamp replaces it (a
+        forming candle getting its final values) and older rows are ignored.
+        Returns True when a new candle was added.
+        """
+        last = self.last_timestamp
+        if last is not None and row[0] <= last:
+            if row[0] == last:
+                self.update_last(row)
+            return False
+        self._write((self._head + self._len) % self.capacity, row)
+        if self._len < self.capacity:
+            self._len += 1
+        else:
+            self._head = (self._head + 1) % self.capacity
+        return True
+
+    def update_last(self, row):
+        self._write((self._head + self._len - 1) % self.capacity, row)
+
+    def extend(self, rows) -> int:
+        """
+        Merge time-ordered rows as `append` would, in one vectorized write.
+        Returns the number of candles added.
+        """
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+        last = self.last_timestamp
+        if last is not None:
+            same = rows[rows[:, 0] == last]
+            if len(same):
+                self.update_last(same[-1])
+            rows = rows[rows[:, 0] > last]
+        added = len(rows)
+        rows = rows[-self.capacity:]
+        slots = (self._head + self._len + np.arange(len(rows))) % self.capacity
+        self._data[:, slots] = rows.T
+        self._data[:, slots + self.capacity] = rows.T
+        overflow = max(0, self._len + len(rows) - self.capacity)
+        self._head = (self._head + overflow) % self.capacity
+        self._len = min(self.capacity, self._len + len(rows))
+        return added
+
+    def to_frame(self, tail: int = None) -> pd.DataFrame:
+        """DataFrame copy of the (last `tail`) candles, indexed by timestamp like DataFetcher frames."""
+        columns = self.columns()[:, -tail:] if tail else self.columns()
+        return pd.DataFrame(
+            {name: columns[i] for i, name in enumerate(OHLCV_COLUMNS[1:], start=1)},
+            index=pd.DatetimeIndex(pd.to_datetime(columns[0].astype(np.int64), unit='ms'), name='timestamp'),
+        )
@@ -0,0 +1,157 @@
+# HawkX/data/candle_store.py
+
+import io
+import os
+from pathlib import Path
+
+import numpy as np
+from numpy.lib import format as npy_format
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+ROW_BYTES = 8 * len(OHLCV_COLUMNS)
+
+
+class CandleStore:
+    """
+    On-disk OHLCV store with one memory-mappable .npy file per symbol and timeframe.
+
+    Each file holds a float64 array of shape (n, 6) in OHLCV_COLUMNS order,
+    sorted by timestamp (ms). At most `max_bars` rows are served (None keeps
+    everything). Updates are written in place at the end of the file, which
+    may grow `compact_slack` rows past `max_bars` before it is rewritten down
+    to `max_bars`. A read-only store serves what is on disk and never writes:
+    merges are only returned.
+    """
+
+    def __init__(self, base_dir, max_bars: int = 5000, read_only: bool = False, compact_slack: int = None):
+        self.base_path = Path(base_dir)
+        self.max_bars = max_bars
+        self.read_only = read_only
+        self.compact_slack = (max_bars or 0) // 4 if compact_slack is None else compact_slack
+
+    def _tail(self, candles):
+        return candles if self.max_bars is None else candles[-self.max_bars:]
+
+    def _path(self, symbol: str, timeframe: str) -> Path:
+        return self.base_path / timeframe / f"{symbol.replace('/', '-')}.npy"
+
+    def load(self, symbol: str, timeframe: str, mmap: bool = True):
+        """
+        Return the stored candles as an (n, 6) array, or None if nothing is stored.
+        """
+        path = self._path(symbol, timeframe)
+        if not path.exists():
+            return None
+        return self._tail(np.load(path, mmap_mode='r' if mmap else None))
+
+    def last_timestamp(self, symbol: str, timeframe: str):
+        """
+        Timestamp of the newest stored candle, read from the file's tail without mapping it.
+        """
+        try:
+            f = open(self._path(symbol, timeframe), 'rb')
+        except FileNotFoundError:
+            return None
+        with f:
+            layout = self._layout(f)
+            if layout is None:
+                candles = self.load(symbol, timeframe)
+                return int(candles[-1, 0]) if candles is not None and len(candles) else None
+            n, offset = layout
+            return int(self._timestamp_at(f, offset, n - 1)) if n else None
+
+    @staticmethod
+    def _layout(f):
+        """
+        Read an .npy header; returns (rows, data offset) for the plain (n, 6)
+        float64 files this store writes, or None for anything else.
+        """
+        if npy_format.read_magic(f) != (1, 0):
+            return None
+        shape, fortran_order, dtype = npy_format.read_array_header_1_0(f)
+        if fortran_order or dtype != np.float64 or shape[1:] != (len(OHLCV_COLUMNS),):
+            return None
+        return shape[0], f.tell()
+
+    @staticmethod
+    def _timestamp_at(f, offset: int, row: int) -> float:
+        f.seek(offset + row * ROW_BYTES)
+        return np.frombuffer(f.read(8), dtype=np.float64)[0]
+
+    def save(self, symbol: str, timeframe: str, candles: np.ndarray):
+        if self.read_only:
+            return
+        path = self._path(symbol, timeframe)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp.npy')
+        np.save(tmp_path, np.ascontiguousarray(self._tail(candles), dtype=np.float64))
+        os.replace(tmp_path, path)
+
+    def merge(self, symbol: str, timeframe: str, rows) -> np.ndarray:
+        """
+        Merge newly fetched OHLCV rows into the stored candles and persist them.
+        Rows at or after the first new timestamp replace what was stored, so a
+        candle that was still forming when last fetched gets its final values.
+        """
+        new = np.asarray(rows, dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+        if not len(new):
+            return self.load(symbol, timeframe)
+        if not self.read_only:
+            appended = self._append(self._path(symbol, timeframe), new)
+            if appended is not None:
+                return self._tail(appended)
+
+        # New file, history rewritten further back, or time to compact: rewrite it whole
+        stored = self.load(symbol, timeframe, mmap=False)
+        if stored is not None and len(stored):
+            keep = stored[stored[:, 0] < new[0, 0]]
+            merged = np.concatenate([keep, new])
+        else:
+            merged = new
+
+        self.save(symbol, timeframe, merged)
+        return self._tail(merged)
+
+    def _append(self, path: Path, new: np.ndarray):
+        """
+        Write `new` over the stored rows from its first timestamp on, in place:
+        only those rows and the header's row count are written. Returns the
+        updated candles memory-mapped, or None when the file has to be rewritten
+        instead (it is missing, would shrink, or is due for compaction).
+        """
+        try:
+            f = open(path, 'r+b')
+        except FileNotFoundError:
+            return None
+        with f:
+            layout = self._layout(f)
+            if layout is None:
+                return None
+            n, offset = layout
+            start = 0
+            if n:
+                # Usually only the forming candle is replaced: check the last stored timestamp first
+                last_ts = self._timestamp_at(f, offset, n - 1)
+                if new[0, 0] >= last_ts:
+                    start = n - 1 if new[0, 0] == last_ts else n
+                else:
+                    stored = np.memmap(f, dtype=np.float64, mode='r', offset=offset, shape=(n, len(OHLCV_COLUMNS)))
+                    start = int(np.searchsorted(stored[:, 0], new[0, 0]))
+            total = start + len(new)
+            # Shrinking would mean truncating a file other readers may have mapped
+            if total < n or (self.max_bars is not None and total > self.max_bars + self.compact_slack):
+                return None
+            header = io.BytesIO()
+            npy_format.write_array_header_1_0(header, {'descr': npy_format.dtype_to_descr(np.dtype(np.float64)),
+                                                       'fortran_order': False,
+                                                       'shape': (total, len(OHLCV_COLUMNS))})
+            if header.tell() != offset:
+                return None
+
+            # Rows first, then the row count, so an interrupted write never exposes unwritten rows
+            f.seek(offset + start * ROW_BYTES)
+            f.write(np.ascontiguousarray(new).tobytes())
+            f.seek(0)
+            f.write(header.getvalue())
+            f.flush()
+            return np.memmap(f, dtype=np.float64, mode='r', offset=offset, shape=(total, len(OHLCV_COLUMNS)))
@@ -1,48 +1,286 @@
 # === HawkX/data/fetcher.py ===
 import logging
+import time
 
+import numpy as np
 import pandas as pd
 from core.broker import Broker
+from data.candle_buffer import CandleBuffer
+from utils import metrics
+from utils.timeframes import bucket_start, candle_offset_ms, timeframe_to_ms
 logger = logging.getLogger(__name__)
 
+OHLCV_PAGE = 300  # most candles OKX returns per request
+
+NATIVE_FALLBACKS = metrics.counter('hawkx_timeframe_native_fetches_total',
+                                   "Higher-timeframe fetches that could not be derived from the base timeframe",
+                                   ('timeframe',))
+
+
+class TimeframeAggregator:
+    """
+    Rolls base-timeframe candles up into higher timeframes.
+
+    Buckets follow the exchange's grid: intraday bars are aligned to UTC, and
+    bars of 6h and longer to `long_offset_hours` (ccxt requests OKX's UTC
+    bars by default; OKX's native '1D' is aligned to UTC+8, i.e. 8).
+    A leading bucket that the base history only partly covers is dropped, and
+    the last bucket is the forming candle, like the exchange's own last bar.
+    Results are kept per symbol/timeframe so each update only re-aggregates
+    from the start of the last bucket.
+    """
+
+    def __init__(self, base_timeframe: str, long_offset_hours: int = 0, max_bars: int = 5000):
+        self.base_timeframe = base_timeframe
+        self.base_ms = timeframe_to_ms(base_timeframe)
+        self.long_offset_hours = long_offset_hours
+        self.max_bars = max_bars
+        self._bars = {}  # (symbol, timeframe) -> (n, 6) array
+
+    def ratio(self, timeframe: str) -> int:
+        """
+        Base candles per `timeframe` candle, or 0 if it cannot be built from the base timeframe.
+        """
+        step = timeframe_to_ms(timeframe)
+        if step <= self.base_ms or step % self.base_ms:
+            return 0
+        return step // self.base_ms
+
+    def offset(self, timeframe: str) -> int:
+        return candle_offset_ms(timeframe, self.long_offset_hours)
+
+    def aggregate(self, rows: np.ndarray, timeframe: str, complete_head: bool = True) -> np.ndarray:
+        """
+        Vectorized roll-up of sorted base rows into `timeframe` candles.
+        """
+        if rows is None or not len(rows):
+            return np.empty((0, 6))
+        buckets = bucket_start(rows[:, 0].astype(np.int64), timeframe, self.offset(timeframe))
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(buckets)) + 1])
+        ends = np.concatenate([starts[1:], [len(rows)]])
+        out = np.column_stack([
+            buckets[starts],
+            rows[starts, 1],
+            np.maximum.reduceat(rows[:, 2], starts),
+            np.minimum.reduceat(rows[:, 3], starts),
+            rows[ends - 1, 4],
+            np.add.reduceat(rows[:, 5], starts),
+        ]).astype(np.float64)
+        if complete_head and rows[0, 0] != buckets[0]:
+            out = out[1:]  # history starts mid-bucket
+        return out
+
+    def update(self, symbol: str, timeframe: str, rows: np.ndarray) -> np.ndarray:
+        """
+        Bring the `timeframe` candles for `symbol` up to date with the base rows and return them.
+        """
+        key = (symbol, timeframe)
+        prev = self._bars.get(key)
+        if prev is not None and len(prev) and len(rows) and rows[0, 0] <= prev[-1, 0]:
+            # Re-aggregate from the last (possibly still forming) bucket onwards
+            tail = rows[np.searchsorted(rows[:, 0], prev[-1, 0]):]
+            bars = np.concatenate([prev[:-1], self.aggregate(tail, timeframe, complete_head=False)])
+        else:
+            bars = self.aggregate(rows, timeframe)
+        bars = bars[-self.max_bars:]
+        self._bars[key] = bars
+        return bars
+
+
 class DataFetcher:
-    def __init__(self, broker: Broker):
+    def __init__(self, broker: Broker, storage=None, fetch_limit: int = 100, aggregator=None,
+                 max_backfill_pages: int = 4):
         self.broker = broker
+        self.storage = storage
+        self.fetch_limit = fetch_limit
+        self.aggregator = aggregator  # optional TimeframeAggregator; see get_timeframes
+        self.max_backfill_pages = max_backfill_pages
+        self._history_exhausted = set()
+        self.buffers = {}  # (symbol, timeframe) -> CandleBuffer, reused across cycles
 
+    @staticmethod
+    def _to_frame(raw) -> pd.DataFrame:
+        df = pd.DataFrame(raw, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df.set_index('timestamp', inplace=True)
+        return df
 
     def get_symbol_data(self, symbol: str, timeframe: str, limit: int = 100) -> pd.DataFrame:
         """
         Fetch OHLCV data and return as a pandas DataFrame.
+        With a candle store attached, only candles newer than the last stored one are requested.
         """
         try:
-            raw = self.broker.safe_fetch_ohlcv(symbol, timeframe, limit)
-            df = pd.DataFrame(raw, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
-            return df
+            with metrics.timed(f'fetch.ohlcv.{timeframe}'):
+                if self.storage is None:
+                    raw = self.broker.safe_fetch_ohlcv(symbol, timeframe, limit)
+                    return self._to_frame(raw)
+
+                candles = self._sync_candles(symbol, timeframe, limit)
+                if candles is None:
+                    return None
+                return self._to_frame(candles[-limit:])
         except Exception as e:
             logger.error(f"Failed to fetch OHLCV for {symbol} [{timeframe}]: {e}")
             return None
 
+    def get_symbol_rows(self, symbol: str, timeframe: str, limit: int = 100):
+        """
+        Like get_symbol_data, but return the raw (n, 6) float64 array without building a DataFrame.
+        """
+        try:
+            with metrics.timed(f'fetch.ohlcv.{timeframe}'):
+                if self.storage is None:
+                    raw = self.broker.safe_fetch_ohlcv(symbol, timeframe, limit)
+                else:
+                    raw = self._sync_candles(symbol, timeframe, limit)
+                if raw is None or not len(raw):
+                    return None
+                return np.asarray(raw, dtype=np.float64)[-limit:]
+        except Exception as e:
+            logger.error(f"Failed to fetch OHLCV for {symbol} [{timeframe}]: {e}")
+            return None
+
+    def buffer(self, symbol: str, timeframe: str, rows) -> CandleBuffer:
+        """
+        Merge fetched rows into the CandleBuffer kept for symbol/timeframe and return it.
+        Only candles newer than the buffer are written, so a cycle costs O(new candles).
+        """
+        buffer = self.buffers.get((symbol, timeframe))
+        if buffer is None or buffer.capacity < len(rows):
+            buffer = self.buffers[(symbol, timeframe)] = CandleBuffer(len(rows))
+        buffer.extend(rows)
+        return buffer
+
+    def get_timeframes(self, symbol: str, timeframes: list, limit: int = 100, raw: bool = False) -> dict:
+        """
+        Candles for several timeframes of one symbol, as {timeframe: DataFrame} (or arrays with raw=True).
+
+        With an aggregator, only the base timeframe is fetched and the higher
+        timeframes are rolled up from it. A timeframe falls back to its own
+        fetch when the base history is not deep enough to build `limit` bars.
+        """
+        if self.aggregator is None:
+            fetch = self.get_symbol_rows if raw else self.get_symbol_data
+            return {tf: fetch(symbol, tf, limit) for tf in timeframes}
+
+        base_tf = self.aggregator.base_timeframe
+        max_base = self.storage.candles.max_bars if self.storage is not None else OHLCV_PAGE
+        # One extra bucket of depth covers a leading bucket the history only partly holds
+        depth = {tf: (limit + 1) * self.aggregator.ratio(tf) for tf in timeframes if tf != base_tf}
+        derived = [tf for tf, bars in depth.items() if 0 < bars <= max_base]
+        base_bars = max([limit] + [depth[tf] for tf in derived])
+        base = self._base_rows(symbol, base_bars)
+
+        out = {}
+        for tf in timeframes:
+            if tf == base_tf:
+                rows = base[-limit:] if base is not None else None
+            elif tf in derived and base is not None:
+                rows = self.aggregator.update(symbol, tf, base)[-limit:]
+                if len(rows) < limit:
+                    rows = None
+            else:
+                rows = None
+            if rows is None or not len(rows):
+                NATIVE_FALLBACKS.inc(timeframe=tf)
+                out[tf] = (self.get_symbol_rows if raw else self.get_symbol_data)(symbol, tf, limit)
+            else:
+                out[tf] = rows if raw else self._to_frame(rows)
+        return out
+
+    def _base_rows(self, symbol: str, bars: int):
+        """
+        At least `bars` base candles if available, backfilling the candle store with older pages once.
+        """
+        base_tf = self.aggregator.base_timeframe
+        try:
+            with metrics.timed(f'fetch.ohlcv.{base_tf}'):
+                if self.storage is None:
+                    raw = self.broker.safe_fetch_ohlcv(symbol, base_tf, min(bars, OHLCV_PAGE))
+                    return np.asarray(raw, dtype=np.float64) if raw else None
+                candles = self._sync_candles(symbol, base_tf, bars)
+                if candles is not None and 0 < len(candles) < bars:
+                    candles = self._backfill(symbol, base_tf, np.asarray(candles), bars)
+                return np.asarray(candles, dtype=np.float64) if candles is not None and len(candles) else None
+        except Exception as e:
+            logger.error(f"Failed to fetch OHLCV for {symbol} [{base_tf}]: {e}")
+            return None
+
+    def _backfill(self, symbol: str, timeframe: str, candles: np.ndarray, bars: int) -> np.ndarray:
+        """
+        Prepend older pages to the stored candles until there are `bars` of them.
+        """
+        if (symbol, timeframe) in self._history_exhausted:
+            return candles
+        step = timeframe_to_ms(timeframe)
+        grown = False
+        for _ in range(self.max_backfill_pages):
+            if len(candles) >= bars:
+                break
+            first = int(candles[0, 0])
+            raw = self.broker.safe_fetch_ohlcv(symbol, timeframe, OHLCV_PAGE, since=first - OHLCV_PAGE * step)
+            older = np.asarray([r for r in raw or () if r[0] < first], dtype=np.float64).reshape(-1, 6)
+            if not len(older):
+                self._history_exhausted.add((symbol, timeframe))  # e.g. a recent listing
+                break
+            candles = np.concatenate([older, candles])[-self.storage.candles.max_bars:]
+            grown = True
+        if grown:
+            self.storage.candles.save(symbol, timeframe, candles)
+        return candles
+
+    def _sync_candles(self, symbol: str, timeframe: str, limit: int):
+        """
+        Bring the stored candles for symbol/timeframe up to date and return them.
+        """
+        last_ts = self.storage.candles.last_timestamp(symbol, timeframe)
+
+        if last_ts is not None:
+            missing = int((time.time() * 1000 - last_ts) // timeframe_to_ms(timeframe)) + 1
+            if missing <= self.fetch_limit:
+                # Re-request the last stored candle too: it may still have been forming
+                raw = self.broker.safe_fetch_ohlcv(symbol, timeframe, missing, since=last_ts)
+                if not raw:
+                    return self.storage.load_ohlcv(symbol, timeframe)
+                return self.storage.merge_ohlcv(symbol, timeframe, raw)
+
+        # Nothing stored yet, or the gap is too large to close incrementally
+        raw = self.broker.safe_fetch_ohlcv(symbol, timeframe, max(limit, self.fetch_limit))
+        if not raw:
+            return self.storage.load_ohlcv(symbol, timeframe)
+        if last_ts is not None and raw[0][0] > last_ts + timeframe_to_ms(timeframe):
+            # History would have a hole in it; start the stored series over
+            self.storage.candles.save(symbol, timeframe, raw)
+            return np.asarray(raw, dtype=np.float64)[-self.storage.candles.max_bars:]
+        return self.storage.merge_ohlcv(symbol, timeframe, raw)
+
+    def _ticker(self, symbol: str) -> dict:
+        """
+        Read a ticker from the broker's bulk snapshot, refreshing it in one call if stale.
+        """
+        ticker = self.broker.fetch_tickers().get(symbol)
+        return ticker if ticker is not None else self.broker.fetch_ticker(symbol)
+
     def get_latest_price(self, symbol: str) -> float:
         """
         Fetch the latest price of a symbol.
         """
-        ticker = self.broker.fetch_ticker(symbol)
+        ticker = self._ticker(symbol)
         return ticker['last'] if 'last' in ticker else None
 
     def get_volume_24h(self, symbol: str) -> float:
         """
         Fetch the 24-hour volume of a symbol.
         """
-        ticker = self.broker.fetch_ticker(symbol)
+        ticker = self._ticker(symbol)
         return ticker.get('quoteVolume', 0)
 
     def get_market_snapshot(self, symbol: str) -> dict:
         """
         Return a snapshot of latest price, high, low, volume, and change %.
         """
-        ticker = self.broker.fetch_ticker(symbol)
+        ticker = self._ticker(symbol)
         return {
             "price": ticker.get("last"),
             "high": ticker.get("high"),
@@ -0,0 +1,229 @@
+# HawkX/data/sqlite_store.py
+
+import argparse
+import csv
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# Columns stored natively per table; any other keys go into the JSON `extra` column
+TABLES = {
+    'trades': ['timestamp', 'symbol', 'signal', 'timeframe', 'entry_price', 'tp', 'sl', 'qty', 'result', 'pnl'],
+    'signals': ['timestamp', 'symbol', 'timeframe', 'signal', 'rsi', 'macd', 'macd_diff', 'ema_50', 'entry_price'],
+}
+INDEXED_COLUMNS = ['symbol', 'timestamp', 'signal']
+
+_FLUSH = object()
+_STOP = object()
+
+
+class SQLiteStore:
+    """
+    WAL-mode SQLite store for trades and signals.
+
+    Writes are queued and applied by a single background thread in batched
+    `executemany` transactions, so callers never wait on disk I/O. A batch is
+    written once it holds `batch_size` rows or its oldest row has waited
+    `flush_interval` seconds. Reads use
+    their own connection and run concurrently with the writer thanks to WAL.
+    """
+
+    def __init__(self, path, batch_size: int = 200, flush_interval: float = 1.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_days = None
+        self.prune_interval = 3600.0
+        self._last_prune = 0.0
+
+        self._queue = queue.Queue()
+        self._create_schema()
+        self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _create_schema(self):
+        with self._connect() as conn:
+            for table, columns in TABLES.items():
+                cols = ', '.join(f"{c} {'REAL' if c not in ('timestamp', 'symbol', 'signal', 'timeframe', 'result') else 'TEXT'}"
+                                 for c in columns)
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, {cols}, extra TEXT)")
+                for column in INDEXED_COLUMNS:
+                    if column in columns:
+                        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})")
+        self._conn_read = self._connect()
+
+    # === Writes (non-blocking) ===
+
+    def insert(self, table: str, data: dict):
+        if table not in TABLES:
+            raise ValueError(f"Unknown table '{table}'")
+        self._queue.put((table, dict(data)))
+
+    def flush(self, timeout: float = None):
+        """
+        Block until everything queued so far has been written.
+        """
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        done.wait(timeout)
+
+    def close(self):
+        self._queue.put((_STOP, None))
+        self._thread.join()
+        self._conn_read.close()
+
+    @staticmethod
+    def _row(table: str, data: dict) -> tuple:
+        columns = TABLES[table]
+        timestamp = data.get('timestamp')
+        if isinstance(timestamp, datetime):
+            data['timestamp'] = timestamp.isoformat()
+        extra = {k: v for k, v in data.items() if k not in columns}
+        return tuple(data.get(c) for c in columns) + (json.dumps(extra, default=str) if extra else None,)
+
+    def _write(self, conn, batch: list):
+        by_table = {}
+        for table, data in batch:
+            by_table.setdefault(table, []).append(self._row(table, data))
+        with conn:
+            for table, rows in by_table.items():
+                columns = TABLES[table] + ['extra']
+                placeholders = ', '.join('?' * len(columns))
+                conn.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+
+    def _run(self):
+        conn = self._connect()
+        batch = []
+        first_queued = None  # when the oldest unwritten row arrived: no row waits longer than flush_interval
+        while True:
+            timeout = self.flush_interval
+            if first_queued is not None:
+                timeout = max(0.0, first_queued + self.flush_interval - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            marker = item[0] if item is not None else None
+            if item is not None and marker not in (_FLUSH, _STOP):
+                if not batch:
+                    first_queued = time.monotonic()
+                batch.append(item)
+                if len(batch) < self.batch_size and time.monotonic() - first_queued < self.flush_interval:
+                    continue
+
+            if batch:
+                try:
+                    with metrics.timed('storage.sqlite_batch'):
+                        self._write(conn, batch)
+                except sqlite3.Error as e:
+                    logger.error(f"Failed to write {len(batch)} rows to {self.path}: {e}")
+                batch = []
+                first_queued = None
+
+            if self.retention_days and time.monotonic() - self._last_prune > self.prune_interval:
+                self._prune(conn, self.retention_days)
+            if marker is _FLUSH:
+                item[1].set()
+            elif marker is _STOP:
+                conn.close()
+                return
+
+    # === Retention ===
+
+    def enable_auto_pruning(self, retention_days: int):
+        """
+        Periodically delete rows older than `retention_days` (checked hourly by the writer).
+        """
+        self.retention_days = retention_days
+        self._last_prune = 0.0
+
+    def _prune(self, conn, retention_days: int) -> int:
+        self._last_prune = time.monotonic()
+        cutoff = (datetime.utcnow() - timedelta(days=retention_days)).isoformat()
+        deleted = 0
+        with conn:
+            for table in TABLES:
+                deleted += conn.execute(f"DELETE FROM {table} WHERE timestamp < ?", (cutoff,)).rowcount
+        if deleted:
+            logger.info(f"Pruned {deleted} rows older than {retention_days} days")
+        return deleted
+
+    def prune(self, retention_days: int) -> int:
+        """
+        Delete rows older than `retention_days` right away; returns the number deleted.
+        """
+        self.flush()
+        conn = self._connect()
+        try:
+            return self._prune(conn, retention_days)
+        finally:
+            conn.close()
+
+    # === Reads ===
+
+    def query(self, sql: str, params: tuple = ()) -> list:
+        """
+        Run a read-only query and return rows as dicts.
+        """
+        cursor = self._conn_read.execute(sql, params)
+        names = [d[0] for d in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def import_csv(self, csv_path, table: str = 'trades', chunk_size: int = 5000) -> int:
+        """
+        One-shot import of an existing CSV log (with a header row) into `table`.
+        """
+        count = 0
+        with open(csv_path, newline='') as f:
+            reader = csv.DictReader(f)
+            if not reader.fieldnames:
+                return 0
+            chunk = []
+            with self._connect() as conn:
+                for row in reader:
+                    chunk.append((table, {k: v for k, v in row.items() if v not in (None, '')}))
+                    if len(chunk) >= chunk_size:
+                        self._write(conn, chunk)
+                        count += len(chunk)
+                        chunk = []
+                if chunk:
+                    self._write(conn, chunk)
+                    count += len(chunk)
+        logger.info(f"Imported {count} rows from {csv_path} into {table}")
+        return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import CSV trade logs into the SQLite store")
+    parser.add_argument('csv', nargs='+', help="CSV files to import")
+    parser.add_argument('--db', default='data/storage/hawkx.db')
+    parser.add_argument('--table', default='trades', choices=sorted(TABLES))
+    args = parser.parse_args()
+
+    store = SQLiteStore(args.db)
+    try:
+        for path in args.csv:
+            print(f"{path}: {store.import_csv(path, table=args.table)} rows")
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -5,19 +5,45 @@ import pandas as pd
 import json
 from datetime import datetime
 
+from data.candle_store import CandleStore
+from data.sqlite_store import SQLiteStore
+from utils import metrics
+
 class DataStorage:
-    def __init__(self, base_dir='data/storage'):
+    def __init__(self, base_dir='data/storage', max_candle_bars=5000, sqlite_file=None, read_only=False):
         self.base_path = Path(base_dir)
-        self.base_path.mkdir(parents=True, exist_ok=True)
+        # read_only (e.g. --dry-run): stored data can be read, but nothing is written or created
+        self.read_only = read_only
+        if not read_only:
+            self.base_path.mkdir(parents=True, exist_ok=True)
+        self.candles = CandleStore(self.base_path / 'candles', max_bars=max_candle_bars, read_only=read_only)
+        # Optional indexed trade/signal store; writes are queued to a background thread
+        self.sqlite = SQLiteStore(sqlite_file) if sqlite_file and not read_only else None
+
+    def load_ohlcv(self, symbol: str, timeframe: str):
+        """
+        Load stored candles for a symbol/timeframe as an (n, 6) array, or None.
+        """
+        return self.candles.load(symbol, timeframe)
+
+    def merge_ohlcv(self, symbol: str, timeframe: str, rows):
+        """
+        Merge freshly fetched OHLCV rows into the candle store and return the full history.
+        """
+        with metrics.timed('storage.merge_ohlcv'):
+            return self.candles.merge(symbol, timeframe, rows)
 
     def save_trade_log_csv(self, data: dict, filename='trades_log.csv'):
+        if self.read_only:
+            return None
         file_path = self.base_path / filename
         df = pd.DataFrame([data])
 
-        if file_path.exists():
-            df.to_csv(file_path, mode='a', header=False, index=False)
-        else:
-            df.to_csv(file_path, mode='w', header=True, index=False)
+        with metrics.timed('storage.trade_log_csv'):
+            if file_path.exists():
+                df.to_csv(file_path, mode='a', header=False, index=False)
+            else:
+                df.to_csv(file_path, mode='w', header=True, index=False)
 
         return str(file_path)
 
@@ -25,8 +51,10 @@ class DataStorage:
         """
         Save the latest signal or strategy state to a JSON file.
         """
+        if self.read_only:
+            return
         file_path = self.base_path / filename
-        with open(file_path, 'w') as f:
+        with metrics.timed('storage.signal_json'), open(file_path, 'w') as f:
             json.dump(data, f, indent=4, default=str)
 
     def load_signal_json(self, filename='last_signal.json'):
@@ -39,7 +67,28 @@ class DataStorage:
                 return json.load(f)
         return {}
 
+    def save_to_sqlite(self, table_name, data_dict):
+        """
+        Queue a row for the SQLite store ('trades' or 'signals'); returns immediately.
+        """
+        if self.sqlite is None:
+            raise RuntimeError("SQLite store is not enabled (set storage.sqlite_file)")
+        self.sqlite.insert(table_name, data_dict)
+
+    def enable_auto_pruning(self, retention_days):
+        """
+        Drop SQLite rows older than `retention_days` in the background.
+        """
+        if self.sqlite is not None:
+            self.sqlite.enable_auto_pruning(retention_days)
+
+    def close(self):
+        """
+        Flush queued SQLite writes and stop the writer thread.
+        """
+        if self.sqlite is not None:
+            self.sqlite.close()
+            self.sqlite = None
+
     # === Future Enhancements ===
-    # def save_to_sqlite(self, table_name, data_dict): ...
     # def upload_to_s3(self, filename): ...
-    # def enable_auto_pruning(self, retention_days): ...
@@ -1,51 +1,176 @@
+import time
+
+STARTED_AT = time.perf_counter()
+
 import argparse
 import asyncio
-import time
-import logging
+import threading
 from datetime import datetime
 
+from core.market_cache import MarketCache
 from core.okx_interface import OKXInterface
-from core.signal_engine import SignalEngine
-from core.risk_management import calculate_position_size, calculate_tp_sl
-from data.fetcher import DataFetcher
+from core.evaluation_scheduler import EvaluationScheduler
+from core.execution import OKX_BATCH_LIMIT, ExecutionPipeline
+from core.order_manager import OrderManager
+from core.paper_broker import PaperBroker
+from core.scanner import MarketScanner
+from core.signal_engine import SignalEngine, build_ohlcv_panel
+from core.risk_management import PortfolioRiskEngine, calculate_position_size, calculate_tp_sl
+from data.fetcher import DataFetcher, TimeframeAggregator
 from utils.email_alert import send_email
 from data.storage import DataStorage
 from config.settings import SETTINGS
+from utils import metrics
+from utils.logger import audit, begin_cycle, configure_logging, current_cycle, setup_logger
+from utils.timeframes import timeframe_to_ms
+
+# ccxt, smtplib, aiohttp and multiprocessing are only imported by the features that use them
+IMPORTED_AT = time.perf_counter()
+
+logger = setup_logger(__name__)
+
+INDICATOR_STATE_FILE = 'indicator_state.json'
+EVALUATION_STATE_FILE = 'evaluation_state.json'
+AUDIT_FLUSH_ENTRIES = 500
+
+_first_signal_reported = False
+
+SYMBOLS_SCANNED = metrics.counter('hawkx_symbols_analyzed_total', "Symbols that went through signal analysis")
+SIGNALS = metrics.counter('hawkx_signals_total', "Final signals emitted", ('signal',))
+CYCLE_SYMBOLS = metrics.gauge('hawkx_cycle_symbols', "Symbols selected for the last scan cycle")
+
+
+def report_first_signal():
+    """
+    Log startup-to-first-signal time once per process.
+    """
+    global _first_signal_reported
+    if not _first_signal_reported:
+        _first_signal_reported = True
+        logger.info(f"⏱ Startup to first signal: {time.perf_counter() - STARTED_AT:.2f}s")
+
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+async def fetch_symbol_frames(symbol, broker, scanner, fetcher, raw=False, timeframes=None):
+    """
+    Fetch the ticker and every configured timeframe (or just `timeframes`) for one symbol.
+    Returns (ticker, {timeframe: DataFrame}) or None if the symbol is filtered out.
+    With raw=True the candles are returned as (n, 6) arrays instead of DataFrames.
+    """
+    # Served from the bulk ticker snapshot taken by the universe filter
+    with metrics.timed('fetch.ticker'):
+        ticker = await scanner.run_blocking(broker.fetch_ticker, symbol)
+    last_price = ticker['last']
+    vol = ticker.get('quoteVolume') or 0
+    if last_price > SETTINGS['trading']['price_max_threshold']:
+        return None
+    if vol < SETTINGS['trading']['volume_min_threshold']:
+        return None
 
+    logger.info("Analyzing %s — Price: %s, Volume: %s", symbol, last_price, vol)
+    timeframes = timeframes or SETTINGS['trading']['timeframes']
+    history_bars = SETTINGS.get('storage', {}).get('history_bars', 100)
+    if fetcher.aggregator is not None:
+        # One base-timeframe fetch; higher timeframes are rolled up from it
+        return ticker, await scanner.run_blocking(fetcher.get_timeframes, symbol, timeframes, history_bars, raw)
+    fetch = fetcher.get_symbol_rows if raw else fetcher.get_symbol_data
+    frames = await asyncio.gather(*(scanner.run_blocking(fetch, symbol, tf, history_bars) for tf in timeframes))
+    return ticker, dict(zip(timeframes, frames))
 
-async def analyze_symbol(symbol, broker, signal_engine, capital, final_signal=None):
+
+def due_timeframes(symbol, scheduler, final_signal=None) -> list:
+    """
+    The timeframes to fetch and evaluate for `symbol` this cycle: all of them,
+    or with a scheduler only those with a newly closed candle.
+    """
+    timeframes = SETTINGS['trading']['timeframes']
+    if scheduler is None or final_signal:
+        return timeframes
+    due = scheduler.due(symbol, timeframes)
+    if not due:
+        audit('skip', symbol=symbol, reason='no closed candle')
+    return due
+
+
+def with_cached(symbol, results, candles, scheduler) -> dict:
+    """
+    Record the freshly evaluated `results` with the scheduler and complete them
+    with the cached results of the timeframes that were not due.
+    """
+    if scheduler is None:
+        return results
+    for tf, result in results.items():
+        scheduler.record(symbol, tf, candles[tf], result)
+    timeframes = SETTINGS['trading']['timeframes']
+    cached = scheduler.cached(symbol, timeframes)
+    return {tf: results.get(tf, cached.get(tf)) for tf in timeframes if tf in results or tf in cached}
+
+
+async def analyze_symbol(symbol, broker, signal_engine, capital, final_signal=None, scanner=None, fetcher=None,
+                         alerts=None, storage=None, order_manager=None, scheduler=None, pending=None):
+    owned_scanner = MarketScanner(max_concurrency=1) if scanner is None else None
+    scanner = scanner or owned_scanner
+    fetcher = fetcher or DataFetcher(broker)
     try:
-        logger.info(f"🔍 Starting analysis for {symbol}")
+        logger.debug("🔍 Starting analysis for %s", symbol)
 
-        ticker = broker.fetch_ticker(symbol)
-        last_price = ticker['last']
-        vol = ticker.get('quoteVolume', 0)
-        if last_price > SETTINGS['trading']['price_max_threshold']:
-            return
-        if vol < SETTINGS['trading']['volume_min_threshold']:
+        # Only timeframes with a newly closed candle are fetched and evaluated
+        due = due_timeframes(symbol, scheduler, final_signal)
+        if not due:
             return
 
-        logger.info(f"Analyzing {symbol} — Price: {last_price}, Volume: {vol}")
-        fetcher = DataFetcher(broker)
-        df_dict = {}
-        for tf in SETTINGS['trading']['timeframes']:
-            df = fetcher.get_symbol_data(symbol, tf)
-            df_dict[tf] = df
+        with metrics.timed('analyze_symbol'):
+            fetched = await fetch_symbol_frames(symbol, broker, scanner, fetcher, raw=True, timeframes=due)
+            if fetched is None:
+                return
+            ticker, rows = fetched
+            SYMBOLS_SCANNED.inc()
+
+            buffers = {tf: fetcher.buffer(symbol, tf, r) for tf, r in rows.items() if r is not None and len(r)}
+            results = {tf: signal_engine.generate_incremental(symbol, tf, buffer) for tf, buffer in buffers.items()}
+            results = with_cached(symbol, results, buffers, scheduler)
+            # DataFrames are only built for the symbols that will alert or trade
+            df_dict = {}
+            if final_signal or any(r.signal for r in results.values()):
+                df_dict = {tf: buffer.to_frame() for tf, buffer in buffers.items()}
+            await act_on_results(symbol, ticker, df_dict, results, capital, final_signal=final_signal,
+                                 scanner=scanner, alerts=alerts, storage=storage, order_manager=order_manager,
+                                 scheduler=scheduler, pending=pending)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error(f"Error analyzing {symbol}: {e}")
+    finally:
+        if owned_scanner is not None:
+            owned_scanner.shutdown()
+
 
+async def act_on_results(symbol, ticker, df_dict, results, capital, final_signal=None, scanner=None, alerts=None,
+                         storage=None, order_manager=None, scheduler=None, pending=None):
+    """
+    Combine per-timeframe SignalResults into a final signal and alert/log it.
+    Results may include cached timeframes that have no entry in `df_dict`.
+    With a `pending` list, final signals are collected there for dispatch_pending instead.
+    """
+    owned_scanner = MarketScanner(max_concurrency=1) if scanner is None else None
+    scanner = scanner or owned_scanner
+    storage = storage or DataStorage()
+    last_price = ticker['last']
+    try:
         # Multi-timeframe confirmation (example: require alignment across all)
         decisions = []
-        for tf, df in df_dict.items():
-            if df is None or df.empty:
-                continue
-            result = signal_engine.generate(df)
+        for tf, result in results.items():
+            df = df_dict.get(tf)
 
             if result.signal:
-                logger.info(f"[{symbol}][{tf}] Signal: {result.signal}, RSI: {result.rsi:.2f}, MACD: {result.macd:.4f}")
+                logger.info("[%s][%s] Signal: %s, RSI: %.2f, MACD: %.4f", symbol, tf, result.signal, result.rsi,
+                            result.macd)
                 decisions.append((tf, result.signal, result))  # Save full result for later
+                if storage.sqlite is not None and df is not None:  # cached results were logged when computed
+                    storage.save_to_sqlite('signals', {
+                        'timestamp': df.index[-1].isoformat(), 'symbol': symbol, 'timeframe': tf,
+                        'signal': result.signal, 'rsi': result.rsi, 'macd': result.macd,
+                        'macd_diff': result.macd_diff, 'ema_50': result.ema_50, 'entry_price': result.entry_price
+                    })
 
             decisions.append((tf, result.signal, {
                 'rsi': result.rsi,
@@ -57,8 +182,11 @@ async def analyze_symbol(symbol, broker, signal_engine, capital, final_signal=No
 
         aligned_signals = [s for _, s, _ in decisions if s is not None]
         final_signal = aligned_signals[0] if len(set(aligned_signals)) == 1 else final_signal
-        print(f"Before setting Final Signal: {final_signal}")
+        audit('evaluate', symbol=symbol, price=last_price, final=final_signal,
+              signals={tf: result.signal for tf, result in results.items()})
         result= "Result Dummy"
+        if not final_signal and scheduler is not None:
+            scheduler.clear_signal(symbol)
         if final_signal:
             final_signal = final_signal
             result = {
@@ -68,7 +196,9 @@ async def analyze_symbol(symbol, broker, signal_engine, capital, final_signal=No
                 'ema_50': 1.20,
                 'entry_price': last_price
             }
-            logger.warning(f"[FINAL SIGNAL] {symbol} => {final_signal}")
+            logger.warning("[FINAL SIGNAL] %s => %s", symbol, final_signal)
+            SIGNALS.inc(signal=final_signal)
+            report_first_signal()
 
         if final_signal:
             volatility = df_dict[SETTINGS['trading']['timeframes'][0]]['high'].tail(10).max() - \
@@ -76,45 +206,439 @@ async def analyze_symbol(symbol, broker, signal_engine, capital, final_signal=No
             tp, sl = calculate_tp_sl(last_price, volatility, final_signal)
             position_size = calculate_position_size(capital, last_price, sl)
 
-            timestamp = df.index[-1]  # last candle timestamp
-            message = f"""
-            🔔 Signal: {final_signal}
-            📈 Symbol: {symbol}
-            🕒 Time: {timestamp.strftime('%Y-%m-%d %H:%M')}
-            💰 Price: {last_price}
-            🎯 TP: {tp}, 🛡 SL: {sl}
-            📦 Size: {position_size}
-            🕒 Timeframes: {[tf for tf, _, _ in decisions]}
-            📊 RSI: {result.get('rsi', 'N/A'):.2f}, MACD: {result.get('macd', 'N/A'):.4f}
-            """
-
-            email_cfg = SETTINGS['alerts']['email']
-            if email_cfg and SETTINGS['alerts']['email']['enabled']:
-                send_email(
+            timestamp = df_dict[SETTINGS['trading']['timeframes'][0]].index[-1]  # last candle timestamp
+            signal = dict(symbol=symbol, final_signal=final_signal, last_price=last_price, tp=tp, sl=sl,
+                          timestamp=timestamp, decisions=decisions, result=result)
+            if pending is not None:
+                # Sized later together with the rest of the cycle's signals (see dispatch_pending)
+                pending.append(signal)
+                return
+            await dispatch_signal(**signal, position_size=position_size, scanner=scanner, alerts=alerts,
+                                  storage=storage, order_manager=order_manager, scheduler=scheduler)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error(f"Error acting on signals for {symbol}: {e}")
+    finally:
+        if owned_scanner is not None:
+            owned_scanner.shutdown()
+
+
+async def dispatch_signal(symbol, final_signal, last_price, tp, sl, position_size, timestamp, decisions, result,
+                          scanner=None, alerts=None, storage=None, order_manager=None, scheduler=None):
+    """
+    Place, alert and log one sized final signal.
+    """
+    try:
+        order = None
+        if order_manager is not None:
+            order_meta = {'entry_price': last_price, 'tp': tp, 'sl': sl, 'position_size': position_size,
+                          'macd_diff': result.get('macd_diff', 0.0), 'timestamp': timestamp.isoformat()}
+            if order_manager.pipeline is not None:
+                # Live execution: queued for the next batch; fills arrive on the orders channel
+                order_manager.submit_signal(symbol, SETTINGS['trading']['timeframes'][0], final_signal, order_meta)
+                order = 'queued'
+            else:
+                # Paper trading (--test-mode): simulate the entry with TP/SL exits attached
+                await scanner.run_blocking(order_manager.process_signal, symbol,
+                                           SETTINGS['trading']['timeframes'][0], final_signal, order_meta)
+                order = 'paper'
+
+        message = f"""
+        🔔 Signal: {final_signal}
+        📈 Symbol: {symbol}
+        🕒 Time: {timestamp.strftime('%Y-%m-%d %H:%M')}
+        💰 Price: {last_price}
+        🎯 TP: {tp}, 🛡 SL: {sl}
+        📦 Size: {position_size}
+        🕒 Timeframes: {[tf for tf, _, _ in decisions]}
+        📊 RSI: {result.get('rsi', 'N/A'):.2f}, MACD: {result.get('macd', 'N/A'):.4f}
+        """
+
+        email_cfg = SETTINGS['alerts']['email']
+        alert = None
+        if scheduler is not None and not scheduler.should_alert(symbol, final_signal):
+            alert = 'repeat'  # same signal as the last alert for this symbol
+        elif alerts is not None:
+            # Queued for the background dispatcher; never blocks the scan
+            alerts.send(subject=f"🚨 {final_signal} Signal on {symbol}", body=message)
+            alert = 'queued'
+        elif email_cfg and SETTINGS['alerts']['email']['enabled']:
+            alert = 'email'
+            with metrics.timed('email.send'):
+                await scanner.run_blocking(
+                    send_email,
                     subject=f"🚨 {final_signal} Signal on {symbol}",
                     body=message,
                     config=email_cfg
                 )
 
-            trade_data = {
-                "symbol": symbol,
-                "signal": final_signal,
-                "timestamp": datetime.utcnow().isoformat(),
-                # Add more fields if needed
-            }
+        trade_data = {
+            "symbol": symbol,
+            "signal": final_signal,
+            "timestamp": datetime.utcnow().isoformat(),
+            # Add more fields if needed
+        }
 
-            save_logs = DataStorage()
-            x = save_logs.save_trade_log_csv(trade_data)
-            print(f"X: {x}")
+        if storage.sqlite is not None:
+            # Queued for the SQLite writer thread; never blocks the scan
+            storage.save_to_sqlite('trades', trade_data)
+        else:
+            await scanner.run_blocking(storage.save_trade_log_csv, trade_data)
+        audit('dispatch', symbol=symbol, signal=final_signal, price=last_price, tp=tp, sl=sl, size=position_size,
+              order=order, alert=alert)
+    except asyncio.CancelledError:
+        raise
     except Exception as e:
-        logger.error(f"Error analyzing {symbol}: {e}")
+        logger.error(f"Error dispatching {final_signal} for {symbol}: {e}")
+
+
+async def dispatch_pending(pending, risk_engine, scanner=None, alerts=None, storage=None, order_manager=None,
+                           scheduler=None):
+    """
+    Size the cycle's collected signals in one portfolio-level pass, then dispatch them.
+    """
+    if not pending:
+        return
+    sizes = risk_engine.size([(p['symbol'], p['final_signal'], p['last_price'], p['sl']) for p in pending])
+    await asyncio.gather(*(
+        dispatch_signal(**signal, position_size=float(size), scanner=scanner, alerts=alerts, storage=storage,
+                        order_manager=order_manager, scheduler=scheduler)
+        for signal, size in zip(pending, sizes)
+    ))
+
+
+async def refresh_exposure(risk_engine, positions, tickers, scanner):
+    """
+    Load the positions already held (open paper positions, or live spot holdings) into the risk engine's caps.
+    """
+    try:
+        risk_engine.exposure = await scanner.run_blocking(positions.exposure, tickers)
+    except Exception as e:
+        logger.error(f"Could not refresh open exposure, keeping the last known: {e}")
+
+
+async def scan_batched(symbols, broker, signal_engine, capital, final_signal=None, scanner=None, fetcher=None,
+                       alerts=None, storage=None, order_manager=None, scheduler=None, pending=None):
+    """
+    Fetch every symbol concurrently, then evaluate each timeframe for the whole
+    universe with a single vectorized SignalEngine.generate_batch call. With a
+    scheduler, only the timeframes due for each symbol are fetched and evaluated.
+    """
+    async def fetch(symbol):
+        due = due_timeframes(symbol, scheduler, final_signal)
+        return await fetch_symbol_frames(symbol, broker, scanner, fetcher, timeframes=due) if due else None
+
+    fetched = await scanner.scan(symbols, fetch)
+    fetched = {symbol: value for symbol, value in fetched.items() if value is not None}
+
+    results = {symbol: {} for symbol in fetched}
+    for tf in SETTINGS['trading']['timeframes']:
+        # Every OHLCV field, as scan_sharded passes: rule strategies may read more than closes
+        tf_symbols, closes, fields = build_ohlcv_panel({symbol: df_dict[tf] for symbol, (_, df_dict) in fetched.items()
+                                                        if tf in df_dict})
+        if not tf_symbols:
+            continue
+        for symbol, result in signal_engine.generate_batch(tf_symbols, closes, fields).items():
+            results[symbol][tf] = result
+    results = {symbol: with_cached(symbol, results[symbol], fetched[symbol][1], scheduler) for symbol in fetched}
+
+    await scanner.scan(
+        list(fetched),
+        lambda symbol: act_on_results(symbol, fetched[symbol][0], fetched[symbol][1], results[symbol], capital,
+                                      final_signal=final_signal, scanner=scanner, alerts=alerts, storage=storage,
+                                      order_manager=order_manager, scheduler=scheduler,
+                                      pending=pending)
+    )
 
 
-async def main(test_mode=False, final_signal=None, custom_symbols=None):
-    broker = OKXInterface(SETTINGS['api']['okx'])
-    broker.connect()
+async def scan_sharded(symbols, broker, evaluator, capital, final_signal=None, scanner=None, fetcher=None,
+                       alerts=None, storage=None, order_manager=None, scheduler=None, pending=None):
+    """
+    Fetch raw candles concurrently, evaluate each timeframe across worker
+    processes reading them from shared memory, then act on the gathered
+    results here in the main process. With a scheduler, only the timeframes
+    due for each symbol are fetched and evaluated.
+    """
+    async def fetch(symbol):
+        due = due_timeframes(symbol, scheduler, final_signal)
+        return await fetch_symbol_frames(symbol, broker, scanner, fetcher, raw=True, timeframes=due) if due else None
 
-    signal_engine = SignalEngine(strategy_name=SETTINGS['trading']['strategy'])
+    fetched = await scanner.scan(symbols, fetch)
+    fetched = {symbol: value for symbol, value in fetched.items() if value is not None}
+
+    results = {symbol: {} for symbol in fetched}
+    history_bars = SETTINGS.get('storage', {}).get('history_bars', 100)
+    for tf in SETTINGS['trading']['timeframes']:
+        tf_results = await evaluator.evaluate({symbol: rows[tf] for symbol, (_, rows) in fetched.items()
+                                               if tf in rows}, history_bars)
+        for symbol, result in tf_results.items():
+            results[symbol][tf] = result
+    results = {symbol: with_cached(symbol, results[symbol], fetched[symbol][1], scheduler) for symbol in fetched}
+
+    # DataFrames are only built for the symbols that will alert or trade
+    active = [s for s in fetched if final_signal or any(r.signal for r in results[s].values())]
+    await scanner.scan(
+        active,
+        lambda symbol: act_on_results(symbol, fetched[symbol][0],
+                                      {tf: DataFetcher._to_frame(rows) for tf, rows in fetched[symbol][1].items()
+                                       if rows is not None},
+                                      results[symbol], capital, final_signal=final_signal, scanner=scanner,
+                                      alerts=alerts, storage=storage, order_manager=order_manager, scheduler=scheduler,
+                                      pending=pending)
+    )
+
+
+async def run_stream(symbols, broker, signal_engine, capital, final_signal=None, scanner=None, alerts=None,
+                     storage=None, order_manager=None, scheduler=None, risk_engine=None, positions=None):
+    """
+    Streaming mode: evaluate a symbol only when one of its candles closes.
+    With a `risk_engine`, each signal is sized under the portfolio caps against the
+    positions held at that moment (read from `positions`, when given).
+    """
+    timeframes = SETTINGS['trading']['timeframes']
+    base_timeframe = min(timeframes, key=timeframe_to_ms)
+    stream_cfg = SETTINGS.get('stream', {})
+    results = {symbol: {} for symbol in symbols}
+    stream = None
+    observed_at = None
+
+    async def on_candle_close(symbol, timeframe, candles):
+        nonlocal observed_at
+        if risk_engine is not None and timeframe == base_timeframe and candles[-1][0] != observed_at:
+            # One return observation per base candle for the universe, from the stream-fed ticker snapshot
+            observed_at = candles[-1][0]
+            tickers = await scanner.run_blocking(broker.fetch_tickers)
+            risk_engine.observe({s: tickers[s].get('last') for s in symbols if s in tickers})
+        if timeframe == base_timeframe and order_manager is not None and isinstance(order_manager.broker, PaperBroker):
+            # Resting paper TP/SL orders fill against the closed base candle; a longer candle's range
+            # covers prices from before those orders existed. Live exits rest on the exchange.
+            order_manager.broker.on_candle(symbol, candles[-1])
+        buffers = {tf: stream.buffers[(symbol, tf)] for tf in timeframes if len(stream.buffers[(symbol, tf)])}
+        for tf, buffer in buffers.items():
+            if tf == timeframe or tf not in results[symbol]:
+                # Evaluated on the buffer's column views; no per-candle DataFrame
+                results[symbol][tf] = signal_engine.generate_incremental(symbol, tf, buffer)
+        # DataFrames (copies) only for the signals that will alert or trade
+        df_dict = {}
+        if final_signal or any(r.signal for r in results[symbol].values()):
+            df_dict = {tf: buffer.to_frame() for tf, buffer in buffers.items()}
+        ticker = await scanner.run_blocking(broker.fetch_ticker, symbol)
+        pending = [] if risk_engine is not None else None
+        await act_on_results(symbol, ticker, df_dict, results[symbol], capital,
+                             final_signal=final_signal, scanner=scanner, alerts=alerts, storage=storage,
+                             order_manager=order_manager, scheduler=scheduler, pending=pending)
+        if pending:
+            if positions is not None:
+                await refresh_exposure(risk_engine, positions, await scanner.run_blocking(broker.fetch_tickers),
+                                       scanner)
+            await dispatch_pending(pending, risk_engine, scanner=scanner, alerts=alerts, storage=storage,
+                                   order_manager=order_manager, scheduler=scheduler)
+        journal = current_cycle()
+        if journal is not None and len(journal.entries) >= AUDIT_FLUSH_ENTRIES:
+            # A stream is one long cycle; append its journal in chunks
+            await scanner.run_blocking(journal.write)
+
+    stream = broker.stream(
+        symbols, timeframes, on_candle_close,
+        buffer_size=stream_cfg.get('buffer_size', 300),
+        ping_interval=stream_cfg.get('ping_interval_sec', 25),
+        max_reconnect_delay=stream_cfg.get('max_reconnect_delay_sec', 60)
+    )
+    logger.info(f"Streaming {len(symbols)} symbols on {timeframes}")
+    await stream.run()
+
+
+def build_scanner() -> MarketScanner:
+    scan_cfg = SETTINGS.get('scanner', {})
+    return MarketScanner(
+        max_concurrency=scan_cfg.get('max_concurrency', 16),
+        symbol_timeout=scan_cfg.get('symbol_timeout_sec', 30)
+    )
+
+
+def build_fetcher(broker, storage) -> DataFetcher:
+    agg_cfg = SETTINGS.get('aggregation', {})
+    aggregator = None
+    if agg_cfg.get('enabled', False):
+        timeframes = SETTINGS['trading']['timeframes']
+        aggregator = TimeframeAggregator(min(timeframes, key=timeframe_to_ms),
+                                         long_offset_hours=agg_cfg.get('long_offset_hours', 0))
+    if not SETTINGS.get('storage', {}).get('candle_store', False):
+        return DataFetcher(broker, aggregator=aggregator)
+    return DataFetcher(broker, storage=storage, aggregator=aggregator,
+                       max_backfill_pages=agg_cfg.get('max_backfill_pages', 4))
+
+
+class DryRunAlerts:
+    """
+    Alert sink for --dry-run: alerts are logged instead of emailed.
+    """
+
+    def send(self, subject: str, body: str, attachment_path: str = None):
+        logger.info(f"[DRY RUN] Alert: {subject}{body}")
+
+    def begin_cycle(self):
+        pass
+
+    def flush(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class ScanSession:
+    """
+    State kept alive across scan cycles: one connected broker, the signal
+    engine with its indicator state, storage, and the live execution pipeline.
+
+    Cycles run on the session's own event loop (`run`), and so does the idle
+    time between them (`sleep`), so the pipeline keeps its order map and keeps
+    tracking fills over the orders channel for the life of the process.
+
+    With dry_run=True the session works from the local candle store only:
+    no exchange connection, no SMTP, no orders, and no state is saved.
+    """
+
+    def __init__(self, test_mode=False, dry_run=False):
+        storage_cfg = SETTINGS.get('storage', {})
+        self.dry_run = dry_run
+        self.storage = DataStorage(max_candle_bars=storage_cfg.get('max_candle_bars', 5000),
+                                   sqlite_file=storage_cfg.get('sqlite_file'), read_only=dry_run)
+        ticker_ttl = SETTINGS.get('scanner', {}).get('ticker_ttl_sec', 60)
+        self.market_cache = None
+        if dry_run:
+            from core.offline_broker import OfflineBroker
+            self.broker = OfflineBroker(self.storage, min(SETTINGS['trading']['timeframes'], key=timeframe_to_ms),
+                                        ticker_ttl=ticker_ttl)
+            self.broker.connect()
+        else:
+            self.broker = OKXInterface(SETTINGS['api']['okx'], ticker_ttl=ticker_ttl,
+                                       rate_limits=SETTINGS.get('rate_limits'))
+            self.market_cache = MarketCache(storage_cfg.get('market_cache_file', 'data/storage/markets.json'),
+                                            ttl=storage_cfg.get('market_cache_ttl_sec', 6 * 3600))
+            self.broker.connect(self.market_cache)
+        self.markets_checked_at = time.time()
+        logger.info(f"Broker session ready after {time.perf_counter() - STARTED_AT:.2f}s")
+
+        self.signal_engine = SignalEngine(strategy_name=SETTINGS['trading']['strategy'])
+        if storage_cfg.get('retention_days') and not dry_run:
+            self.storage.enable_auto_pruning(storage_cfg['retention_days'])
+        self.fetcher = build_fetcher(self.broker, self.storage)
+        self.signal_engine.load_indicator_state(self.storage.load_signal_json(INDICATOR_STATE_FILE))
+        # scanner.evaluate_on_close: re-evaluate a timeframe only after one of its candles closes
+        self.scheduler = None
+        if SETTINGS.get('scanner', {}).get('evaluate_on_close', False):
+            self.scheduler = EvaluationScheduler.from_dict(
+                self.storage.load_signal_json(EVALUATION_STATE_FILE),
+                long_offset_hours=SETTINGS.get('aggregation', {}).get('long_offset_hours', 0))
+
+        email_cfg = SETTINGS['alerts']['email']
+        self.alerts = None
+        if dry_run:
+            self.alerts = DryRunAlerts()
+        elif email_cfg and email_cfg.get('enabled'):
+            from utils.alert_dispatcher import AlertDispatcher
+            self.alerts = AlertDispatcher(email_cfg, digest=email_cfg.get('digest', False),
+                                          max_retries=email_cfg.get('max_retries', 3)).start()
+
+        # scanner.workers > 1: evaluate signals in a process pool over shared-memory candles
+        workers = SETTINGS.get('scanner', {}).get('workers', 0)
+        self.evaluator = None
+        if workers > 1:
+            from core.shared_panel import ShardedEvaluator
+            self.evaluator = ShardedEvaluator(workers, SETTINGS['trading']['strategy'])
+
+        # risk.enabled: size each cycle's signals together under portfolio exposure caps
+        risk_cfg = SETTINGS.get('risk', {})
+        self.risk_engine = None
+        if risk_cfg.get('enabled', False):
+            self.risk_engine = PortfolioRiskEngine(
+                SETTINGS['trading']['capital_usd'],
+                risk_per_trade=risk_cfg.get('risk_per_trade', 0.02),
+                max_gross=risk_cfg.get('max_gross', 3.0),
+                max_net=risk_cfg.get('max_net', 2.0),
+                max_sector=risk_cfg.get('max_sector', 1.0),
+                max_correlation=risk_cfg.get('max_correlation', 0.7),
+                sectors=risk_cfg.get('sectors'),
+                window=risk_cfg.get('window', 288),
+                min_periods=risk_cfg.get('min_periods', 30))
+
+        # --test-mode: orders go to an in-memory paper broker fed with live prices
+        self.paper_broker = None
+        self.order_manager = None
+        if test_mode and not dry_run:
+            paper_cfg = SETTINGS.get('paper', {})
+            self.paper_broker = PaperBroker(self.broker,
+                                            balance=paper_cfg.get('balance', SETTINGS['trading']['capital_usd']),
+                                            fee_rate=paper_cfg.get('fee_rate', 0.001),
+                                            slippage_bps=paper_cfg.get('slippage_bps', 5))
+            self.order_manager = OrderManager(self.paper_broker, SETTINGS['trading']['capital_usd'])
+        self.pipeline = None
+        self._runner = asyncio.Runner()
+
+    def run(self, coro):
+        """
+        Run a coroutine (e.g. a scan cycle) on the session's event loop.
+        """
+        return self._runner.run(coro)
+
+    def sleep(self, seconds: float):
+        """
+        Wait between cycles with the event loop running, so background order tracking carries on.
+        """
+        self.run(asyncio.sleep(seconds))
+
+    async def start_execution(self, capital: float) -> OrderManager:
+        """
+        Start the live execution pipeline once, inside the session's event loop,
+        and return the order manager submitting through it.
+        """
+        if self.pipeline is None:
+            exec_cfg = SETTINGS.get('execution', {})
+            self.pipeline = await ExecutionPipeline(self.broker.async_exchange(),
+                                                    batch_size=exec_cfg.get('batch_size', OKX_BATCH_LIMIT),
+                                                    batch_window=exec_cfg.get('batch_window_ms', 20) / 1000).start()
+            self.order_manager = OrderManager(self.broker, capital, alerts=self.alerts, pipeline=self.pipeline)
+        return self.order_manager
+
+    def close(self):
+        if self.pipeline is not None:
+            self.run(self.pipeline.close())
+            self.pipeline = None
+        self._runner.close()
+        if self.alerts is not None:
+            self.alerts.stop()
+        if self.evaluator is not None:
+            self.evaluator.shutdown()
+        self.storage.close()
+
+    def refresh_markets_if_due(self):
+        """
+        Refresh market metadata in the background once per cache TTL.
+        """
+        if self.market_cache is None or time.time() - self.markets_checked_at < self.market_cache.ttl:
+            return
+        self.markets_checked_at = time.time()
+        threading.Thread(target=self.broker.refresh_markets, args=(self.market_cache,), daemon=True).start()
+
+
+async def main(test_mode=False, final_signal=None, custom_symbols=None, stream=False, session=None, dry_run=False):
+    owns_session = session is None
+    session = session or ScanSession(test_mode=test_mode, dry_run=dry_run)
+    # Correlation ID for this cycle's log records, and the journal of its decisions
+    journal = begin_cycle(SETTINGS.get('logging', {}).get('audit_dir'))
+    session.refresh_markets_if_due()
+    broker, signal_engine, storage, fetcher = session.broker, session.signal_engine, session.storage, session.fetcher
+    scanner = build_scanner()
+    if session.alerts is not None:
+        session.alerts.begin_cycle()
+    paper = session.paper_broker
+    if paper is not None:
+        # Let resting paper TP/SL orders see the latest prices before new signals arrive
+        tickers = await scanner.run_blocking(broker.fetch_tickers)
+        paper.update_prices({s: t['last'] for s, t in tickers.items() if t.get('last') is not None})
 
     # Dynamically fetch active symbols
 
@@ -135,38 +659,125 @@ async def main(test_mode=False, final_signal=None, custom_symbols=None):
         filtered_symbols = normalized
         logger.info(f"[MANUAL SYMBOL OVERRIDE] Running only for: {filtered_symbols}")
     else:
-        # Apply dynamic filters only if no --symbol passed
+        # Apply dynamic filters only if no --symbol passed, from one bulk ticker snapshot
+        tickers = await scanner.run_blocking(broker.fetch_tickers)
         filtered_symbols = []
         for s in all_symbols:
-            try:
-                ticker = broker.fetch_ticker(s)
-                if ticker['quoteVolume'] > SETTINGS['trading']['volume_min_threshold'] and ticker['last'] < \
-                        SETTINGS['trading']['price_max_threshold']:
-                    filtered_symbols.append(s)
-            except Exception:
+            ticker = tickers.get(s)
+            if not ticker or ticker.get('last') is None:
                 continue
+            if (ticker.get('quoteVolume') or 0) > SETTINGS['trading']['volume_min_threshold'] and ticker['last'] < \
+                    SETTINGS['trading']['price_max_threshold']:
+                filtered_symbols.append(s)
 
     logger.info(f"Scanning {len(filtered_symbols)} symbols...")
-    for symbol in filtered_symbols:
-        await analyze_symbol(symbol, broker, signal_engine, SETTINGS['trading']['capital_usd'],
-                             final_signal=args.final_signal)
+    CYCLE_SYMBOLS.set(len(filtered_symbols))
+    capital = SETTINGS['trading']['capital_usd']
+    order_manager = session.order_manager
+    if order_manager is None and SETTINGS.get('execution', {}).get('enabled', False) and not session.dry_run:
+        order_manager = await session.start_execution(capital)
+    risk = session.risk_engine
+    # Positions held count against the risk caps: open paper positions (--test-mode) or live spot holdings
+    positions = None if session.dry_run else (paper if paper is not None else broker)
+    pending = None
+    if risk is not None:
+        # One return observation per cycle for the whole universe, from the (cached) bulk snapshot
+        tickers = await scanner.run_blocking(broker.fetch_tickers)
+        risk.observe({s: tickers[s].get('last') for s in all_symbols if s in tickers})
+        if positions is not None:
+            # Positions held before this cycle count against the caps
+            await refresh_exposure(risk, positions, tickers, scanner)
+        pending = [] if not stream else None  # streamed signals are sized one by one as they arrive
+    with metrics.timed('scan_cycle'):
+        try:
+            if stream:
+                await run_stream(filtered_symbols, broker, signal_engine, capital,
+                                 final_signal=final_signal, scanner=scanner, alerts=session.alerts, storage=storage,
+                                 order_manager=order_manager, scheduler=session.scheduler, risk_engine=risk,
+                                 positions=positions)
+            elif session.evaluator is not None:
+                await scan_sharded(filtered_symbols, broker, session.evaluator, capital,
+                                   final_signal=final_signal, scanner=scanner, fetcher=fetcher, alerts=session.alerts,
+                                   storage=storage, order_manager=order_manager, scheduler=session.scheduler,
+                                   pending=pending)
+            elif SETTINGS.get('scanner', {}).get('batch_signals', False):
+                await scan_batched(filtered_symbols, broker, signal_engine, capital,
+                                   final_signal=final_signal, scanner=scanner, fetcher=fetcher, alerts=session.alerts,
+                                   storage=storage, order_manager=order_manager, scheduler=session.scheduler,
+                                   pending=pending)
+            else:
+                await scanner.scan(
+                    filtered_symbols,
+                    lambda symbol: analyze_symbol(symbol, broker, signal_engine, capital, final_signal=final_signal,
+                                                  scanner=scanner, fetcher=fetcher, alerts=session.alerts,
+                                                  storage=storage, order_manager=order_manager,
+                                                  scheduler=session.scheduler, pending=pending)
+                )
+            if pending:
+                await dispatch_pending(pending, risk, scanner=scanner, alerts=session.alerts, storage=storage,
+                                       order_manager=order_manager, scheduler=session.scheduler)
+        finally:
+            if session.pipeline is not None and owns_session:
+                # A one-off session's pipeline cannot outlive this event loop
+                await session.pipeline.close()
+                session.pipeline = None
+            elif session.pipeline is not None:
+                # Send everything queued this cycle; the pipeline itself lives on with the session
+                await session.pipeline.flush()
+            scanner.shutdown()
+            if session.alerts is not None:
+                session.alerts.flush()
+            if not session.dry_run:
+                storage.save_signal_json(signal_engine.export_indicator_state(), INDICATOR_STATE_FILE)
+                if session.scheduler is not None:
+                    storage.save_signal_json(session.scheduler.to_dict(), EVALUATION_STATE_FILE)
+            if paper is not None:
+                logger.info(f"📄 Paper account: {paper.summary()}")
+            journal.write()
 
-if __name__ == '__main__':
+def cli(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--test-mode', action='store_true', help="Run in test mode without executing trades")
+    parser.add_argument('--final-signal', choices=["BUY", "SELL"], help="Force a signal for testing purposes")
+    parser.add_argument('--symbol', nargs='+', help="Analyze only specific symbols (e.g., RDNT ETH SOL)")
+    parser.add_argument('--stream', action='store_true', help="Evaluate on candle close over WebSocket instead of polling")
+    parser.add_argument('--once', action='store_true', help="Run a single scan cycle and exit (e.g. from cron)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Scan the local candle store only: no exchange, email or orders")
+    args = parser.parse_args(argv)
+    if args.stream and args.dry_run:
+        parser.error("--stream needs the exchange and cannot be combined with --dry-run")
+
+    configure_logging(SETTINGS.get('logging'))
+    logger.info(f"Imports took {IMPORTED_AT - STARTED_AT:.3f}s")
+    metrics.configure(SETTINGS.get('metrics'))
+    session = None
+    interval = SETTINGS.get('scanner', {}).get('interval_sec', 600)
     while True:
         try:
-            parser = argparse.ArgumentParser()
-            parser.add_argument('--test-mode', action='store_true', help="Run in test mode without executing trades")
-            parser.add_argument('--final-signal', choices=["BUY", "SELL"], help="Force a signal for testing purposes")
-            parser.add_argument('--symbol', nargs='+', help="Analyze only specific symbols (e.g., RDNT ETH SOL)")
-            args = parser.parse_args()
+            # Connect once; later cycles reuse the same broker session and state
+            session = session or ScanSession(test_mode=args.test_mode, dry_run=args.dry_run)
+            session.run(main(test_mode=args.test_mode, final_signal=args.final_signal, custom_symbols=args.symbol,
+                             stream=args.stream, session=session))
+            if args.stream or args.once:
+                break
 
-            asyncio.run(main(test_mode=args.test_mode, final_signal=args.final_signal, custom_symbols=args.symbol))
-
-            logger.info("✅ Scan complete. Sleeping 10 min...")
-            time.sleep(600)
+            logger.info(f"✅ Scan complete. Sleeping {interval // 60} min...")
+            session.sleep(interval)
         except KeyboardInterrupt:
             logger.info("Stopped by user.")
             break
         except Exception as e:
             logger.critical(f"Unhandled error: {e}")
-            time.sleep(60)
+            if args.once:
+                raise
+            if session is not None:
+                session.sleep(60)
+            else:
+                time.sleep(60)
+    if session is not None:
+        session.close()
+
+
+if __name__ == '__main__':
+    cli()
@@ -0,0 +1,245 @@
+# strategies/indicators.py
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+class EMAState:
+    """
+    Exponential moving average updated one value at a time.
+
+    Matches pandas `ewm(alpha=..., adjust=False, min_periods=...)`, which is how
+    `ta` computes its EMA, RSI and MACD series: the average is seeded with the
+    first value and reported as NaN until `min_periods` values have been seen.
+    """
+
+    def __init__(self, alpha: float, min_periods: int, value: float = None, count: int = 0):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = value
+        self.count = count
+
+    def _next(self, x: float) -> float:
+        if self.value is None:
+            return x
+        return self.value + self.alpha * (x - self.value)
+
+    def _output(self, value, count) -> float:
+        return value if count >= self.min_periods else math.nan
+
+    def peek(self, x: float) -> float:
+        """Value the average would have after `x`, without consuming it."""
+        return self._output(self._next(x), self.count + 1)
+
+    def update(self, x: float) -> float:
+        self.value = self._next(x)
+        self.count += 1
+        return self._output(self.value, self.count)
+
+    @property
+    def current(self) -> float:
+        if self.value is None:
+            return math.nan
+        return self._output(self.value, self.count)
+
+    def to_dict(self) -> dict:
+        return {'alpha': self.alpha, 'min_periods': self.min_periods, 'value': self.value, 'count': self.count}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data['alpha'], data['min_periods'], data['value'], data['count'])
+
+
+class RSIState:
+    """
+    Wilder RSI matching `ta.momentum.RSIIndicator(window=...).rsi()`.
+    """
+
+    def __init__(self, window: int = 14, prev_close: float = None, up: EMAState = None, down: EMAState = None):
+        self.window = window
+        self.prev_close = prev_close
+        self.up = up or EMAState(1 / window, window)
+        self.down = down or EMAState(1 / window, window)
+
+    def _moves(self, close: float):
+        # `ta` turns the leading NaN diff into a 0.0 move, so the first close seeds both averages with 0
+        diff = 0.0 if self.prev_close is None else close - self.prev_close
+        return max(diff, 0.0), max(-diff, 0.0)
+
+    @staticmethod
+    def _rsi(up: float, down: float) -> float:
+        if math.isnan(down):
+            return math.nan
+        if down == 0:
+            return 100.0
+        return 100 - 100 / (1 + up / down)
+
+    def peek(self, close: float) -> float:
+        gain, loss = self._moves(close)
+        return self._rsi(self.up.peek(gain), self.down.peek(loss))
+
+    def update(self, close: float) -> float:
+        gain, loss = self._moves(close)
+        self.prev_close = close
+        return self._rsi(self.up.update(gain), self.down.update(loss))
+
+    def to_dict(self) -> dict:
+        return {
+            'window': self.window,
+            'prev_close': self.prev_close,
+            'up': self.up.to_dict(),
+            'down': self.down.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data['window'], data['prev_close'], EMAState.from_dict(data['up']), EMAState.from_dict(data['down']))
+
+
+class MACDState:
+    """
+    MACD line, signal line and histogram matching `ta.trend.MACD`.
+    """
+
+    def __init__(self, fast: int = 12, slow: int = 26, sign: int = 9,
+                 ema_fast: EMAState = None, ema_slow: EMAState = None, ema_sign: EMAState = None):
+        self.fast = fast
+        self.slow = slow
+        self.sign = sign
+        self.ema_fast = ema_fast or EMAState(2 / (fast + 1), fast)
+        self.ema_slow = ema_slow or EMAState(2 / (slow + 1), slow)
+        self.ema_sign = ema_sign or EMAState(2 / (sign + 1), sign)
+
+    @staticmethod
+    def _values(macd: float, signal: float) -> tuple:
+        return macd, signal, macd - signal
+
+    def peek(self, close: float) -> tuple:
+        macd = self.ema_fast.peek(close) - self.ema_slow.peek(close)
+        # The signal line only starts once the MACD line itself is defined
+        signal = math.nan if math.isnan(macd) else self.ema_sign.peek(macd)
+        return self._values(macd, signal)
+
+    def update(self, close: float) -> tuple:
+        macd = self.ema_fast.update(close) - self.ema_slow.update(close)
+        signal = math.nan if math.isnan(macd) else self.ema_sign.update(macd)
+        return self._values(macd, signal)
+
+    def to_dict(self) -> dict:
+        return {
+            'fast': self.fast,
+            'slow': self.slow,
+            'sign': self.sign,
+            'ema_fast': self.ema_fast.to_dict(),
+            'ema_slow': self.ema_slow.to_dict(),
+            'ema_sign': self.ema_sign.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data['fast'], data['slow'], data['sign'], EMAState.from_dict(data['ema_fast']),
+                   EMAState.from_dict(data['ema_slow']), EMAState.from_dict(data['ema_sign']))
+
+
+class IndicatorState:
+    """
+    RSI, MACD and EMA state for one symbol/timeframe, advanced one closed candle at a time.
+
+    `update` consumes a closed candle in O(1); `peek` evaluates the still-forming
+    candle without consuming it, so the state can be reused when it closes.
+    """
+
+    def __init__(self, rsi_window: int = 14, ema_window: int = 50, last_ts: int = None,
+                 rsi: RSIState = None, macd: MACDState = None, ema: EMAState = None):
+        self.last_ts = last_ts
+        self.rsi = rsi or RSIState(rsi_window)
+        self.macd = macd or MACDState()
+        self.ema = ema or EMAState(2 / (ema_window + 1), ema_window)
+
+    @staticmethod
+    def _values(close, rsi, macd, ema_50) -> dict:
+        macd_line, _, macd_diff = macd
+        return {
+            'rsi': rsi,
+            'macd': macd_line,
+            'macd_diff': macd_diff,
+            'ema_50': ema_50,
+            'entry_price': close
+        }
+
+    def update(self, timestamp: int, close: float) -> dict:
+        self.last_ts = int(timestamp)
+        return self._values(close, self.rsi.update(close), self.macd.update(close), self.ema.update(close))
+
+    def peek(self, close: float) -> dict:
+        return self._values(close, self.rsi.peek(close), self.macd.peek(close), self.ema.peek(close))
+
+    def to_dict(self) -> dict:
+        return {
+            'last_ts': self.last_ts,
+            'rsi': self.rsi.to_dict(),
+            'macd': self.macd.to_dict(),
+            'ema': self.ema.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(last_ts=data['last_ts'], rsi=RSIState.from_dict(data['rsi']),
+                   macd=MACDState.from_dict(data['macd']), ema=EMAState.from_dict(data['ema']))
+
+
+# === Vectorized panel versions ===
+# Each function takes a (symbols, time) float array whose rows may be left-padded
+# with NaN (shorter histories) and computes every row in one pass over time.
+
+# Above this many bars the time loop is slower than pandas' compiled ewm per column
+LONG_HISTORY_BARS = 2000
+
+
+def ema_panel(values: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    """
+    Row-wise `ewm(alpha=alpha, adjust=False, min_periods=min_periods).mean()`.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.shape[1] > LONG_HISTORY_BARS:
+        frame = pd.DataFrame(values.T)
+        return frame.ewm(alpha=alpha, adjust=False, min_periods=min_periods).mean().to_numpy().T
+
+    out = np.full(values.shape, np.nan)
+    value = np.full(values.shape[0], np.nan)
+    count = np.zeros(values.shape[0], dtype=np.int64)
+    for t in range(values.shape[1]):
+        x = values[:, t]
+        valid = ~np.isnan(x)
+        seeded = ~np.isnan(value)
+        value = np.where(valid, np.where(seeded, value + alpha * (x - value), x), value)
+        count += valid
+        out[:, t] = np.where(count >= min_periods, value, np.nan)
+    return out
+
+
+def rsi_panel(closes: np.ndarray, window: int = 14) -> np.ndarray:
+    closes = np.asarray(closes, dtype=np.float64)
+    padding = np.isnan(closes)
+    diff = np.diff(closes, axis=1, prepend=np.nan)
+    # Same as `ta`: the first diff of each series counts as a 0.0 move
+    gains = np.where(diff > 0, diff, 0.0)
+    losses = np.where(diff < 0, -diff, 0.0)
+    gains[padding] = np.nan
+    losses[padding] = np.nan
+
+    up = ema_panel(gains, 1 / window, window)
+    down = ema_panel(losses, 1 / window, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(down == 0, 100.0, 100 - 100 / (1 + up / down))
+
+
+def macd_panel(closes: np.ndarray, fast: int = 12, slow: int = 26, sign: int = 9) -> tuple:
+    """
+    Returns (macd, macd_signal, macd_diff) panels.
+    """
+    macd = ema_panel(closes, 2 / (fast + 1), fast) - ema_panel(closes, 2 / (slow + 1), slow)
+    signal = ema_panel(macd, 2 / (sign + 1), sign)
+    return macd, signal, macd - signal
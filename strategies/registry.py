@@ -0,0 +1,60 @@
+# strategies/registry.py
+
+from strategies.rsi_macd_strategy import RSIMACDStrategy
+from strategies.rules import RuleSet, RuleStrategy
+
+# name -> factory(**kwargs) returning a strategy instance
+STRATEGIES = {}
+_rules_loaded = False
+
+
+def register(name: str, factory=None):
+    """
+    Register a strategy class or factory under `name`; usable as a decorator.
+    """
+    if factory is None:
+        return lambda f: register(name, f)
+    STRATEGIES[name] = factory
+    return factory
+
+
+def register_rules(definitions: list):
+    """
+    Register declarative strategies, e.g. from the `strategies` list in settings.yaml:
+    [{'name': ..., 'buy': "rsi(14) < 30 and ...", 'sell': "..."}]. Rules are parsed here,
+    so a malformed rule fails at startup rather than mid-scan.
+    """
+    for definition in definitions or []:
+        strategy = RuleStrategy(definition['name'], definition.get('buy'), definition.get('sell'))
+        register(strategy.name, lambda strategy=strategy, **kwargs: strategy)
+
+
+def _load_configured_rules():
+    global _rules_loaded
+    if not _rules_loaded:
+        _rules_loaded = True
+        from config.settings import SETTINGS
+        register_rules(SETTINGS.get('strategies'))
+
+
+def create_strategy(name: str, **kwargs):
+    if name not in STRATEGIES:
+        _load_configured_rules()
+    if name not in STRATEGIES:
+        raise NotImplementedError(f"Strategy '{name}' not supported.")
+    return STRATEGIES[name](**kwargs)
+
+
+def build_strategy(names, **kwargs):
+    """
+    One strategy name gives that strategy; several give a RuleSet evaluating them together.
+    Rule strategies always run through a RuleSet.
+    """
+    names = [names] if isinstance(names, str) else list(names)
+    strategies = [create_strategy(name, **kwargs) for name in names]
+    if len(strategies) == 1 and not isinstance(strategies[0], RuleStrategy):
+        return strategies[0]
+    return RuleSet(strategies)
+
+
+register('rsi_macd', RSIMACDStrategy)
@@ -1,5 +1,6 @@
 # strategies/rsi_macd_strategy.py
 
+import numpy as np
 import pandas as pd
 import ta
 
@@ -8,29 +9,40 @@ class RSIMACDStrategy:
         self.rsi_low = rsi_low
         self.rsi_high = rsi_high
 
-    def generate_signal(self, df: pd.DataFrame):
-        df = df.copy()
+    def evaluate(self, rsi, macd_diff, close, ema_50):
+        """
+        Apply the BUY/SELL rule to the latest indicator values.
+        """
+        if rsi < self.rsi_low and macd_diff > 0 and close > ema_50:
+            return 'BUY'
+        if rsi > self.rsi_high and macd_diff < 0 and close < ema_50:
+            return 'SELL'
+        return None
 
-        rsi = ta.momentum.RSIIndicator(close=df['close'], window=14).rsi()
-        macd = ta.trend.MACD(close=df['close'])
-        ema_50 = ta.trend.EMAIndicator(close=df['close'], window=50).ema_indicator()
+    def evaluate_panel(self, rsi, macd_diff, close, ema_50) -> np.ndarray:
+        """
+        Vectorized `evaluate` over arrays: 1 for BUY, -1 for SELL, 0 for no signal.
+        NaN indicator values never produce a signal.
+        """
+        buy = (rsi < self.rsi_low) & (macd_diff > 0) & (close > ema_50)
+        sell = (rsi > self.rsi_high) & (macd_diff < 0) & (close < ema_50)
+        return np.where(buy, 1, np.where(sell, -1, 0)).astype(np.int8)
 
-        df['rsi'] = rsi
-        df['macd'] = macd.macd()
-        df['macd_signal'] = macd.macd_signal()
-        df['macd_diff'] = df['macd'] - df['macd_signal']
-        df['ema_50'] = ema_50
+    def generate_signal(self, df: pd.DataFrame):
+        # Indicator series only; the caller's frame is neither copied nor extended
+        close = df['close']
+        rsi = ta.momentum.RSIIndicator(close=close, window=14).rsi()
+        macd = ta.trend.MACD(close=close)
+        macd_line = macd.macd()
+        macd_diff = macd_line - macd.macd_signal()
+        ema_50 = ta.trend.EMAIndicator(close=close, window=50).ema_indicator()
 
-        signal = None
-        if df['rsi'].iloc[-1] < self.rsi_low and df['macd_diff'].iloc[-1] > 0 and df['close'].iloc[-1] > df['ema_50'].iloc[-1]:
-            signal = 'BUY'
-        elif df['rsi'].iloc[-1] > self.rsi_high and df['macd_diff'].iloc[-1] < 0 and df['close'].iloc[-1] < df['ema_50'].iloc[-1]:
-            signal = 'SELL'
+        signal = self.evaluate(rsi.iloc[-1], macd_diff.iloc[-1], close.iloc[-1], ema_50.iloc[-1])
 
         return signal, {
             'rsi': rsi.iloc[-1],
-            'macd': df['macd'].iloc[-1],
-            'macd_diff': df['macd_diff'].iloc[-1],
-            'ema_50': df['ema_50'].iloc[-1],
-            'entry_price': df['close'].iloc[-1]
+            'macd': macd_line.iloc[-1],
+            'macd_diff': macd_diff.iloc[-1],
+            'ema_50': ema_50.iloc[-1],
+            'entry_price': close.iloc[-1]
         }
@@ -0,0 +1,297 @@
+# strategies/rules.py
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from strategies.indicators import ema_panel, macd_panel, rsi_panel
+
+SIGNAL_LABELS = {1: 'BUY', -1: 'SELL', 0: None}
+OHLCV_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+_TOKEN = re.compile(r"\s*(?:(\d+\.?\d*|\.\d+)|([A-Za-z_]\w*)|(<=|>=|==|!=|[<>()+\-*/,]))")
+_COMPARISONS = {'<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal,
+                '==': np.equal, '!=': np.not_equal}
+_ARITHMETIC = {'+': np.add, '-': np.subtract, '*': np.multiply, '/': np.divide}
+
+
+def _sma(ctx, window):
+    return pd.DataFrame(ctx.field('close').T).rolling(int(window)).mean().to_numpy().T
+
+
+def _macd(ctx, fast, slow, sign, part):
+    panels = ctx.memo(('macd_panel', fast, slow, sign), lambda: macd_panel(ctx.field('close'), int(fast), int(slow),
+                                                                            int(sign)))
+    return panels[part]
+
+
+# name -> (default arguments, or None when arguments are required; full-history panel function)
+INDICATORS = {
+    **{field: ((), lambda ctx, field=field: ctx.field(field)) for field in OHLCV_FIELDS},
+    'rsi': ((14,), lambda ctx, window: rsi_panel(ctx.field('close'), int(window))),
+    'ema': (None, lambda ctx, window: ema_panel(ctx.field('close'), 2 / (window + 1), int(window))),
+    'sma': (None, _sma),
+    'macd': ((12, 26, 9), lambda ctx, *args: _macd(ctx, *args, 0)),
+    'macd_signal': ((12, 26, 9), lambda ctx, *args: _macd(ctx, *args, 1)),
+    'macd_diff': ((12, 26, 9), lambda ctx, *args: _macd(ctx, *args, 2)),
+}
+
+# Indicator values every SignalResult reports, whatever the strategies are
+META_NODES = {
+    'rsi': ('ind', 'rsi', (14,)),
+    'macd': ('ind', 'macd', (12, 26, 9)),
+    'macd_diff': ('ind', 'macd_diff', (12, 26, 9)),
+    'ema_50': ('ind', 'ema', (50,)),
+    'entry_price': ('ind', 'close', ()),
+}
+
+
+class RuleSyntaxError(ValueError):
+    pass
+
+
+class _Parser:
+    """
+    Recursive-descent parser for rule expressions such as
+    `rsi(14) < 30 and macd_diff > 0 and close > ema(50)`.
+
+    Produces nested tuples; indicator arguments are filled with their
+    defaults, so `rsi` and `rsi(14)` become the same (shareable) node.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = []
+        pos = 0
+        while pos < len(text.rstrip()):
+            match = _TOKEN.match(text, pos)
+            if not match:
+                raise RuleSyntaxError(f"Unexpected input at {pos} in rule: {text!r}")
+            number, name, symbol = match.groups()
+            self.tokens.append(('num', float(number)) if number else ('name', name) if name else ('sym', symbol))
+            pos = match.end()
+        self.pos = 0
+
+    def parse(self):
+        node = self._or()
+        if self.pos != len(self.tokens):
+            raise RuleSyntaxError(f"Unexpected {self.tokens[self.pos][1]!r} in rule: {self.text!r}")
+        return node
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _accept(self, kind, value=None):
+        token = self._peek()
+        if token[0] == kind and (value is None or token[1] == value):
+            self.pos += 1
+            return token
+        return None
+
+    def _expect(self, kind, value):
+        if not self._accept(kind, value):
+            raise RuleSyntaxError(f"Expected {value!r} in rule: {self.text!r}")
+
+    def _or(self):
+        node = self._and()
+        while self._accept('name', 'or'):
+            node = ('or', node, self._and())
+        return node
+
+    def _and(self):
+        node = self._not()
+        while self._accept('name', 'and'):
+            node = ('and', node, self._not())
+        return node
+
+    def _not(self):
+        if self._accept('name', 'not'):
+            return ('not', self._not())
+        return self._comparison()
+
+    def _comparison(self):
+        node = self._sum()
+        token = self._peek()
+        if token[0] == 'sym' and token[1] in _COMPARISONS:
+            self.pos += 1
+            node = ('cmp', token[1], node, self._sum())
+        return node
+
+    def _sum(self):
+        node = self._term()
+        while self._peek()[0] == 'sym' and self._peek()[1] in '+-':
+            op = self.tokens[self.pos][1]
+            self.pos += 1
+            node = ('math', op, node, self._term())
+        return node
+
+    def _term(self):
+        node = self._unary()
+        while self._peek()[0] == 'sym' and self._peek()[1] in '*/':
+            op = self.tokens[self.pos][1]
+            self.pos += 1
+            node = ('math', op, node, self._unary())
+        return node
+
+    def _unary(self):
+        if self._accept('sym', '-'):
+            return ('neg', self._unary())
+        return self._atom()
+
+    def _atom(self):
+        token = self._accept('num')
+        if token:
+            return ('num', token[1])
+        if self._accept('sym', '('):
+            node = self._or()
+            self._expect('sym', ')')
+            return node
+        token = self._accept('name')
+        if not token or token[1] not in INDICATORS:
+            raise RuleSyntaxError(f"Unknown indicator {token[1] if token else self._peek()[1]!r} "
+                                  f"in rule: {self.text!r}")
+        name = token[1]
+        args = []
+        if self._accept('sym', '('):
+            while not self._accept('sym', ')'):
+                arg = self._accept('num')
+                if not arg:
+                    raise RuleSyntaxError(f"{name}() takes numeric arguments in rule: {self.text!r}")
+                args.append(arg[1])
+                self._accept('sym', ',')
+        defaults = INDICATORS[name][0]
+        if defaults is None and len(args) != 1:
+            raise RuleSyntaxError(f"{name}() needs a window, e.g. {name}(50), in rule: {self.text!r}")
+        if defaults is not None and len(args) > len(defaults):
+            raise RuleSyntaxError(f"{name}() takes at most {len(defaults)} argument(s) in rule: {self.text!r}")
+        if defaults:
+            args += defaults[len(args):]
+        return ('ind', name, tuple(float(a) for a in args))
+
+
+def parse_rule(text: str):
+    return _Parser(text).parse()
+
+
+class _Context:
+    """
+    One evaluation over a set of (symbols, time) panels. Every node is
+    computed at most once, whichever strategy or rule asks for it. Nodes are
+    evaluated on the last bar, or on every bar with full=True (backtests).
+    """
+
+    def __init__(self, fields: dict, full: bool = False):
+        self.fields = fields
+        self.full = full
+        self.cache = {}
+        close = self.field('close')
+        self.shape = close.shape if full else close.shape[:1]
+
+    def field(self, name: str) -> np.ndarray:
+        if name not in self.fields:
+            raise ValueError(f"Rule needs '{name}' candles, but only {sorted(self.fields)} were given")
+        return self.fields[name]
+
+    def memo(self, key, compute):
+        if key not in self.cache:
+            self.cache[key] = compute()
+        return self.cache[key]
+
+    def value(self, node) -> np.ndarray:
+        """
+        Value of `node` per symbol (and per bar with full=True).
+        """
+        return self.memo(node, lambda: self._compute(node))
+
+    def _compute(self, node):
+        kind = node[0]
+        if kind == 'num':
+            return node[1]
+        if kind == 'ind':
+            _, name, args = node
+            panel = INDICATORS[name][1](self, *args)
+            return panel if self.full else panel[:, -1]
+        if kind == 'cmp':
+            with np.errstate(invalid='ignore'):
+                return _COMPARISONS[node[1]](self.value(node[2]), self.value(node[3]))
+        if kind == 'math':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return _ARITHMETIC[node[1]](self.value(node[2]), self.value(node[3]))
+        if kind == 'neg':
+            return -self.value(node[1])
+        if kind == 'not':
+            return ~np.asarray(self.value(node[1]), dtype=bool)
+        if kind == 'and':
+            return np.asarray(self.value(node[1]), dtype=bool) & np.asarray(self.value(node[2]), dtype=bool)
+        if kind == 'or':
+            return np.asarray(self.value(node[1]), dtype=bool) | np.asarray(self.value(node[2]), dtype=bool)
+        raise ValueError(f"Unknown rule node: {node!r}")
+
+
+class RuleStrategy:
+    """
+    A strategy defined by BUY/SELL rule expressions, parsed once at construction.
+    A symbol matching both rules gets no signal; NaN indicators never match a comparison.
+    """
+
+    def __init__(self, name: str, buy: str = None, sell: str = None):
+        if not buy and not sell:
+            raise ValueError(f"Strategy '{name}' needs a buy and/or sell rule")
+        self.name = name
+        self.buy = parse_rule(buy) if buy else None
+        self.sell = parse_rule(sell) if sell else None
+
+    @staticmethod
+    def _mask(ctx, node):
+        if node is None:
+            return np.zeros(ctx.shape, dtype=bool)
+        return np.broadcast_to(np.asarray(ctx.value(node), dtype=bool), ctx.shape)
+
+    def evaluate_context(self, ctx: _Context) -> np.ndarray:
+        buy, sell = self._mask(ctx, self.buy), self._mask(ctx, self.sell)
+        return np.where(buy & ~sell, 1, np.where(sell & ~buy, -1, 0)).astype(np.int8)
+
+
+class RuleSet:
+    """
+    Evaluates several strategies over the same candles in one pass.
+
+    Indicator panels and subexpressions are shared between all strategies
+    (and computed once for all symbols), so adding a strategy costs roughly
+    its distinct indicators. Class-based strategies with an `evaluate_panel`
+    method take part through the shared RSI/MACD/EMA values. Strategies
+    combine like timeframes do: a signal stands when the strategies that
+    fire all agree.
+    """
+
+    def __init__(self, strategies: list):
+        self.strategies = strategies
+
+    def evaluate(self, fields: dict, full: bool = False) -> tuple:
+        """
+        `fields` maps OHLCV names to (symbols, time) arrays; 'close' is required.
+        Returns (combined signals, {strategy name: signals}, {meta name: values}),
+        for the last bar, or for every bar with full=True.
+        """
+        ctx = _Context({name: np.asarray(panel, dtype=np.float64) for name, panel in fields.items()}, full)
+        meta = {name: np.broadcast_to(ctx.value(node), ctx.shape) for name, node in META_NODES.items()}
+
+        per_strategy = {}
+        for strategy in self.strategies:
+            name = getattr(strategy, 'name', type(strategy).__name__)
+            if isinstance(strategy, RuleStrategy):
+                per_strategy[name] = strategy.evaluate_context(ctx)
+            else:
+                per_strategy[name] = strategy.evaluate_panel(meta['rsi'], meta['macd_diff'], meta['entry_price'],
+                                                             meta['ema_50'])
+
+        stacked = np.stack(list(per_strategy.values())) if per_strategy else np.zeros((1, *ctx.shape), dtype=np.int8)
+        buys, sells = (stacked == 1).any(axis=0), (stacked == -1).any(axis=0)
+        combined = np.where(buys & ~sells, 1, np.where(sells & ~buys, -1, 0)).astype(np.int8)
+        return combined, per_strategy, meta
+
+    def generate_signal(self, df: pd.DataFrame):
+        fields = {name: df[name].to_numpy(dtype=float)[None, :] for name in OHLCV_FIELDS if name in df}
+        signals, _, meta = self.evaluate(fields)
+        return SIGNAL_LABELS[int(signals[0])], {name: float(values[0]) for name, values in meta.items()}
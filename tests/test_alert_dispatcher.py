@@ -0,0 +1,95 @@
+import socketserver
+import threading
+
+from utils.alert_dispatcher import AlertDispatcher
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """
+    Minimal local SMTP server: accepts AUTH PLAIN and records every message.
+    `fail_data` makes the first N DATA commands fail with a transient error.
+    """
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, fail_data=0):
+        super().__init__(('127.0.0.1', 0), SMTPHandler)
+        self.messages = []
+        self.connections = 0
+        self.fail_data = fail_data
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        self.reply('220 localhost stand-in')
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                return
+            command = line.split(' ', 1)[0].upper()
+            if command == 'EHLO':
+                self.reply('250-localhost')
+                self.reply('250 AUTH PLAIN')
+            elif command == 'AUTH':
+                self.reply('235 authenticated')
+            elif command == 'DATA':
+                self.reply('354 go ahead')
+                lines = []
+                while (data := self.rfile.readline()) != b'.\r\n':
+                    lines.append(data.decode())
+                if server.fail_data:
+                    server.fail_data -= 1
+                    self.reply('451 try again later')
+                else:
+                    server.messages.append(''.join(lines))
+                    self.reply('250 queued')
+            elif command == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 ok')
+
+
+def start_server(**kwargs):
+    server = SMTPStandIn(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    config = {
+        'sender': 'bot@example.com', 'receiver': 'me@example.com', 'password': 'secret',
+        'smtp_server': '127.0.0.1', 'smtp_port': server.server_address[1], 'use_ssl': False
+    }
+    return server, config
+
+
+def test_alerts_reuse_one_connection():
+    server, config = start_server()
+    dispatcher = AlertDispatcher(config).start()
+    for i in range(3):
+        dispatcher.send(f"BUY Signal on S{i}/USDT", f"body {i}")
+    dispatcher.stop()
+    server.shutdown()
+
+    assert len(server.messages) == 3
+    assert server.connections == 1
+    assert dispatcher.sent == 3
+
+
+def test_digest_merges_cycle_alerts_and_retries_transient_failures():
+    server, config = start_server(fail_data=1)
+    dispatcher = AlertDispatcher(config, digest=True, backoff=0.01).start()
+    dispatcher.begin_cycle()
+    dispatcher.send("BUY Signal on AAA/USDT", "first")
+    dispatcher.send("SELL Signal on BBB/USDT", "second")
+    dispatcher.flush()
+    dispatcher.stop()
+    server.shutdown()
+
+    assert len(server.messages) == 1
+    message = server.messages[0]
+    assert 'HawkX digest: 2 alerts' in message
+    assert 'first' in message and 'second' in message
+    assert dispatcher.sent == 1 and dispatcher.failed == 0
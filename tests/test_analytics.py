@@ -0,0 +1,39 @@
+from dashboards.analytics import PerformanceRollup, render_html, render_png
+
+
+def write(path, lines, mode='a'):
+    with open(path, mode) as f:
+        f.write(''.join(lines))
+
+
+def test_rollup_only_processes_new_complete_rows(tmp_path):
+    log = tmp_path / 'performance_log.csv'
+    write(log, ["2025-01-01T10:00:00,AAA/USDT,BUY,WIN,5\n",
+                "2025-01-01T11:00:00,BBB/USDT,SELL,LOSS,-2\n",
+                "2025-01-02T09:00:00,AAA/USDT,BUY,LOSS"], mode='w')  # last line still being written
+
+    rollup = PerformanceRollup(log)
+    assert rollup.update() == 2
+
+    write(log, [",-1\n", "2025-01-02T10:00:00,AAA/USDT,SELL,\n"])
+    # A fresh instance resumes from the saved offset
+    rollup = PerformanceRollup(log)
+    assert rollup.update() == 2
+    assert rollup.update() == 0
+
+    summary = rollup.summary()
+    assert summary == {'trades': 4, 'wins': 1, 'losses': 2, 'hit_rate': round(1 / 3, 4), 'pnl': 2.0, 'symbols': 2}
+    aaa = rollup.symbols_frame().loc['AAA/USDT']
+    assert (aaa['trades'], aaa['wins'], aaa['losses'], aaa['pnl']) == (3, 1, 1, 4.0)
+    assert rollup.state['results']['UNKNOWN'] == 1
+    assert rollup.daily_frame()['cumulative_pnl'].tolist() == [3.0, 2.0]
+
+    # Replacing the log triggers a rebuild instead of reading from a stale offset
+    write(log, ["2025-02-01T10:00:00,CCC/USDT,BUY,WIN,1\n"] * 5, mode='w')
+    assert rollup.update() == 5
+    assert rollup.summary()['symbols'] == 1
+
+    paths = render_png(rollup, tmp_path / 'reports')
+    html_path = render_html(rollup, tmp_path / 'reports', paths)
+    assert all((tmp_path / 'reports' / name).exists() for name in ['results.png', 'cumulative_pnl.png'])
+    assert 'CCC/USDT' in open(html_path).read()
@@ -0,0 +1,53 @@
+import numpy as np
+
+from backtest.engine import BacktestEngine
+from backtest.history import history_store, stored_symbols, sync_history
+
+
+def make_candles(closes, spread=1.0):
+    closes = np.asarray(closes, dtype=float)
+    ts = 1_700_000_000_000 + np.arange(len(closes)) * 300_000
+    return np.column_stack([ts, closes, closes + spread, closes - spread, closes, np.ones(len(closes))])
+
+
+def test_buy_exits_at_take_profit_and_skips_signals_while_open():
+    # Entry at 100 with a 2.0 high/low range -> TP 101, SL 99; bar 3 reaches the TP
+    candles = make_candles([100, 100, 100.2, 101, 103, 103, 103], spread=np.array([1, 1, .2, .2, 1, 1, 1]))
+    signals = np.array([0, 1, 1, 0, 0, 1, 0], dtype=np.int8)
+    engine = BacktestEngine(capital=1000, volatility_window=2)
+
+    trades = engine.run_symbol('ABC/USDT', candles, signals)
+
+    first = trades[0]
+    assert (first.side, first.entry_price, first.exit_reason) == ('BUY', 100.0, 'tp')
+    assert first.exit_price == first.tp
+    assert first.pnl > 0
+    # The second BUY fires while the first position is still open and is ignored
+    assert [t.entry_time for t in trades] == [candles[1, 0], candles[5, 0]]
+
+
+def test_sell_stop_loss_wins_when_both_levels_touched_in_one_bar():
+    candles = make_candles([100, 100, 100, 100], spread=1.0)
+    candles[2, 2], candles[2, 3] = 110, 90
+    signals = np.array([0, -1, 0, 0], dtype=np.int8)
+
+    trade = BacktestEngine(capital=1000, volatility_window=2).run_symbol('ABC/USDT', candles, signals)[0]
+
+    assert (trade.side, trade.exit_reason, trade.exit_price) == ('SELL', 'sl', trade.sl)
+    assert trade.pnl < 0
+
+
+def test_history_is_paged_into_an_uncapped_store(tmp_path):
+    history = make_candles(100 + np.sin(np.arange(7000) / 50))
+
+    class Broker:
+        def safe_fetch_ohlcv(self, symbol, timeframe, limit=100, since=None):
+            return history[history[:, 0] >= since][:limit].tolist()
+
+    store = history_store(tmp_path)
+    assert sync_history(Broker(), store, 'AAA/USDT', '5m', int(history[0, 0])) > 7000  # pages overlap by one
+    np.testing.assert_array_equal(store.load('AAA/USDT', '5m'), history)  # past the live store's 5000 bars
+
+    assert sync_history(Broker(), store, 'AAA/USDT', '5m', int(history[0, 0])) == 1  # only the last candle again
+    (tmp_path / '5m' / 'BBB-USDT.tmp.npy').touch()  # a save that was interrupted
+    assert stored_symbols(store, '5m') == ['AAA/USDT']
@@ -0,0 +1,25 @@
+from benchmarks.fake_exchange import FakeBroker
+from benchmarks.run_benchmarks import compare
+from data.fetcher import DataFetcher
+from data.storage import DataStorage
+
+
+def test_fake_broker_serves_consistent_incremental_candles(tmp_path):
+    broker = FakeBroker(n_symbols=3)
+    broker.connect()
+    symbol = broker.exchange.symbols[0]
+
+    full = broker.safe_fetch_ohlcv(symbol, '1h', limit=50)
+    tail = broker.safe_fetch_ohlcv(symbol, '1h', limit=10, since=int(full[-5][0]))
+    assert tail == full[-5:]
+    assert broker.fetch_tickers()[symbol]['last'] > 0
+
+    fetcher = DataFetcher(broker, storage=DataStorage(tmp_path))
+    df = fetcher.get_symbol_data(symbol, '1h', 50)
+    assert len(df) == 50 and df['close'].iloc[-1] == full[-1][4]
+
+
+def test_compare_flags_only_real_regressions():
+    baseline = {'scan@100': 1.0, 'signal_batch@100': 0.001}
+    results = {'scan@100': 1.6, 'signal_batch@100': 0.004, 'new@100': 5.0}
+    assert [r[0] for r in compare(results, baseline, tolerance=0.5)] == ['scan@100']
@@ -0,0 +1,88 @@
+import threading
+import time
+
+from core.broker import Broker, TickerSnapshot
+
+
+class Exchange:
+    """
+    Counts bulk and single ticker requests.
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.bulk = 0
+        self.single = []
+
+    def fetch_tickers(self):
+        self.bulk += 1
+        time.sleep(self.delay)
+        return {'AAA/USDT': {'symbol': 'AAA/USDT', 'last': float(self.bulk)}}
+
+    def fetch_ticker(self, symbol):
+        self.single.append(symbol)
+        return {'symbol': symbol, 'last': -1.0}
+
+
+class StubBroker(Broker):
+    def connect(self):
+        pass
+
+    def get_balance(self, asset):
+        return 0.0
+
+    def place_order(self, symbol, side, amount, price=None, type='market'):
+        pass
+
+
+def age(snapshot, seconds):
+    snapshot.updated_at = time.monotonic() - seconds
+
+
+def test_snapshot_expires_after_its_ttl():
+    snapshot = TickerSnapshot(ttl=60)
+    assert not snapshot.is_fresh() and snapshot.get('AAA/USDT') is None  # never filled
+
+    snapshot.update({'AAA/USDT': {'last': 1.0}})
+    assert snapshot.is_fresh() and snapshot.get('AAA/USDT') == {'last': 1.0}
+    age(snapshot, 61)
+    assert not snapshot.is_fresh() and snapshot.get('AAA/USDT') is None
+    assert snapshot.is_fresh(max_age=120)
+
+
+def test_fetch_tickers_reuses_the_snapshot_within_max_age():
+    exchange = Exchange()
+    broker = StubBroker(exchange, ticker_ttl=60)
+    assert broker.fetch_tickers()['AAA/USDT']['last'] == 1.0
+    assert broker.fetch_tickers()['AAA/USDT']['last'] == 1.0 and exchange.bulk == 1
+
+    age(broker.ticker_snapshot, 30)
+    assert broker.fetch_tickers()['AAA/USDT']['last'] == 1.0  # within the TTL
+    assert broker.fetch_tickers(max_age=10)['AAA/USDT']['last'] == 2.0  # a tighter bound refreshes it
+    age(broker.ticker_snapshot, 90)
+    assert broker.fetch_tickers(max_age=300)['AAA/USDT']['last'] == 2.0  # a looser one serves it past the TTL
+    assert exchange.bulk == 2
+
+
+def test_concurrent_refreshes_share_one_bulk_request():
+    exchange = Exchange(delay=0.05)
+    broker = StubBroker(exchange)
+    threads = [threading.Thread(target=broker.fetch_tickers) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert exchange.bulk == 1
+
+
+def test_fetch_ticker_falls_back_to_a_single_request():
+    exchange = Exchange()
+    broker = StubBroker(exchange, ticker_ttl=60)
+    assert broker.fetch_ticker('AAA/USDT')['last'] == -1.0  # no snapshot yet
+
+    broker.fetch_tickers()
+    assert broker.fetch_ticker('AAA/USDT')['last'] == 1.0
+    assert broker.fetch_ticker('BBB/USDT')['last'] == -1.0  # not in the snapshot
+    age(broker.ticker_snapshot, 61)
+    assert broker.fetch_ticker('AAA/USDT')['last'] == -1.0  # snapshot expired
+    assert exchange.single == ['AAA/USDT', 'BBB/USDT', 'AAA/USDT'] and exchange.bulk == 1
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.signal_engine import SignalEngine
+from data.candle_buffer import CandleBuffer
+from data.fetcher import DataFetcher
+
+
+def candles(n=300, seed=2):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return np.column_stack([np.arange(n) * 300_000.0, close, close * 1.01, close * 0.99, close, rng.random(n)])
+
+
+def test_ring_buffer_keeps_the_latest_candles_as_contiguous_views():
+    rows = candles(50)
+    buffer = CandleBuffer(7)
+    for row in rows[:20]:
+        assert buffer.append(row)
+    assert buffer.extend(rows[15:33]) == 13  # overlapping rows are not appended twice
+    np.testing.assert_array_equal(buffer.columns().T, rows[26:33])
+
+    assert not buffer.append(rows[10])  # older than the buffer
+    forming = rows[32].copy()
+    forming[4] = 1.0
+    assert not buffer.append(forming)  # same timestamp: the last candle is updated
+    assert buffer[-1][4] == 1.0 and buffer.last_timestamp == rows[32, 0]
+
+    close = buffer.close
+    assert close.flags['C_CONTIGUOUS'] and np.shares_memory(close, buffer.columns())
+    assert [row[0] for row in buffer] == list(rows[26:33, 0])
+
+
+def test_frame_adapter_matches_fetched_frames():
+    rows = candles()
+    buffer = CandleBuffer(100, rows)
+    pd.testing.assert_frame_equal(buffer.to_frame(), DataFetcher._to_frame(rows[-100:]))
+    pd.testing.assert_frame_equal(buffer.to_frame(tail=10), DataFetcher._to_frame(rows[-10:]))
+
+
+def test_signals_from_buffers_match_signals_from_frames():
+    rows = candles()
+    buffer = CandleBuffer(120)
+    by_buffer, by_frame = SignalEngine(), SignalEngine()
+    for end in (150, 151, 200, 300):
+        buffer.extend(rows[:end])
+        frame = DataFetcher._to_frame(rows[end - 120:end])
+        expected = by_frame.generate_incremental('ABC/USDT', '5m', frame).to_dict()
+        assert by_buffer.generate_incremental('ABC/USDT', '5m', buffer).to_dict() == pytest.approx(expected)
+
+    expected = SignalEngine().generate(frame).to_dict()
+    assert SignalEngine().generate(buffer).to_dict() == pytest.approx(expected)
@@ -0,0 +1,88 @@
+import time
+
+import numpy as np
+
+from data.candle_store import CandleStore
+from data.fetcher import DataFetcher
+from data.storage import DataStorage
+
+STEP = 5 * 60 * 1000
+
+
+def candles(end_ts, n, seed=4):
+    ts = end_ts - STEP * np.arange(n)[::-1]
+    close = 100 + np.random.default_rng(seed).normal(0, 1, n).cumsum()
+    return np.column_stack([ts, close, close + 1, close - 1, close, np.full(n, 1e3)])
+
+
+class ScriptedBroker:
+    """
+    Serves OHLCV from a fixed history, like the exchange would, and records every request.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.requests = []
+
+    def safe_fetch_ohlcv(self, symbol, timeframe, limit=100, since=None):
+        self.requests.append((limit, since))
+        rows = self.rows if since is None else self.rows[self.rows[:, 0] >= since]
+        rows = rows[:limit] if since is not None else rows[-limit:]
+        return rows.tolist()
+
+
+def test_merge_appends_in_place_and_compacts_once_past_the_slack(tmp_path):
+    store = CandleStore(tmp_path, max_bars=10, compact_slack=5)
+    rows = candles(100 * STEP, 20)
+    store.save('AAA/USDT', '5m', rows[:8])
+    path = tmp_path / '5m' / 'AAA-USDT.npy'
+    inode = path.stat().st_ino
+
+    rows[7, 4] += 0.5  # the last stored candle was still forming: it closed elsewhere
+    merged = store.merge('AAA/USDT', '5m', rows[7:10])
+    np.testing.assert_array_equal(merged, rows[:10])
+    np.testing.assert_array_equal(np.load(path), merged)
+    assert path.stat().st_ino == inode and store.last_timestamp('AAA/USDT', '5m') == rows[9, 0]
+
+    store.merge('AAA/USDT', '5m', rows[10:15])  # 15 rows on disk: still in place, 10 served
+    assert path.stat().st_ino == inode and len(np.load(path)) == 15
+    np.testing.assert_array_equal(store.load('AAA/USDT', '5m'), rows[5:15])
+
+    merged = store.merge('AAA/USDT', '5m', rows[15:16])  # past max_bars + slack: rewritten
+    assert path.stat().st_ino != inode
+    np.testing.assert_array_equal(np.load(path), rows[6:16])
+    np.testing.assert_array_equal(merged, rows[6:16])
+
+    merged = store.merge('AAA/USDT', '5m', rows[12:14])  # history replaced further back
+    np.testing.assert_array_equal(merged, rows[6:14])
+
+
+def test_sync_fetches_only_candles_since_the_last_stored_one(tmp_path):
+    now = int(time.time() * 1000) // STEP * STEP
+    history = candles(now, 300)
+    storage = DataStorage(tmp_path)
+    storage.candles.save('AAA/USDT', '5m', history[:-3])
+
+    final = history.copy()
+    final[-4, 4] += 1.0  # the stored tail candle closed at a different price
+    broker = ScriptedBroker(final)
+    rows = DataFetcher(broker, storage=storage)._sync_candles('AAA/USDT', '5m', 100)
+
+    (limit, since), = broker.requests
+    assert since == history[-4, 0] and limit >= 4
+    np.testing.assert_array_equal(rows, final)
+    np.testing.assert_array_equal(storage.load_ohlcv('AAA/USDT', '5m'), final)
+
+
+def test_sync_starts_over_when_the_gap_cannot_be_closed(tmp_path):
+    now = int(time.time() * 1000) // STEP * STEP
+    storage = DataStorage(tmp_path)
+    storage.candles.save('AAA/USDT', '5m', candles(now - 1000 * STEP, 50))
+
+    recent = candles(now, 150, seed=5)
+    broker = ScriptedBroker(recent)
+    rows = DataFetcher(broker, storage=storage, fetch_limit=100)._sync_candles('AAA/USDT', '5m', 100)
+
+    assert broker.requests == [(100, None)]  # too far behind for a `since` request
+    np.testing.assert_array_equal(rows, recent[-100:])
+    np.testing.assert_array_equal(storage.load_ohlcv('AAA/USDT', '5m'), recent[-100:])
@@ -0,0 +1,68 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+from config.loader import load_config
+from config.settings import CONFIG_PATH, SETTINGS, load_settings
+from core.signal_engine import SignalResult
+from data.candle_store import CandleStore
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_dry_run_scans_the_candle_store_without_network_modules(tmp_path):
+    store = CandleStore(tmp_path / 'data' / 'storage' / 'candles')
+    step = 5 * 60 * 1000
+    ts = int(time.time() * 1000) // step * step - step * np.arange(2000)[::-1]
+    close = 10 * np.exp(np.cumsum(np.random.default_rng(1).normal(0, 0.01, len(ts))))
+    store.save('AAA/USDT', '5m', np.column_stack([ts, close, close * 1.01, close * 0.99, close, np.full(len(ts), 1e4)]))
+    npy = tmp_path / 'data' / 'storage' / 'candles' / '5m' / 'AAA-USDT.npy'
+    before = (npy.read_bytes(), npy.stat().st_mtime_ns)
+
+    code = ("import sys, main; main.cli(['--dry-run', '--once', '--final-signal', 'BUY']); "
+            "print(sorted(m for m in ('ccxt', 'smtplib', 'aiohttp') if m in sys.modules))")
+    out = subprocess.run([sys.executable, '-c', code], cwd=tmp_path, capture_output=True, text=True, timeout=60,
+                         env={**os.environ, 'PYTHONPATH': REPO})
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip().endswith('[]')
+    assert '[DRY RUN] Alert: 🚨 BUY Signal on AAA/USDT' in out.stderr
+    # Read-only: no state, trade log or database, and the candle store is left untouched
+    assert sorted(p.name for p in (tmp_path / 'data' / 'storage').iterdir()) == ['candles']
+    assert (npy.read_bytes(), npy.stat().st_mtime_ns) == before
+
+
+def test_settings_are_parsed_once_and_loader_has_no_side_effects(tmp_path):
+    assert load_settings() is load_settings(CONFIG_PATH)
+    assert load_config()['trading']['timeframes']
+    with pytest.raises(FileNotFoundError):
+        load_config(str(tmp_path / 'missing.yaml'))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_startup_timing_is_reported_on_the_first_final_signal(monkeypatch):
+    class Storage:
+        sqlite = None
+
+    timeframes = SETTINGS['trading']['timeframes']
+    df = pd.DataFrame({'high': [1.1] * 10, 'low': [0.9] * 10},
+                      index=pd.date_range('2024-01-01', periods=10, freq='5min'))
+    monkeypatch.setattr(main, '_first_signal_reported', False)
+
+    def act(*signals):
+        results = {tf: SignalResult(signal, 25.0, 0.01, 0.002, 1.0, 1.0) for tf, signal in zip(timeframes, signals)}
+        pending = []
+        asyncio.run(main.act_on_results('AAA/USDT', {'last': 1.0}, {timeframes[0]: df}, results, 1000,
+                                        scanner=object(), storage=Storage(), pending=pending))
+        return len(pending)
+
+    assert act(None, None) == 0 and act('BUY', 'SELL') == 0
+    assert not main._first_signal_reported  # scanned, but nothing signalled yet
+    assert act('BUY', 'BUY') == 1
+    assert main._first_signal_reported
@@ -0,0 +1,113 @@
+import asyncio
+import json
+
+import pandas as pd
+
+from core.evaluation_scheduler import EvaluationScheduler
+from core.signal_engine import SignalResult
+
+HOUR = 3600 * 1000
+
+
+def frame(last_open_ms, timeframe_ms, n=5):
+    index = pd.to_datetime([last_open_ms - i * timeframe_ms for i in reversed(range(n))], unit='ms')
+    return pd.DataFrame({'close': range(n)}, index=index)
+
+
+def result(signal='BUY'):
+    return SignalResult(signal, 25.0, 0.01, 0.002, 1.1, 1.2)
+
+
+def test_timeframe_is_due_only_after_a_new_candle_closes():
+    scheduler = EvaluationScheduler()
+    now = 100 * HOUR + 10 * 60 * 1000  # 10 minutes into an hour
+    assert scheduler.due('ABC/USDT', ['5m', '1h'], now) == ['5m', '1h']
+
+    # Last rows are the forming candles: 5m opened at now - 0, 1h at 100:00
+    scheduler.record('ABC/USDT', '5m', frame(now, 5 * 60 * 1000), result())
+    scheduler.record('ABC/USDT', '1h', frame(100 * HOUR, HOUR), result('SELL'))
+
+    assert scheduler.due('ABC/USDT', ['5m', '1h'], now + 60 * 1000) == []
+    assert scheduler.due('ABC/USDT', ['5m', '1h'], now + 5 * 60 * 1000) == ['5m']
+    assert scheduler.due('ABC/USDT', ['5m', '1h'], 101 * HOUR) == ['5m', '1h']
+    assert scheduler.cached('ABC/USDT', ['5m', '1h'])['1h'].signal == 'SELL'
+
+
+def test_daily_close_follows_the_offset():
+    utc, hk = EvaluationScheduler(), EvaluationScheduler(long_offset_hours=8)
+    now = 24 * HOUR * 10 + 9 * HOUR  # 09:00 UTC
+    assert utc.last_closed('1d', now) == 24 * HOUR * 9
+    assert hk.last_closed('1d', now) == 24 * HOUR * 9 + 8 * HOUR  # the UTC+8 day that closed at 08:00 UTC
+
+
+def test_unchanged_signal_is_alerted_once_until_it_clears():
+    scheduler = EvaluationScheduler()
+    assert scheduler.should_alert('ABC/USDT', 'BUY')
+    assert not scheduler.should_alert('ABC/USDT', 'BUY')
+    assert scheduler.should_alert('ABC/USDT', 'SELL')
+    scheduler.clear_signal('ABC/USDT')
+    assert scheduler.should_alert('ABC/USDT', 'SELL')
+
+
+def test_state_round_trips_through_json():
+    scheduler = EvaluationScheduler()
+    scheduler.record('ABC/USDT', '1h', frame(100 * HOUR, HOUR), result())
+    scheduler.should_alert('ABC/USDT', 'BUY')
+
+    restored = EvaluationScheduler.from_dict(json.loads(json.dumps(scheduler.to_dict())))
+    assert restored.due('ABC/USDT', ['1h'], 100 * HOUR + 1) == []
+    assert restored.cached('ABC/USDT', ['1h'])['1h'].to_dict() == result().to_dict()
+    assert not restored.should_alert('ABC/USDT', 'BUY')
+
+
+def test_batched_scans_fetch_only_due_timeframes_and_reuse_cached_results(monkeypatch):
+    import numpy as np
+
+    import main
+    from core.scanner import MarketScanner
+    from core.signal_engine import SignalEngine
+    from data.fetcher import DataFetcher
+    from utils.timeframes import timeframe_to_ms
+
+    timeframes = main.SETTINGS['trading']['timeframes']
+    scheduler = EvaluationScheduler()
+    closed = {tf: 1000 * timeframe_to_ms('1d') for tf in timeframes}
+    scheduler.last_closed = lambda tf, now_ms=None: closed[tf]
+
+    class Fetcher:
+        aggregator = None
+        requests = []
+
+        def get_symbol_data(self, symbol, tf, limit):
+            self.requests.append(tf)
+            step = timeframe_to_ms(tf)
+            ts = closed[tf] + step - step * np.arange(limit)[::-1]  # last row is the forming candle
+            close = 100 + np.sin(np.arange(limit) / 5)
+            return DataFetcher._to_frame(np.column_stack([ts, close, close, close, close, np.ones(limit)]))
+
+    class Broker:
+        def fetch_ticker(self, symbol):
+            return {'last': 1.0, 'quoteVolume': 1e12}
+
+    acted = []
+
+    async def act_on_results(symbol, ticker, df_dict, results, capital, **kwargs):
+        acted.append((sorted(df_dict), sorted(results)))
+
+    monkeypatch.setattr(main, 'act_on_results', act_on_results)
+    fetcher, scanner = Fetcher(), MarketScanner(max_concurrency=2)
+
+    def scan():
+        fetcher.requests.clear()
+        acted.clear()
+        asyncio.run(main.scan_batched(['AAA/USDT'], Broker(), SignalEngine(), 1000, scanner=scanner,
+                                      fetcher=fetcher, scheduler=scheduler))
+        return sorted(fetcher.requests), acted[:]
+
+    try:
+        assert scan() == (sorted(timeframes), [(sorted(timeframes), sorted(timeframes))])
+        assert scan() == ([], [])  # nothing closed since: no fetch, no evaluation
+        closed['5m'] += timeframe_to_ms('5m')
+        assert scan() == (['5m'], [(['5m'], sorted(timeframes))])  # the rest come from the cache
+    finally:
+        scanner.shutdown()
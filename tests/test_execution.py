@@ -0,0 +1,199 @@
+import asyncio
+
+from core.execution import ExecutionPipeline, OrderRequest, client_order_id
+from core.order_manager import OrderManager
+
+
+class MockExchange:
+    """Async ccxt.pro-like exchange: records batch requests and streams order updates from a queue."""
+
+    has = {'createOrders': True, 'watchOrders': True}
+
+    def __init__(self, duplicates=()):
+        self.batches = []
+        self.duplicates = set(duplicates)
+        self.updates = asyncio.Queue()
+        self.closed = False
+
+    async def create_orders(self, orders):
+        self.batches.append(orders)
+        results = []
+        for i, o in enumerate(orders):
+            cid = o['params']['clientOrderId']
+            code = '51016' if cid in self.duplicates else '0'
+            results.append({'id': f"{len(self.batches)}-{i}", 'clientOrderId': cid, 'status': None,
+                            'info': {'sCode': code, 'clOrdId': cid}})
+        return results
+
+    async def watch_orders(self):
+        return [await self.updates.get()]
+
+    async def close(self):
+        self.closed = True
+
+
+def request(i, **kwargs):
+    return OrderRequest(f"SYM{i}/USDT", 'buy', 1.0, client_id=client_order_id(f"SYM{i}/USDT", 'buy', i), **kwargs)
+
+
+def test_burst_is_sent_in_batches_and_duplicates_are_not_resent():
+    async def run():
+        exchange = MockExchange()
+        pipeline = await ExecutionPipeline(exchange, batch_window=0.05).start()
+        tracked = [pipeline.submit(request(i)) for i in range(25)]
+        assert pipeline.submit(request(3)) is tracked[3]
+        await pipeline.flush()
+        assert [len(b) for b in exchange.batches] == [20, 5]
+        assert all(t.status == 'open' and t.id for t in tracked)
+
+        pipeline.submit(request(3))
+        await pipeline.close()
+        return exchange
+
+    exchange = asyncio.run(run())
+    assert sum(len(b) for b in exchange.batches) == 25
+    assert exchange.closed
+
+
+def test_brackets_are_attached_and_fills_arrive_from_the_orders_channel():
+    async def run():
+        exchange = MockExchange()
+        pipeline = await ExecutionPipeline(exchange, batch_window=0).start()
+        tracked = pipeline.submit(request(1, take_profit=110.0, stop_loss=95.0))
+        await pipeline.flush()
+        sent = exchange.batches[0][0]['params']
+        assert sent['takeProfit'] == {'triggerPrice': 110.0, 'type': 'market'}
+        assert sent['stopLoss'] == {'triggerPrice': 95.0, 'type': 'market'}
+
+        exchange.updates.put_nowait({'clientOrderId': tracked.client_id, 'status': 'closed',
+                                     'filled': 1.0, 'average': 100.5})
+        done = await pipeline.wait(tracked.client_id, timeout=1)
+        await pipeline.close()
+        return done
+
+    done = asyncio.run(run())
+    assert (done.status, done.filled, done.average) == ('closed', 1.0, 100.5)
+
+
+def test_duplicate_client_id_from_exchange_is_not_a_rejection():
+    async def run():
+        order = request(7)
+        exchange = MockExchange(duplicates={order.client_id})
+        pipeline = await ExecutionPipeline(exchange, batch_window=0).start(watch=False)
+        tracked = pipeline.submit(order)
+        await pipeline.close()
+        return tracked
+
+    tracked = asyncio.run(run())
+    assert tracked.status == 'open' and tracked.error is None
+
+
+def test_order_manager_submits_signal_with_deterministic_id():
+    async def run():
+        exchange = MockExchange()
+        pipeline = await ExecutionPipeline(exchange, batch_window=0).start(watch=False)
+        manager = OrderManager(broker=None, capital=1000, pipeline=pipeline)
+        meta = {'entry_price': 100.0, 'tp': 104.0, 'sl': 98.0, 'timestamp': '2025-01-01T00:00:00'}
+        first = manager.submit_signal('ABC/USDT', '1h', 'BUY', meta)
+        again = manager.submit_signal('ABC/USDT', '1h', 'BUY', meta)
+        await pipeline.close()
+        return exchange, first, again
+
+    exchange, first, again = asyncio.run(run())
+    assert first is again
+    assert len(exchange.batches) == 1 and exchange.batches[0][0]['side'] == 'buy'
+
+
+def test_stream_mode_submits_to_a_live_pipeline(tmp_path):
+    import main
+    from core.scanner import MarketScanner
+    from data.candle_buffer import CandleBuffer
+    from data.storage import DataStorage
+
+    class LiveBroker:
+        """No on_candle: exits rest on the exchange, unlike PaperBroker."""
+
+        def fetch_ticker(self, symbol):
+            return {'symbol': symbol, 'last': 100.0, 'quoteVolume': 1e6}
+
+        def stream(self, symbols, timeframes, on_candle_close, **kwargs):
+            return ReplayStream(symbols, timeframes, on_candle_close)
+
+    class ReplayStream:
+        def __init__(self, symbols, timeframes, on_candle_close):
+            self.buffers = {(s, tf): CandleBuffer(100) for s in symbols for tf in timeframes}
+            self.symbols, self.on_candle_close = symbols, on_candle_close
+
+        async def run(self):
+            for symbol in self.symbols:
+                buffer = self.buffers[(symbol, '5m')]
+                buffer.extend([[i * 300_000, 100, 101, 99, 100, 10] for i in range(60)])
+                await self.on_candle_close(symbol, '5m', buffer)
+
+    class Alerts:
+        def __init__(self):
+            self.sent = []
+
+        def send(self, subject, body, attachment_path=None):
+            self.sent.append(subject)
+
+    async def run():
+        exchange = MockExchange()
+        pipeline = await ExecutionPipeline(exchange, batch_window=0.01).start()
+        broker, scanner, alerts = LiveBroker(), MarketScanner(max_concurrency=2), Alerts()
+        try:
+            await main.run_stream(['AAA/USDT'], broker, main.SignalEngine(), 1000, final_signal='BUY',
+                                  scanner=scanner, alerts=alerts, storage=DataStorage(base_dir=tmp_path),
+                                  order_manager=OrderManager(broker, 1000, pipeline=pipeline))
+            await pipeline.flush()
+        finally:
+            await pipeline.close()
+            scanner.shutdown()
+        return exchange, alerts
+
+    exchange, alerts = asyncio.run(run())
+    assert [o['symbol'] for batch in exchange.batches for o in batch] == ['AAA/USDT']
+    assert alerts.sent == ["🚨 BUY Signal on AAA/USDT"]
+
+
+def test_session_pipeline_outlives_cycles_and_tracks_fills_between_them(tmp_path):
+    import main
+    from data.storage import DataStorage
+
+    class Broker:
+        def __init__(self):
+            self.exchanges = []
+
+        def async_exchange(self):
+            self.exchanges.append(MockExchange())
+            return self.exchanges[-1]
+
+        def fetch_ticker(self, symbol):
+            return {'last': 100.0}
+
+    # Only the pieces start_execution needs; a full session connects to OKX
+    session = main.ScanSession.__new__(main.ScanSession)
+    session.broker, session.alerts, session.evaluator, session.pipeline = Broker(), None, None, None
+    session.storage = DataStorage(base_dir=tmp_path)
+    session._runner = asyncio.Runner()
+    metadata = {'entry_price': 100.0, 'macd_diff': 0.5, 'timestamp': 1}
+
+    async def cycle():
+        order_manager = await session.start_execution(1000)
+        tracked = order_manager.submit_signal('AAA/USDT', '5m', 'BUY', metadata)
+        await session.pipeline.flush()
+        return order_manager, tracked
+
+    first_manager, first = session.run(cycle())
+    exchange = session.broker.exchanges[0]
+    exchange.updates.put_nowait({'clientOrderId': first.client_id, 'status': 'closed', 'filled': 1.0,
+                                 'average': 100.0})
+    session.sleep(0.05)  # the fill arrives while idle between cycles
+    assert first.status == 'closed'
+
+    second_manager, again = session.run(cycle())  # the same signal in the next cycle is not re-sent
+    assert second_manager is first_manager and again is first
+    assert len(session.broker.exchanges) == 1 and len(exchange.batches) == 1
+
+    session.close()
+    assert exchange.closed and session.pipeline is None
@@ -0,0 +1,61 @@
+import asyncio
+import json
+import logging
+
+from core.scanner import MarketScanner
+from utils.logger import (AuditJournal, JsonFormatter, RateLimitFilter, audit, begin_cycle, current_cycle,
+                          setup_logger)
+
+
+def record(msg, *args, level=logging.INFO, created=0.0):
+    rec = logging.LogRecord('hawkx.test', level, __file__, 1, msg, args, None)
+    rec.created = created
+    return rec
+
+
+def test_setup_logger_is_idempotent():
+    root = logging.getLogger()
+    before = list(root.handlers)
+    for _ in range(3):
+        logger = setup_logger('hawkx.test')
+    assert root.handlers == before and logger.handlers == []
+
+
+def test_rate_limit_groups_by_template_and_reports_what_it_dropped():
+    limiter = RateLimitFilter(messages=2, interval=60, sample_every=3)
+    records = [record("Analyzing %s", f"S{i}/USDT", created=1.0) for i in range(9)]
+    assert [limiter.filter(r) for r in records] == [True, True, False, False, True, False, False, True, False]
+    assert records[4].suppressed == 2  # sampled, and carries the count dropped before it
+    assert limiter.filter(record("Other %s", 'x', created=1.0))
+    assert limiter.filter(record("Analyzing %s", 'x', level=logging.WARNING, created=1.0))
+
+    later = record("Analyzing %s", 'S0/USDT', created=70.0)  # new window
+    assert limiter.filter(later) and later.suppressed == 1
+
+
+def test_cycle_id_reaches_worker_threads_and_json_events(tmp_path):
+    async def cycle():
+        journal = begin_cycle(str(tmp_path))
+        scanner = MarketScanner(max_concurrency=2)
+        try:
+            seen = await scanner.run_blocking(lambda: current_cycle().cycle_id)
+            await scanner.run_blocking(audit, 'evaluate', symbol='ABC/USDT', final='BUY')
+        finally:
+            scanner.shutdown()
+        return journal, seen
+
+    journal, seen = asyncio.run(cycle())
+    assert seen == journal.cycle_id and current_cycle() is None
+
+    rec = record("[%s] => %s", 'ABC/USDT', 'BUY')
+    rec.cycle_id = journal.cycle_id
+    rec.symbol = 'ABC/USDT'
+    event = json.loads(JsonFormatter().format(rec))
+    assert event['cycle'] == journal.cycle_id and event['msg'] == "[ABC/USDT] => BUY"
+    assert event['symbol'] == 'ABC/USDT'
+
+    path = journal.write()
+    entries = [json.loads(line) for line in open(path)]
+    assert [(e['event'], e['symbol'], e['final']) for e in entries] == [('evaluate', 'ABC/USDT', 'BUY')]
+    assert journal.write() is None  # nothing new since the last write
+    assert AuditJournal('c1').write() is None  # no directory: journaling disabled
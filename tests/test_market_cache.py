@@ -0,0 +1,84 @@
+import json
+import time
+
+from core.market_cache import MarketCache
+from core.okx_interface import OKXInterface
+
+CREDENTIALS = {'api_key': 'key', 'api_secret': 'secret', 'api_passphrase': 'pass'}
+
+
+def market(symbol, min_amount=1.0):
+    base, quote = symbol.split('/')
+    return {'id': f'{base}-{quote}', 'symbol': symbol, 'base': base, 'quote': quote, 'type': 'spot',
+            'spot': True, 'active': True, 'precision': {'amount': 0.01, 'price': 0.0001},
+            'limits': {'amount': {'min': min_amount}}}
+
+
+def okx_with_exchange_markets(markets):
+    """
+    An OKXInterface whose load_markets serves `markets` instead of calling the exchange.
+    """
+    okx = OKXInterface(CREDENTIALS)
+    okx.loads = 0
+
+    def load_markets(reload=False):
+        okx.loads += 1
+        okx.exchange.set_markets(markets)
+        return okx.exchange.markets
+
+    okx.exchange.load_markets = load_markets
+    return okx
+
+
+def test_entries_go_stale_after_the_ttl(tmp_path):
+    cache = MarketCache(tmp_path / 'markets.json', ttl=60)
+    cache.save({'AAA/USDT': market('AAA/USDT')})
+    entry = cache.load()
+    assert entry['markets']['AAA/USDT']['base'] == 'AAA' and not cache.is_stale(entry)
+
+    entry['fetched_at'] = time.time() - 61
+    assert cache.is_stale(entry)
+    assert cache.is_stale({})  # no timestamp at all: always refreshed
+
+
+def test_save_reports_whether_the_fingerprint_changed(tmp_path):
+    cache = MarketCache(tmp_path / 'markets.json')
+    markets = {'AAA/USDT': market('AAA/USDT')}
+    assert cache.save(markets)  # nothing cached yet
+    assert not cache.save(json.loads(json.dumps(markets)))  # same contents, new objects
+
+    changed = {'AAA/USDT': market('AAA/USDT', min_amount=5.0)}
+    assert cache.fingerprint(changed) != cache.fingerprint(markets)
+    assert cache.save(changed)
+    assert cache.load()['fingerprint'] == cache.fingerprint(changed)
+
+
+def test_corrupt_cache_is_ignored_and_refreshed_from_the_exchange(tmp_path):
+    path = tmp_path / 'markets.json'
+    path.write_text('{"markets": {"AAA/USDT"')  # cut off mid-write
+    cache = MarketCache(path)
+    assert cache.load() is None
+
+    okx = okx_with_exchange_markets({'AAA/USDT': market('AAA/USDT')})
+    okx.connect(cache)
+    assert okx.loads == 1 and 'AAA/USDT' in okx.exchange.markets
+    assert cache.load()['fingerprint'] == cache.fingerprint(okx.exchange.markets)
+
+
+def test_connect_serves_cached_markets_and_refreshes_only_stale_ones(tmp_path):
+    cache = MarketCache(tmp_path / 'markets.json', ttl=60)
+    cache.save({'AAA/USDT': market('AAA/USDT')})
+
+    okx = okx_with_exchange_markets({'BBB/USDT': market('BBB/USDT')})
+    okx.connect(cache)
+    assert okx.loads == 0 and list(okx.exchange.markets) == ['AAA/USDT']
+
+    entry = cache.load()
+    entry['fetched_at'] -= 61
+    cache.path.write_text(json.dumps(entry))
+    okx = okx_with_exchange_markets({'BBB/USDT': market('BBB/USDT')})
+    okx.connect(cache)
+    deadline = time.time() + 5
+    while 'BBB/USDT' not in cache.load()['markets'] and time.time() < deadline:
+        time.sleep(0.01)  # refreshed on a background thread
+    assert okx.loads == 1 and list(cache.load()['markets']) == ['BBB/USDT']
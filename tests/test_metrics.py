@@ -0,0 +1,45 @@
+import urllib.request
+
+import pytest
+
+from utils import metrics
+
+
+@pytest.fixture
+def enabled_metrics():
+    metrics.enable()
+    yield metrics
+    metrics.disable()
+
+
+def test_disabled_metrics_are_noops():
+    assert not metrics.is_enabled()
+    assert metrics.timed('noop.stage') is metrics.timed('other.stage')
+    fn = lambda: 1
+    assert metrics.instrument_api('ticker', fn) is fn
+    metrics.counter('hawkx_test_noop_total', "test").inc()
+    assert metrics.counter('hawkx_test_noop_total', "test").get() == 0
+
+
+def test_stage_timings_and_errors_are_scraped(enabled_metrics):
+    with metrics.timed('test.ok'):
+        pass
+    with pytest.raises(ValueError):
+        with metrics.timed('test.fail'):
+            raise ValueError("boom")
+    call = metrics.instrument_api('test_endpoint', lambda x: x * 2)
+    assert call(21) == 42
+
+    assert metrics.STAGE_SECONDS.count(stage='test.ok') == 1
+    assert metrics.STAGE_ERRORS.get(stage='test.fail') == 1
+
+    server = metrics.start_server(port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        text = urllib.request.urlopen(url, timeout=5).read().decode()
+    finally:
+        server.shutdown()
+    assert '# TYPE hawkx_stage_duration_seconds histogram' in text
+    assert 'hawkx_stage_duration_seconds_bucket{stage="test.ok",le="+Inf"} 1' in text
+    assert 'hawkx_stage_errors_total{stage="test.fail"} 1.0' in text
+    assert 'hawkx_api_request_duration_seconds_count{endpoint="test_endpoint"} 1' in text
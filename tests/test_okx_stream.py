@@ -0,0 +1,118 @@
+import asyncio
+import json
+from pathlib import Path
+
+from aiohttp import web
+
+from core.okx_stream import OKXStream
+
+RECORDING = Path(__file__).parent / 'data' / 'okx_ws_candles.jsonl'
+BASE_TS = 1_700_000_000_000
+TF_MS = 300_000
+
+
+def load_recording():
+    connections = {}
+    for line in RECORDING.read_text().splitlines():
+        record = json.loads(line)
+        connections.setdefault(record['connection'], []).append(record['message'])
+    return [connections[i] for i in sorted(connections)]
+
+
+async def start_replay_server(recording, subscriptions):
+    """
+    Local stand-in for the OKX WebSocket: replays one recorded session per
+    connection, then drops the connection (or holds the last one open).
+    """
+    sessions = iter(recording)
+
+    async def handler(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        subscriptions.append(json.loads((await ws.receive()).data))
+        messages = next(sessions, None)
+        for message in messages or []:
+            await ws.send_str(json.dumps(message))
+        if messages is None:
+            async for _ in ws:
+                pass
+        await ws.close()
+        return ws
+
+    app = web.Application()
+    app.router.add_get('/ws', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"ws://127.0.0.1:{port}/ws"
+
+
+def rest_candles(start, end):
+    return [[BASE_TS + i * TF_MS, 100, 101, 99, 100 + i / 10, 12.5] for i in range(start, end)]
+
+
+def test_stream_emits_on_close_and_backfills_after_reconnect():
+    closed = []
+    backfills = []
+    subscriptions = []
+
+    def backfill(symbol, timeframe, since):
+        backfills.append(since)
+        if since is None:
+            return rest_candles(0, 4)   # candle 3 still forming
+        return rest_candles(3, 6)       # the gap while disconnected: 3 and 4 closed, 5 forming
+
+    async def scenario():
+        runner, url = await start_replay_server(load_recording(), subscriptions)
+        stream = None
+
+        def on_close(symbol, timeframe, candles):
+            closed.append((symbol, timeframe, candles[-1][0], candles[-1][4]))
+            if len(closed) == 3:
+                stream.stop()
+
+        stream = OKXStream(['BTC/USDT'], ['5m'], on_close, backfill=backfill, candle_url=url,
+                           ticker_url=None, reconnect_delay=0.01)
+        try:
+            await asyncio.wait_for(stream.run(), timeout=10)
+        finally:
+            await runner.cleanup()
+        return stream
+
+    stream = asyncio.run(scenario())
+
+    assert subscriptions[0] == {'op': 'subscribe', 'args': [{'channel': 'candle5m', 'instId': 'BTC-USDT'}]}
+    assert backfills == [None, BASE_TS + 3 * TF_MS]
+    assert closed == [
+        ('BTC/USDT', '5m', BASE_TS + 3 * TF_MS, 100.7),   # confirmed over the first connection
+        ('BTC/USDT', '5m', BASE_TS + 4 * TF_MS, 100.4),   # recovered by REST backfill after reconnect
+        ('BTC/USDT', '5m', BASE_TS + 5 * TF_MS, 101.4),   # confirmed over the second connection
+    ]
+    assert stream.connections == 2
+    assert [row[0] for row in stream.buffers[('BTC/USDT', '5m')]] == [BASE_TS + i * TF_MS for i in range(6)]
+
+
+def test_a_failing_callback_does_not_stop_other_symbols():
+    closed = []
+
+    async def on_close(symbol, timeframe, candles):
+        if symbol == 'BAD/USDT':
+            raise ValueError("boom")
+        closed.append((symbol, candles[-1][0]))
+
+    def message(inst_id, i):
+        return {'arg': {'channel': 'candle5m', 'instId': inst_id},
+                'data': [[str(BASE_TS + i * TF_MS), '1', '1', '1', '1', '1', '1', '1', '1']]}
+
+    async def scenario():
+        stream = OKXStream(['BAD/USDT', 'BTC/USDT'], ['5m'], on_close, ticker_url=None)
+        for i in range(2):
+            await stream.handle_message(message('BAD-USDT', i))
+            await stream.handle_message(message('BTC-USDT', i))
+        return stream
+
+    stream = asyncio.run(scenario())
+    assert closed == [('BTC/USDT', BASE_TS), ('BTC/USDT', BASE_TS + TF_MS)]
+    assert len(stream.buffers[('BAD/USDT', '5m')]) == 2  # candles are still recorded for the failing symbol
@@ -0,0 +1,76 @@
+import json
+
+import numpy as np
+
+from backtest.history import history_store
+from backtest.optimizer import ParameterOptimizer, grid_params, random_params, walk_forward_windows
+
+SPACE = {'rsi_low': [25, 30], 'rsi_high': [70, 75], 'tp_sl_multiplier': [1.0]}
+
+
+def seed_candles(base_dir, n=600):
+    rng = np.random.default_rng(5)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    rows = np.column_stack([np.arange(n) * 300_000.0, close, close * 1.01, close * 0.99, close, np.full(n, 1e4)])
+    history_store(base_dir).save('AAA/USDT', '5m', rows)
+
+
+def test_grid_and_random_parameter_generation():
+    grid = grid_params(SPACE)
+    assert len(grid) == 4 and {'rsi_low': 30, 'rsi_high': 75, 'tp_sl_multiplier': 1.0} in grid
+
+    space = {'rsi_low': [20, 25, 30, 35], 'tp_sl_multiplier': {'min': 0.5, 'max': 2.0}}
+    drawn = random_params(space, 10, seed=3)
+    assert drawn == random_params(space, 10, seed=3)
+    assert len({json.dumps(p, sort_keys=True) for p in drawn}) == 10
+    assert all(p['rsi_low'] in space['rsi_low'] and 0.5 <= p['tp_sl_multiplier'] <= 2.0 for p in drawn)
+    assert len(random_params(SPACE, 10)) == 4  # no more distinct combinations exist
+
+
+def test_walk_forward_windows_roll_train_and_test_slices():
+    windows = walk_forward_windows(0, 400, 3)
+    assert windows == [((0, 100), (100, 200)), ((100, 200), (200, 300)), ((200, 300), (300, 400))]
+
+
+def test_sweeps_resume_from_the_cache_only_for_identical_inputs(tmp_path):
+    seed_candles(tmp_path)
+    cache = tmp_path / 'cache.jsonl'
+    params = grid_params(SPACE)
+
+    with ParameterOptimizer(str(tmp_path), ['AAA/USDT'], '5m', 1000.0, workers=1, cache_path=cache) as optimizer:
+        first = optimizer.evaluate(params[:2])
+        pool = optimizer._pool
+        folds = optimizer.walk_forward(params, 2)
+        assert optimizer._pool is pool  # one pool serves every evaluate() and fold
+    assert len(folds) == 2 and optimizer._pool is None
+    written = cache.read_text().splitlines()
+
+    with ParameterOptimizer(str(tmp_path), ['AAA/USDT'], '5m', 1000.0, workers=1, cache_path=cache) as resumed:
+        assert resumed.evaluate(params[:2]) == first
+        assert resumed._pool is None  # everything came from the cache, no workers were started
+    assert cache.read_text().splitlines() == written
+
+    with ParameterOptimizer(str(tmp_path), ['AAA/USDT'], '5m', 1000.0, fee_rate=0.001, workers=1,
+                            cache_path=cache) as with_fees:
+        charged = with_fees.evaluate(params[:2])
+    assert [r['key'] for r in charged] != [r['key'] for r in first]
+    assert len(cache.read_text().splitlines()) == len(written) + 2
+
+
+def test_results_are_recomputed_once_the_history_grows(tmp_path):
+    seed_candles(tmp_path, n=400)
+    cache = tmp_path / 'cache.jsonl'
+    params = grid_params(SPACE)[:1]
+
+    def evaluate(window=None):
+        with ParameterOptimizer(str(tmp_path), ['AAA/USDT'], '5m', 1000.0, workers=1, cache_path=cache) as optimizer:
+            return optimizer.evaluate(params, window)[0]
+
+    short, window = evaluate(), evaluate([0, 600 * 300_000])
+    assert evaluate()['key'] == short['key']  # unchanged history: served from the cache
+
+    seed_candles(tmp_path, n=600)  # backtest.history appended 200 candles
+    grown = evaluate()
+    assert grown['key'] != short['key']
+    assert evaluate([0, 600 * 300_000])['key'] != window['key']  # the window now covers more data
+    assert len(cache.read_text().splitlines()) == 4  # both evaluated again, not served from the cache
@@ -0,0 +1,109 @@
+import pytest
+
+from core.order_manager import OrderManager
+from core.paper_broker import PaperBroker
+
+
+def test_bracket_entry_exits_at_take_profit_with_fees_and_slippage():
+    broker = PaperBroker(balance=1000, fee_rate=0.001, slippage_bps=10)
+    broker.update_price('ABC/USDT', 100.0)
+    entry = broker.place_order('ABC/USDT', 'buy', 2, take_profit=105, stop_loss=95)
+
+    assert entry['status'] == 'closed' and entry['average'] == pytest.approx(100.1)
+    assert [o['type'] for o in broker.get_open_orders('ABC/USDT')] == ['stop', 'limit']
+    assert broker.get_position('ABC/USDT')['position'] == 2
+
+    broker.on_candle('ABC/USDT', [0, 101, 106, 100, 104, 1])
+    position = broker.get_position('ABC/USDT')
+    assert position['position'] == 0
+    assert position['realized_pnl'] == pytest.approx(2 * (105 - 100.1))
+    assert broker.get_open_orders() == []  # the stop loss was cancelled (OCO)
+    expected_fees = 0.001 * (2 * 100.1 + 2 * 105)
+    assert broker.cash == pytest.approx(1000 - 2 * 100.1 + 2 * 105 - expected_fees)
+
+
+def test_stop_loss_fills_first_when_candle_spans_both_exits():
+    broker = PaperBroker(balance=1000, fee_rate=0, slippage_bps=0)
+    broker.update_price('ABC/USDT', 100.0)
+    broker.place_order('ABC/USDT', 'sell', 1, take_profit=95, stop_loss=105)  # short
+    assert broker.get_balance('USDT') == pytest.approx(1100)
+
+    broker.on_candle('ABC/USDT', [0, 100, 110, 90, 100, 1])
+    assert broker.get_position('ABC/USDT')['realized_pnl'] == pytest.approx(-5)
+    assert broker.get_open_orders() == []
+
+
+def test_resting_limit_reserves_cash_and_can_be_cancelled():
+    broker = PaperBroker(balance=100, fee_rate=0, slippage_bps=0)
+    broker.update_price('ABC/USDT', 10.0)
+    order = broker.place_order('ABC/USDT', 'buy', 5, price=9.0, type='limit')
+    assert broker.get_balance('USDT') == pytest.approx(55)
+    with pytest.raises(ValueError):
+        broker.place_order('ABC/USDT', 'buy', 10, price=9.0, type='limit')
+
+    broker.cancel_order(order['id'])
+    assert broker.get_balance('USDT') == pytest.approx(100)
+    broker.place_order('ABC/USDT', 'buy', 5, price=9.0, type='limit')
+    broker.update_price('ABC/USDT', 8.5)
+    assert broker.get_balance('ABC') == 5
+    assert broker.get_position('ABC/USDT')['entry_price'] == 8.5  # filled at the better trade price
+
+
+def test_order_manager_attaches_tp_sl_on_paper_broker():
+    broker = PaperBroker(balance=10_000, fee_rate=0, slippage_bps=0)
+    broker.update_price('ABC/USDT', 100.0)
+    OrderManager(broker, capital=425).process_signal('ABC/USDT', '5m', 'BUY',
+                                                     {'entry_price': 100.0, 'macd_diff': 0.0, 'tp': 102, 'sl': 98})
+    exits = {o['type']: o for o in broker.get_open_orders('ABC/USDT')}
+    assert exits['limit']['price'] == 102 and exits['stop']['stopPrice'] == 98
+
+
+def test_stream_fills_paper_exits_only_on_base_timeframe_candles(tmp_path):
+    import asyncio
+
+    import main
+    from core.scanner import MarketScanner
+    from data.candle_buffer import CandleBuffer
+    from data.storage import DataStorage
+
+    base, longer = main.SETTINGS['trading']['timeframes'][0], main.SETTINGS['trading']['timeframes'][1]
+    paper = PaperBroker(balance=100_000, fee_rate=0, slippage_bps=0)
+    paper.update_price('ABC/USDT', 100.0)
+    exits = []
+
+    class MarketData:
+        def fetch_ticker(self, symbol):
+            return {'symbol': symbol, 'last': 100.0}
+
+        def stream(self, symbols, timeframes, on_candle_close, **kwargs):
+            return ReplayStream(timeframes, on_candle_close)
+
+    class ReplayStream:
+        def __init__(self, timeframes, on_candle_close):
+            self.buffers = {('ABC/USDT', tf): CandleBuffer(100) for tf in timeframes}
+            self.on_candle_close = on_candle_close
+
+        async def close(self, timeframe, high, low):
+            buffer = self.buffers[('ABC/USDT', timeframe)]
+            buffer.extend([[i * 300_000, 100, 101, 99, 100, 10] for i in range(59)] +
+                          [[59 * 300_000, 100, high, low, 100, 10]])
+            await self.on_candle_close('ABC/USDT', timeframe, buffer)
+            exits.append(sum(side == 'sell' for _, _, side, *_ in paper.fills))
+
+        async def run(self):
+            await self.close(base, 101, 99)  # BUY entered at 100, TP 101 / SL 99 resting
+            await self.close(longer, 110, 90)  # its range spans the hour before the entry
+            await self.close(base, 102, 100)  # the next base candle takes profit
+
+    class Alerts:
+        def send(self, subject, body, attachment_path=None):
+            pass
+
+    scanner = MarketScanner(max_concurrency=1)
+    try:
+        asyncio.run(main.run_stream(['ABC/USDT'], MarketData(), main.SignalEngine(), 1000, final_signal='BUY',
+                                    scanner=scanner, alerts=Alerts(), storage=DataStorage(base_dir=tmp_path),
+                                    order_manager=OrderManager(paper, 1000)))
+    finally:
+        scanner.shutdown()
+    assert exits[:2] == [0, 0] and exits[2] > 0
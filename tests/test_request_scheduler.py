@@ -0,0 +1,103 @@
+import threading
+import time
+
+from core.request_scheduler import PRIORITY_ORDER, PRIORITY_SCAN, RequestScheduler
+from utils import metrics
+
+
+def test_identical_inflight_requests_are_coalesced():
+    scheduler = RequestScheduler()
+    calls = []
+    release = threading.Event()
+
+    def fetch_ticker(symbol):
+        calls.append(symbol)
+        release.wait(1)
+        return {'symbol': symbol, 'last': 1.0}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(scheduler.call('ticker', fetch_ticker, 'BTC/USDT')))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert calls == ['BTC/USDT']
+    assert scheduler.coalesced == 4
+    assert results == [{'symbol': 'BTC/USDT', 'last': 1.0}] * 5
+
+
+def test_only_calls_of_the_same_function_are_coalesced():
+    scheduler = RequestScheduler()
+    release = threading.Event()
+    calls = []
+
+    class Exchange:
+        def fetch_ticker(self, symbol):
+            calls.append(('ticker', symbol))
+            release.wait(1)
+            return 'ticker'
+
+        def fetch_order_book(self, symbol):
+            calls.append(('book', symbol))
+            release.wait(1)
+            return 'book'
+
+    exchange = Exchange()
+    results = []
+    metrics.enable()  # each request wraps its bound method anew, as Broker.request does
+    try:
+        threads = [
+            threading.Thread(target=lambda fn=fn: results.append(
+                scheduler.call('ticker', metrics.instrument_api('ticker', fn), 'BTC/USDT')))
+            for fn in (exchange.fetch_ticker, exchange.fetch_order_book, exchange.fetch_ticker)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        release.set()
+        for t in threads:
+            t.join()
+    finally:
+        metrics.disable()
+
+    assert sorted(calls) == [('book', 'BTC/USDT'), ('ticker', 'BTC/USDT')]
+    assert sorted(results) == ['book', 'ticker', 'ticker'] and scheduler.coalesced == 1
+
+
+def test_orders_go_ahead_of_queued_scan_fetches():
+    # One request per 0.1s overall, so queued calls are released one by one
+    scheduler = RequestScheduler(global_limit=(1, 0.1))
+    scheduler.call('candles', lambda: None)  # use up the initial token
+    order = []
+
+    def scan(i):
+        scheduler.call('candles', order.append, f"scan-{i}", priority=PRIORITY_SCAN, coalesce=False)
+
+    threads = [threading.Thread(target=scan, args=(i,)) for i in range(3)]
+    for t in threads:
+        t.start()
+    time.sleep(0.02)
+    order_thread = threading.Thread(
+        target=lambda: scheduler.call('place_order', order.append, 'order', priority=PRIORITY_ORDER, coalesce=False)
+    )
+    order_thread.start()
+    for t in threads + [order_thread]:
+        t.join()
+
+    assert order[0] == 'order'
+    assert sorted(order[1:]) == ['scan-0', 'scan-1', 'scan-2']
+
+
+def test_endpoint_bucket_limits_throughput():
+    scheduler = RequestScheduler(limits={'candles': (5, 0.5)}, global_limit=None)
+    start = time.monotonic()
+    for _ in range(10):
+        scheduler.call('candles', lambda: None, coalesce=False)
+    # 5 immediately from the full bucket, the next 5 at 10/s
+    assert time.monotonic() - start >= 0.45
@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+
+from core.broker import Broker
+from core.risk_management import PortfolioRiskEngine, RollingCovariance, calculate_position_size
+
+
+def price_paths(n_obs=120, seed=5):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0, 0.01, n_obs)
+    returns = {
+        'AAA/USDT': market + rng.normal(0, 0.001, n_obs),
+        'BBB/USDT': market + rng.normal(0, 0.001, n_obs),
+        'CCC/USDT': market + rng.normal(0, 0.001, n_obs),
+        'DDD/USDT': rng.normal(0, 0.01, n_obs),
+    }
+    return {s: 100 * np.exp(np.cumsum(r)) for s, r in returns.items()}
+
+
+def test_incremental_covariance_matches_a_full_recompute():
+    paths = price_paths()
+    rc = RollingCovariance(window=50, min_periods=10)
+    for t in range(120):
+        prices = {s: p[t] for s, p in paths.items() if s != 'DDD/USDT' or t >= 30}  # DDD lists later
+        rc.update(prices)
+
+    symbols = list(paths)
+    expected = np.cov(rc.returns.T[[rc.index[s] for s in symbols]])
+    np.testing.assert_allclose(rc.covariance(symbols), expected, atol=1e-12)
+    corr = rc.correlation(symbols + ['NEW/USDT'])
+    assert corr[0, 1] > 0.9 and abs(corr[0, 3]) < 0.5
+    assert corr[4, 0] == 0 and corr[4, 4] == 1  # no history yet
+
+
+def test_correlated_signals_share_one_signals_exposure():
+    paths = price_paths()
+    engine = PortfolioRiskEngine(capital=1000, max_gross=100, max_net=100, max_sector=100, min_periods=10)
+    for t in range(120):
+        engine.observe({s: p[t] for s, p in paths.items()})
+
+    signals = [(s, 'BUY', 100.0, 98.0) for s in paths]
+    sizes = engine.size(signals)
+    single = calculate_position_size(1000, 100.0, 98.0)
+    assert sizes[:3] == pytest.approx([single / 3] * 3, abs=1e-3)
+    assert sizes[3] == pytest.approx(single)
+
+    # Opposite directions on correlated symbols hedge each other and are not merged
+    hedged = engine.size([('AAA/USDT', 'BUY', 100.0, 98.0), ('BBB/USDT', 'SELL', 100.0, 102.0)])
+    assert hedged == pytest.approx([single, single])
+
+
+def test_sector_net_and_gross_caps():
+    engine = PortfolioRiskEngine(capital=1000, max_gross=2.0, max_net=1.0, max_sector=0.5,
+                                 sectors={'memes': ['DOGE', 'PEPE']})
+    # Each signal alone: 20 risk / 1 stop = 20 units = 2000 notional
+    sizes = engine.size([('DOGE/USDT', 'BUY', 100.0, 99.0), ('PEPE/USDT', 'BUY', 100.0, 99.0)])
+    assert (sizes * 100).sum() == pytest.approx(500)  # sector cap
+
+    sizes = engine.size([('AAA/USDT', 'BUY', 100.0, 99.0), ('BBB/USDT', 'SELL', 100.0, 101.0)])
+    notional = sizes * 100
+    assert abs(notional[0] - notional[1]) <= 1000 + 1e-6 and notional.sum() <= 2000 + 1e-6
+
+    engine.exposure = {'XXX/USDT': 1900.0}
+    sizes = engine.size([('BBB/USDT', 'SELL', 100.0, 101.0)])
+    assert sizes[0] * 100 == pytest.approx(100)  # only the gross headroom is left
+
+
+def test_live_exposure_is_seeded_from_spot_balances():
+    class Exchange:
+        def fetch_balance(self):
+            return {'total': {'USDT': 500.0, 'BTC': 0.5, 'ETH': 0.0, 'OLD': 10.0}}
+
+    class Live(Broker):
+        connect = get_balance = place_order = None
+
+    tickers = {'BTC/USDT': {'last': 60_000.0}, 'ETH/USDT': {'last': 3_000.0}}
+    assert Live(Exchange()).exposure(tickers) == {'BTC/USDT': 30_000.0}  # OLD has no USDT market
+
+
+def test_streamed_signals_are_sized_against_positions_opened_earlier_in_the_stream(tmp_path):
+    import asyncio
+
+    import main
+    from core.order_manager import OrderManager
+    from core.paper_broker import PaperBroker
+    from core.scanner import MarketScanner
+    from data.candle_buffer import CandleBuffer
+    from data.storage import DataStorage
+
+    base = min(main.SETTINGS['trading']['timeframes'], key=main.timeframe_to_ms)
+    paper = PaperBroker(balance=100_000, fee_rate=0, slippage_bps=0)
+    paper.update_price('SOL/USDT', 100.0)
+    risk = PortfolioRiskEngine(1000, risk_per_trade=0.02, max_gross=10, max_net=10, max_sector=1.0)
+
+    class MarketData:
+        def fetch_ticker(self, symbol):
+            return {'symbol': symbol, 'last': 100.0}
+
+        def fetch_tickers(self):
+            return {'SOL/USDT': {'last': 100.0}}
+
+        def stream(self, symbols, timeframes, on_candle_close, **kwargs):
+            return ReplayStream(timeframes, on_candle_close)
+
+    class ReplayStream:
+        def __init__(self, timeframes, on_candle_close):
+            self.buffers = {('SOL/USDT', tf): CandleBuffer(100) for tf in timeframes}
+            self.on_candle_close = on_candle_close
+
+        async def run(self):
+            buffer = self.buffers[('SOL/USDT', base)]
+            buffer.extend([[i * 300_000, 100, 101, 99, 100, 10] for i in range(60)])
+            await self.on_candle_close('SOL/USDT', base, buffer)  # forced BUY: TP 101 / SL 99
+            buffer.extend([[60 * 300_000, 100, 100.5, 99.5, 100, 10]])  # within the bracket: still open
+            await self.on_candle_close('SOL/USDT', base, buffer)  # forced BUY again
+
+    class Alerts:
+        def send(self, subject, body, attachment_path=None):
+            pass
+
+    scanner = MarketScanner(max_concurrency=1)
+    try:
+        asyncio.run(main.run_stream(['SOL/USDT'], MarketData(), main.SignalEngine(), 1000, final_signal='BUY',
+                                    scanner=scanner, alerts=Alerts(), storage=DataStorage(base_dir=tmp_path),
+                                    order_manager=OrderManager(paper, 1000), risk_engine=risk, positions=paper))
+    finally:
+        scanner.shutdown()
+    # 20 USDT risked to a 1 USDT stop is 2000 notional; the sector cap allows 1000, all used by the first entry
+    assert [amount for _, _, side, amount, *_ in paper.fills if side == 'buy'] == [10.0]
+    assert risk.exposure == {'SOL/USDT': pytest.approx(1000.0)}
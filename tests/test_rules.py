@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+import strategies.rules as rules
+from backtest.engine import BacktestEngine
+from core.signal_engine import SignalEngine
+from strategies.registry import create_strategy, register_rules
+from strategies.rsi_macd_strategy import RSIMACDStrategy
+from strategies.rules import RuleSet, RuleStrategy, RuleSyntaxError, parse_rule
+
+RSI_MACD = {'buy': "rsi(14) < 30 and macd_diff > 0 and close > ema(50)",
+            'sell': "rsi > 70 and macd_diff < 0 and close < ema(50)"}
+
+
+def closes(symbols=40, bars=300, seed=1):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (symbols, bars)), axis=1))
+
+
+def test_parser_fills_defaults_and_rejects_bad_rules():
+    assert parse_rule("rsi < 30") == parse_rule("rsi(14) < 30")
+    assert parse_rule("-close * 2 >= 1 or not volume > 0")[0] == 'or'
+    for bad in ("ema < 3", "foo(3) > 1", "rsi(14 < 30", "close >", "rsi(14, 3) > 1"):
+        with pytest.raises(RuleSyntaxError):
+            parse_rule(bad)
+
+
+def test_rules_match_the_rsi_macd_strategy_on_every_bar():
+    panel = closes()
+    loose = RuleStrategy('rules', buy=RSI_MACD['buy'].replace('30', '60'), sell=RSI_MACD['sell'].replace('70', '40'))
+    signals, per_strategy, meta = RuleSet([loose]).evaluate({'close': panel}, full=True)
+
+    engine = SignalEngine()
+    ind = engine.indicator_panels(panel)
+    expected = RSIMACDStrategy(60, 40).evaluate_panel(ind['rsi'], ind['macd_diff'], panel, ind['ema_50'])
+    assert (signals == expected).all() and (signals != 0).any()
+    np.testing.assert_allclose(meta['ema_50'], ind['ema_50'])
+
+
+def test_indicators_are_shared_across_strategies(monkeypatch):
+    calls = []
+    real = rules.rsi_panel
+    monkeypatch.setattr(rules, 'rsi_panel', lambda *a: calls.append(a[1]) or real(*a))
+
+    strategies = [RuleStrategy(f"s{i}", buy=f"rsi(14) < {20 + i} and close > ema(50)", sell=f"rsi > {80 - i}")
+                  for i in range(20)]
+    RuleSet(strategies).evaluate({'close': closes()})
+    assert calls == [14]  # one RSI panel for 20 strategies and all symbols, shared with the reported meta
+
+
+def test_signal_engine_runs_registered_rules_alongside_class_strategies():
+    register_rules([{'name': 'test_rsi_macd_rules', **RSI_MACD},
+                    {'name': 'test_always_sell', 'sell': "close > 0"}])
+    assert isinstance(create_strategy('test_rsi_macd_rules'), RuleStrategy)
+
+    panel = closes()
+    symbols = [f"S{i}/USDT" for i in range(len(panel))]
+    legacy = SignalEngine().generate_batch(symbols, panel)
+    combined = SignalEngine(['rsi_macd', 'test_rsi_macd_rules']).generate_batch(symbols, panel)
+    assert {s: r.signal for s, r in combined.items()} == {s: r.signal for s, r in legacy.items()}
+    assert combined[symbols[0]].rsi == pytest.approx(legacy[symbols[0]].rsi)
+
+    # Disagreeing strategies cancel out, as disagreeing timeframes do
+    conflicted = SignalEngine(['test_rsi_macd_rules', 'test_always_sell']).generate_batch(symbols, panel)
+    assert all(conflicted[s].signal in (None, 'SELL') for s in symbols)
+    assert all(conflicted[s].signal is None for s, r in legacy.items() if r.signal == 'BUY')
+
+    with pytest.raises(NotImplementedError):
+        SignalEngine('no_such_strategy')
+
+
+def test_backtest_uses_rule_strategies():
+    register_rules([{'name': 'test_backtest_rules', **RSI_MACD}])
+    panel = closes(symbols=1, bars=2000)[0]
+    candles = np.column_stack([np.arange(len(panel)), panel, panel * 1.01, panel * 0.99, panel, np.ones(len(panel))])
+    legacy = BacktestEngine().signals(candles)
+    assert (BacktestEngine(SignalEngine('test_backtest_rules')).signals(candles) == legacy).all()
@@ -0,0 +1,128 @@
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+
+import main
+from core.scanner import MarketScanner
+
+CYCLE = contextvars.ContextVar('cycle', default=None)
+
+
+def test_slow_or_failing_symbols_do_not_hold_up_the_scan():
+    scanner = MarketScanner(max_concurrency=4, symbol_timeout=0.05)
+
+    async def analyze(symbol):
+        if symbol == 'SLOW/USDT':
+            await asyncio.sleep(5)
+        if symbol == 'BAD/USDT':
+            raise ValueError("no data")
+        return symbol.lower()
+
+    try:
+        started = time.perf_counter()
+        results = asyncio.run(scanner.scan(['AAA/USDT', 'SLOW/USDT', 'BAD/USDT'], analyze))
+        assert time.perf_counter() - started < 2
+        assert results == {'AAA/USDT': 'aaa/usdt', 'SLOW/USDT': None, 'BAD/USDT': None}
+    finally:
+        scanner.shutdown()
+
+
+def test_at_most_max_concurrency_symbols_are_in_flight():
+    scanner = MarketScanner(max_concurrency=2)
+    in_flight, peak = 0, 0
+
+    async def analyze(symbol):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return symbol
+
+    try:
+        results = asyncio.run(scanner.scan([f'S{i}/USDT' for i in range(6)], analyze))
+        assert len(results) == 6 and peak == 2
+    finally:
+        scanner.shutdown()
+
+
+def test_cancel_drops_in_flight_symbols_and_returns_the_finished_ones():
+    scanner = MarketScanner(max_concurrency=4)
+
+    async def analyze(symbol):
+        if symbol != 'DONE/USDT':
+            await asyncio.sleep(5)
+        return symbol
+
+    async def run():
+        scan = asyncio.create_task(scanner.scan(['DONE/USDT', 'AAA/USDT', 'BBB/USDT'], analyze))
+        await asyncio.sleep(0.05)
+        scanner.cancel()
+        return await scan
+
+    try:
+        assert asyncio.run(asyncio.wait_for(run(), timeout=2)) == {'DONE/USDT': 'DONE/USDT'}
+        assert scanner._tasks == set()
+    finally:
+        scanner.shutdown()
+
+
+def test_run_blocking_carries_the_callers_context_into_the_worker():
+    scanner = MarketScanner(max_concurrency=1)
+
+    async def run():
+        CYCLE.set('cycle-1')
+        return await scanner.run_blocking(lambda: (CYCLE.get(), threading.current_thread().name))
+
+    try:
+        cycle, thread = asyncio.run(run())
+        assert cycle == 'cycle-1' and thread.startswith('scan')
+    finally:
+        scanner.shutdown()
+
+
+def test_shutdown_cancels_queued_blocking_calls():
+    scanner = MarketScanner(max_concurrency=1)
+    release = threading.Event()
+
+    async def run():
+        busy = asyncio.ensure_future(scanner.run_blocking(release.wait, 2))
+        queued = asyncio.ensure_future(scanner.run_blocking(lambda: 'ran'))
+        await asyncio.sleep(0.05)
+        scanner.shutdown()
+        release.set()
+        assert await busy is True
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+
+    asyncio.run(run())
+
+
+def test_fallback_scanners_are_shut_down(monkeypatch):
+    created = []
+
+    class RecordingScanner(MarketScanner):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.closed = False
+            created.append(self)
+
+        def shutdown(self):
+            self.closed = True
+            super().shutdown()
+
+    class Broker:
+        def fetch_ticker(self, symbol):
+            return {'last': 1e9, 'quoteVolume': 0}  # filtered out by the price threshold
+
+    class Storage:
+        sqlite = None
+
+    monkeypatch.setattr(main, 'MarketScanner', RecordingScanner)
+    asyncio.run(main.analyze_symbol('AAA/USDT', Broker(), None, 1000, fetcher=object()))
+    asyncio.run(main.act_on_results('AAA/USDT', {'last': 1.0}, {}, {}, 1000, storage=Storage()))
+
+    assert len(created) == 2 and all(scanner.closed for scanner in created)
@@ -0,0 +1,47 @@
+import asyncio
+
+import numpy as np
+
+from core.shared_panel import SharedCandlePanel, ShardedEvaluator
+from core.signal_engine import SignalEngine
+
+
+def make_rows(seed, n):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    ts = 1_700_000_000_000 + np.arange(n) * 60_000
+    return np.column_stack([ts, close, close * 1.01, close * 0.99, close, np.ones(n)])
+
+
+def test_panel_is_right_aligned_and_readable_after_attach():
+    rows = {'AAA/USDT': make_rows(1, 5), 'BBB/USDT': make_rows(2, 3), 'EMPTY/USDT': None}
+    panel = SharedCandlePanel.create(rows)
+    try:
+        view = SharedCandlePanel.attach(panel.descriptor())
+        assert view.symbols == ['AAA/USDT', 'BBB/USDT']
+        assert np.isnan(view.closes()[1, :2]).all()
+        np.testing.assert_array_equal(view.closes()[1, 2:], rows['BBB/USDT'][:, 4])
+        view.release()
+    finally:
+        panel.release()
+
+
+def test_sharded_evaluation_matches_in_process_batch():
+    rows = {f"S{i:03d}/USDT": make_rows(i, 120 - i % 30) for i in range(150)}
+    evaluator = ShardedEvaluator(workers=2, min_shard=16)
+    try:
+        sharded = asyncio.run(evaluator.evaluate(rows, bars=120))
+    finally:
+        evaluator.shutdown()
+
+    symbols = list(rows)
+    closes = np.full((len(symbols), 120), np.nan)
+    for i, s in enumerate(symbols):
+        closes[i, 120 - len(rows[s]):] = rows[s][:, 4]
+    expected = SignalEngine().generate_batch(symbols, closes)
+
+    assert set(sharded) == set(expected)
+    for symbol, result in expected.items():
+        assert sharded[symbol].signal == result.signal
+        assert np.isclose(sharded[symbol].rsi, result.rsi, equal_nan=True)
+        assert np.isclose(sharded[symbol].macd_diff, result.macd_diff, equal_nan=True)
@@ -0,0 +1,92 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+import ta
+
+from core.signal_engine import SignalEngine, build_close_panel, build_ohlcv_panel
+from strategies.indicators import IndicatorState
+from strategies.registry import register_rules
+
+
+def make_ohlcv(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    index = pd.to_datetime(1_700_000_000_000 + np.arange(n) * 300_000, unit='ms')
+    return pd.DataFrame({
+        'open': close, 'high': close + 1, 'low': close - 1, 'close': close, 'volume': 1.0
+    }, index=index)
+
+
+def test_indicator_state_matches_ta():
+    df = make_ohlcv()
+    rsi = ta.momentum.RSIIndicator(close=df['close'], window=14).rsi()
+    macd = ta.trend.MACD(close=df['close'])
+    ema = ta.trend.EMAIndicator(close=df['close'], window=50).ema_indicator()
+
+    state = IndicatorState()
+    for i, (ts, close) in enumerate(zip(df.index.as_unit('ms').asi8, df['close'])):
+        values = state.update(ts, close)
+        for name, expected in (('rsi', rsi), ('macd', macd.macd()), ('macd_diff', macd.macd_diff()), ('ema_50', ema)):
+            if np.isnan(expected.iloc[i]):
+                assert np.isnan(values[name])
+            else:
+                assert values[name] == pytest.approx(expected.iloc[i], rel=1e-9, abs=1e-9)
+
+
+def test_generate_incremental_matches_full_recompute():
+    df = make_ohlcv()
+    engine = SignalEngine()
+    # Warm up on a prefix, then feed the rest in overlapping windows as the scan loop would
+    engine.generate_incremental('ABC/USDT', '5m', df.iloc[:150])
+    for end in range(160, len(df) + 1, 10):
+        result = engine.generate_incremental('ABC/USDT', '5m', df.iloc[end - 100:end])
+
+    expected = engine.strategy.generate_signal(df)
+    signal, meta = expected
+    assert result.signal == signal
+    assert result.rsi == pytest.approx(meta['rsi'])
+    assert result.macd_diff == pytest.approx(meta['macd_diff'])
+    assert result.ema_50 == pytest.approx(meta['ema_50'])
+
+
+def test_indicator_state_survives_serialization():
+    df = make_ohlcv()
+    engine = SignalEngine()
+    engine.generate_incremental('ABC/USDT', '5m', df.iloc[:200])
+
+    restored = SignalEngine()
+    restored.load_indicator_state(json.loads(json.dumps(engine.export_indicator_state())))
+
+    a = engine.generate_incremental('ABC/USDT', '5m', df.iloc[150:250])
+    b = restored.generate_incremental('ABC/USDT', '5m', df.iloc[150:250])
+    assert (a.signal, a.rsi, a.macd, a.ema_50) == (b.signal, b.rsi, b.macd, b.ema_50)
+
+
+def test_generate_batch_matches_per_symbol_generate():
+    frames = {f"S{i}/USDT": make_ohlcv(n=120 + 7 * i, seed=i) for i in range(12)}
+    engine = SignalEngine(rsi_low=45, rsi_high=55)
+    symbols, closes = build_close_panel(frames)
+
+    batch = engine.generate_batch(symbols, closes)
+    for symbol, df in frames.items():
+        single = engine.generate(df)
+        assert batch[symbol].signal == single.signal
+        assert batch[symbol].rsi == pytest.approx(single.rsi)
+        assert batch[symbol].macd == pytest.approx(single.macd)
+        assert batch[symbol].macd_diff == pytest.approx(single.macd_diff)
+        assert batch[symbol].ema_50 == pytest.approx(single.ema_50)
+
+
+def test_ohlcv_panels_feed_rules_that_read_more_than_closes():
+    register_rules([{'name': 'test_wide_range', 'buy': "high - low > 1.5 and volume > 0", 'sell': "open > close"}])
+    frames = {f"S{i}/USDT": make_ohlcv(n=80 + 5 * i, seed=i) for i in range(6)}
+    frames['S0/USDT']['high'] += 1.0
+    symbols, closes, fields = build_ohlcv_panel(frames)
+    np.testing.assert_array_equal(closes, build_close_panel(frames)[1])
+
+    engine = SignalEngine('test_wide_range')
+    batch = engine.generate_batch(symbols, closes, fields)
+    assert batch['S0/USDT'].signal == 'BUY'
+    assert {s: r.signal for s, r in batch.items()} == {s: engine.generate(df).signal for s, df in frames.items()}
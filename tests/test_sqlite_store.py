@@ -0,0 +1,48 @@
+import csv
+import time
+from datetime import datetime, timedelta
+
+from data.sqlite_store import SQLiteStore
+
+
+def test_batched_writes_are_indexed_and_queryable(tmp_path):
+    store = SQLiteStore(tmp_path / 'hawkx.db', batch_size=50)
+    now = datetime.utcnow()
+    for i in range(120):
+        store.insert('trades', {'timestamp': (now - timedelta(minutes=i)).isoformat(),
+                                'symbol': f"S{i % 3}/USDT", 'signal': 'BUY' if i % 2 else 'SELL', 'note': i})
+    store.flush()
+
+    assert store.query("PRAGMA journal_mode")[0]['journal_mode'] == 'wal'
+    rows = store.query("SELECT symbol, extra FROM trades WHERE symbol = ? AND signal = ?", ('S0/USDT', 'BUY'))
+    assert len(rows) == 20
+    plan = store.query("EXPLAIN QUERY PLAN SELECT * FROM trades WHERE symbol = ?", ('S0/USDT',))
+    assert any('idx_trades_symbol' in row['detail'] for row in plan)
+    store.close()
+
+
+def test_prune_and_csv_import(tmp_path):
+    csv_path = tmp_path / 'trades_log.csv'
+    old = (datetime.utcnow() - timedelta(days=400)).isoformat()
+    recent = datetime.utcnow().isoformat()
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['symbol', 'signal', 'timestamp'])
+        writer.writerow(['AAA/USDT', 'BUY', old])
+        writer.writerow(['BBB/USDT', 'SELL', recent])
+
+    store = SQLiteStore(tmp_path / 'hawkx.db')
+    assert store.import_csv(csv_path) == 2
+    assert store.prune(retention_days=180) == 1
+    assert [r['symbol'] for r in store.query("SELECT symbol FROM trades")] == ['BBB/USDT']
+    store.close()
+
+
+def test_trickled_rows_are_written_within_the_flush_interval(tmp_path):
+    store = SQLiteStore(tmp_path / 'hawkx.db', batch_size=200, flush_interval=0.2)
+    for _ in range(12):  # one row every 50ms: the queue is never idle for a whole flush_interval
+        store.insert('signals', {'timestamp': datetime.utcnow().isoformat(), 'symbol': 'AAA/USDT', 'signal': 'BUY'})
+        time.sleep(0.05)
+    # Far from a full batch, yet every row older than flush_interval (plus slack) is already on disk
+    assert store.query("SELECT COUNT(*) AS n FROM signals")[0]['n'] >= 6
+    store.close()
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.fake_exchange import FakeBroker
+from data.fetcher import DataFetcher, TimeframeAggregator
+from data.storage import DataStorage
+
+HOUR = 3600 * 1000
+
+
+def base_rows(start, n, step=5 * 60 * 1000, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(size=n))
+    open_ = np.concatenate([[100.0], close[:-1]])
+    high = np.maximum(open_, close) + rng.random(n)
+    low = np.minimum(open_, close) - rng.random(n)
+    ts = start + np.arange(n) * step
+    return np.column_stack([ts, open_, high, low, close, rng.random(n) * 10]).astype(np.float64)
+
+
+def test_rollup_matches_resample_and_drops_partial_head():
+    rows = base_rows(start=10 * HOUR + 20 * 60 * 1000, n=200)  # starts at 10:20, mid-hour
+    bars = TimeframeAggregator('5m').aggregate(rows, '1h')
+
+    df = pd.DataFrame(rows[:, 1:], columns=['open', 'high', 'low', 'close', 'volume'],
+                      index=pd.to_datetime(rows[:, 0].astype(np.int64), unit='ms'))
+    expected = df.resample('1h').agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last',
+                                      'volume': 'sum'}).iloc[1:]
+    assert bars[0, 0] == 11 * HOUR
+    np.testing.assert_allclose(bars[:, 1:], expected.to_numpy())
+
+
+def test_daily_buckets_follow_the_configured_offset():
+    rows = base_rows(start=0, n=3 * 24 * 12)
+    utc = TimeframeAggregator('5m').aggregate(rows, '1d')
+    hk = TimeframeAggregator('5m', long_offset_hours=8).aggregate(rows, '1d')
+    assert utc[:, 0].tolist() == [0, 24 * HOUR, 48 * HOUR]
+    assert hk[:, 0].tolist() == [8 * HOUR, 32 * HOUR, 56 * HOUR]  # UTC+8 midnight; leading partial day dropped
+    # 4h bars stay on the UTC grid regardless of the long-bar offset
+    assert TimeframeAggregator('5m', long_offset_hours=8).aggregate(rows, '4h')[0, 0] == 0
+
+
+def test_incremental_update_matches_full_rollup():
+    rows = base_rows(start=0, n=1000)
+    agg = TimeframeAggregator('5m')
+    agg.update('ABC/USDT', '1h', rows[:437])
+    incremental = agg.update('ABC/USDT', '1h', rows[300:])
+    np.testing.assert_allclose(incremental, TimeframeAggregator('5m').aggregate(rows, '1h'))
+
+
+def test_fetcher_fetches_only_the_base_timeframe_and_falls_back_when_too_deep(tmp_path):
+    broker = FakeBroker(n_symbols=1)
+    broker.connect()
+    symbol = broker.exchange.symbols[0]
+    requested = []
+    fetch = broker.safe_fetch_ohlcv
+    broker.safe_fetch_ohlcv = lambda s, tf, limit=100, since=None: requested.append(tf) or fetch(s, tf, limit, since)
+
+    fetcher = DataFetcher(broker, storage=DataStorage(tmp_path), aggregator=TimeframeAggregator('5m'))
+    frames = fetcher.get_timeframes(symbol, ['5m', '1h', '4h', '1d'], limit=100)
+    assert {tf: len(df) for tf, df in frames.items()} == {'5m': 100, '1h': 100, '4h': 100, '1d': 100}
+    assert set(requested) == {'5m', '1d'}  # 1d needs more base history than the store keeps
+    assert frames['1h'].index[-1] == frames['5m'].index[-1].floor('1h')
+
+    requested.clear()
+    fetcher.get_timeframes(symbol, ['5m', '1h', '4h'], limit=100)
+    assert requested == ['5m']  # warm: one incremental base fetch per cycle
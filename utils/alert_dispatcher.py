@@ -0,0 +1,163 @@
+# utils/alert_dispatcher.py
+
+import logging
+import queue
+import smtplib
+import threading
+import time
+
+from utils import metrics
+from utils.email_alert import build_message, open_smtp
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class AlertDispatcher:
+    """
+    Sends email alerts from a background thread so callers never block on SMTP.
+
+    One SMTP connection is kept open and reused across messages (closed after
+    `idle_timeout` seconds without traffic). Failed sends are retried with
+    exponential backoff, reconnecting as needed. In digest mode, alerts queued
+    between `begin_cycle()` and `flush()` are merged into a single email; a
+    digest left open longer than `digest_max_age` seconds is flushed by the
+    worker itself (useful when there are no scan cycles, e.g. streaming mode).
+    """
+
+    def __init__(self, config: dict, digest: bool = False, max_retries: int = 3, backoff: float = 1.0,
+                 idle_timeout: float = 60.0, digest_max_age: float = 300.0):
+        self.config = config
+        self.digest = digest
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.idle_timeout = idle_timeout
+        self.digest_max_age = digest_max_age
+
+        self.sent = 0
+        self.failed = 0
+        self.connections = 0
+
+        self._queue = queue.Queue()
+        self._server = None
+        self._last_activity = 0.0
+        self._digest_items = []
+        self._digest_started = None
+        self._digest_lock = threading.Lock()
+        self._thread = None
+
+    # === Producer side ===
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def send(self, subject: str, body: str, attachment_path: str = None):
+        """
+        Queue an alert; returns immediately.
+        """
+        if self.digest and attachment_path is None:
+            with self._digest_lock:
+                if not self._digest_items:
+                    self._digest_started = time.monotonic()
+                self._digest_items.append((subject, body))
+            return
+        self._queue.put((subject, body, attachment_path))
+
+    def begin_cycle(self):
+        """
+        Start collecting a new digest (flushes anything left from the previous one).
+        """
+        self.flush()
+
+    def flush(self):
+        """
+        Merge the collected digest alerts into one queued email.
+        """
+        with self._digest_lock:
+            items, self._digest_items = self._digest_items, []
+            self._digest_started = None
+        if not items:
+            return
+        if len(items) == 1:
+            subject, body = items[0]
+        else:
+            subject = f"HawkX digest: {len(items)} alerts"
+            body = "\n\n".join(f"=== {s} ===\n{b.strip()}" for s, b in items)
+        self._queue.put((subject, body, None))
+
+    def stop(self, timeout: float = 30.0):
+        """
+        Flush pending alerts, wait for the worker to drain the queue and close SMTP.
+        """
+        self.flush()
+        if self._thread and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    # === Worker side ===
+
+    def _connection(self):
+        if self._server is not None:
+            return self._server
+        self._server = open_smtp(self.config)
+        self.connections += 1
+        return self._server
+
+    def _close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
+
+    def _deliver(self, subject, body, attachment_path):
+        msg = build_message(subject, body, self.config, attachment_path)
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._connection().send_message(msg)
+                self.sent += 1
+                logger.info(f"📧 Email sent to {self.config['receiver']} with subject: {subject}")
+                return
+            except (smtplib.SMTPException, OSError) as e:
+                # Drop the connection; the next attempt reconnects
+                self._close()
+                if attempt == self.max_retries:
+                    self.failed += 1
+                    logger.error(f"❌ Failed to send email after {attempt + 1} attempts: {e}")
+                    return
+                logger.warning(f"Email send failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                delay *= 2
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=min(self.idle_timeout, 1.0))
+            except queue.Empty:
+                self._on_idle()
+                continue
+            if item is _STOP:
+                self._close()
+                return
+            try:
+                with metrics.timed('email.send'):
+                    self._deliver(*item)
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"❌ Failed to send email: {e}")
+            self._last_activity = time.monotonic()
+
+    def _on_idle(self):
+        now = time.monotonic()
+        with self._digest_lock:
+            digest_due = self._digest_started is not None and now - self._digest_started >= self.digest_max_age
+        if digest_due:
+            self.flush()
+        if self._server is not None and now - self._last_activity >= self.idle_timeout:
+            self._close()
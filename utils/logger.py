@@ -1,28 +1,225 @@
 # utils/logger.py
 
+import atexit
+import contextvars
+import json
 import logging
-from logging.handlers import RotatingFileHandler
 import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-def setup_logger(name: str, log_file: str = "logs/hawkx.log", level=logging.INFO):
+from utils import metrics
+
+LOG_FILE = "logs/hawkx.log"
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - [%(cycle_id)s] %(message)s'
+
+RECORDS_DROPPED = metrics.counter('hawkx_log_records_dropped_total',
+                                  "Log records dropped by the rate limiter", ('logger',))
+
+_cycle = contextvars.ContextVar('hawkx_cycle', default=None)
+_queue = queue.SimpleQueue()
+_listener = None
+_handler = None
+_lock = threading.Lock()
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'cycle_id'}
+
+
+class AuditJournal:
     """
-    Create and return a logger with the specified name.
-    Logs are saved to file with rotation and also printed to console.
+    Every decision taken in one scan cycle, kept in memory and written as one
+    compact JSONL file (`<directory>/<cycle_id>.jsonl`) when the cycle ends.
+    Each write appends what was recorded since the previous one.
     """
-    os.makedirs(os.path.dirname(log_file), exist_ok=True)
 
-    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    def __init__(self, cycle_id: str, directory: str = None):
+        self.cycle_id = cycle_id
+        self.directory = directory
+        self.entries = []
 
-    handler = RotatingFileHandler(log_file, maxBytes=5 * 1024 * 1024, backupCount=3)
-    handler.setFormatter(formatter)
+    def record(self, event: str, **fields):
+        self.entries.append({'t': round(time.time(), 3), 'event': event, **fields})
 
-    console = logging.StreamHandler()
-    console.setFormatter(formatter)
+    def write(self):
+        """
+        Write the journal; returns its path, or None when disabled or empty.
+        """
+        entries, self.entries = self.entries, []
+        if not self.directory or not entries:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{self.cycle_id}.jsonl")
+        with open(path, 'a', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(',', ':'), ensure_ascii=False, default=str) + '\n')
+        return path
+
+
+def begin_cycle(audit_dir: str = None) -> AuditJournal:
+    """
+    Start a scan cycle in the current context: log records get its correlation ID
+    and `audit()` calls go to its journal. Tasks and run_blocking calls started
+    afterwards inherit it.
+    """
+    cycle_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+    journal = AuditJournal(cycle_id, audit_dir)
+    _cycle.set(journal)
+    return journal
+
+
+def current_cycle():
+    return _cycle.get()
 
-    logger = logging.getLogger(name)
-    logger.setLevel(level)
-    logger.addHandler(handler)
-    logger.addHandler(console)
-    logger.propagate = False
 
+def audit(event: str, **fields):
+    """
+    Record a decision in the current cycle's audit journal (no-op outside a cycle).
+    """
+    journal = _cycle.get()
+    if journal is not None:
+        journal.record(event, **fields)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Caps how often one message template is logged below WARNING: at most
+    `messages` records per template every `interval` seconds, then only every
+    `sample_every`-th one (0 drops the rest). The next record let through
+    carries the number dropped in between as `suppressed`.
+
+    Templates are the unformatted `msg`, so per-symbol messages must use lazy
+    %-style arguments to be grouped.
+    """
+
+    def __init__(self, messages: int = 20, interval: float = 60.0, sample_every: int = 0):
+        super().__init__()
+        self.messages = messages
+        self.interval = interval
+        self.sample_every = sample_every
+        self.windows = {}   # (logger, msg) -> [window start, records seen, dropped not yet reported]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.msg)
+        window = self.windows.get(key)
+        if window is None or record.created - window[0] >= self.interval:
+            window = self.windows[key] = [record.created, 0, window[2] if window else 0]
+        window[1] += 1
+        over = window[1] - self.messages
+        if over > 0 and not (self.sample_every and over % self.sample_every == 0):
+            window[2] += 1
+            RECORDS_DROPPED.inc(logger=record.name)
+            return False
+        if window[2]:
+            record.suppressed = window[2]
+            window[2] = 0
+        return True
+
+
+class _CycleQueueHandler(QueueHandler):
+    """
+    Hands records to the background writer unformatted; formatting happens on
+    the writer thread. Records are stamped with the current cycle ID first.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        journal = _cycle.get()
+        record.cycle_id = journal.cycle_id if journal is not None else '-'
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per record, including the cycle ID and any `extra=` fields.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'cycle': getattr(record, 'cycle_id', '-'),
+            'msg': record.getMessage(),
+        }
+        event.update((k, v) for k, v in vars(record).items() if k not in _RECORD_FIELDS)
+        if record.exc_info:
+            event['exc'] = self.formatException(record.exc_info)
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+class _TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        record.cycle_id = getattr(record, 'cycle_id', '-')
+        text = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        return f"{text} (+{suppressed} similar suppressed)" if suppressed else text
+
+
+def configure_logging(config: dict = None):
+    """
+    (Re)build the logging pipeline from the `logging` settings. Records from
+    every logger go through one queue to a background thread that writes the
+    console and a rotating file (JSON events unless `json` is false).
+    """
+    global _listener, _handler
+    config = config or {}
+    log_file = config.get('file', LOG_FILE)
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            for h in _listener.handlers:
+                h.close()
+        os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+
+        file_handler = RotatingFileHandler(log_file, maxBytes=5 * 1024 * 1024, backupCount=3, encoding='utf-8')
+        file_handler.setFormatter(JsonFormatter() if config.get('json', True) else _TextFormatter(TEXT_FORMAT))
+        console = logging.StreamHandler()
+        console.setFormatter(_TextFormatter(TEXT_FORMAT))
+        _listener = QueueListener(_queue, file_handler, console)
+        _listener.start()
+
+        root = logging.getLogger()
+        if _handler is None:
+            _handler = _CycleQueueHandler(_queue)
+            root.addHandler(_handler)
+        _handler.filters = []
+        rate_cfg = config.get('rate_limit')
+        if rate_cfg:
+            _handler.addFilter(RateLimitFilter(messages=rate_cfg.get('messages', 20),
+                                               interval=rate_cfg.get('interval_sec', 60),
+                                               sample_every=rate_cfg.get('sample_every', 0)))
+        root.setLevel(config.get('level', 'INFO'))
+
+
+def shutdown():
+    """
+    Flush queued records and stop the background writer.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(shutdown)
+
+
+def setup_logger(name: str, log_file: str = LOG_FILE, level=None):
+    """
+    Return the named logger, routed through the shared non-blocking pipeline.
+    Safe to call any number of times: the pipeline is installed once (with
+    defaults until configure_logging() applies the settings).
+    """
+    if _handler is None:
+        configure_logging({'file': log_file})
+    logger = logging.getLogger(name)
+    if level is not None:
+        logger.setLevel(level)
     return logger
@@ -0,0 +1,268 @@
+# utils/metrics.py
+
+import bisect
+import logging
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from in-process indicator math up to slow REST calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_enabled = False
+_NULL = nullcontext()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def _label_key(labelnames: tuple, labels: dict) -> tuple:
+    return tuple(str(labels.get(name, '')) for name in labelnames)
+
+
+def _format_labels(labelnames: tuple, key: tuple, extra: str = '') -> str:
+    pairs = [f'{n}="{v}"' for n, v in zip(labelnames, key)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        if not _enabled:
+            return
+        key = _label_key(self.labelnames, labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        return self.values.get(_label_key(self.labelnames, labels), 0.0)
+
+    def samples(self):
+        with self.lock:
+            items = list(self.values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        if not _enabled:
+            return
+        key = _label_key(self.labelnames, labels)
+        with self.lock:
+            self.values[key] = value
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # label key -> [per-bucket counts (+Inf last), sum, count]
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        if not _enabled:
+            return
+        key = _label_key(self.labelnames, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def count(self, **labels) -> int:
+        entry = self.values.get(_label_key(self.labelnames, labels))
+        return entry[2] if entry else 0
+
+    def samples(self):
+        with self.lock:
+            items = [(key, list(counts), total, n) for key, (counts, total, n) in self.values.items()]
+        for key, counts, total, n in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float('inf'),), counts):
+                cumulative += c
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                labels = _format_labels(self.labelnames, key, 'le="%s"' % le)
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {n}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def get_or_create(self, cls, name: str, help: str, labelnames: tuple = (), **kwargs):
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, help, labelnames, **kwargs)
+            return metric
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition format (version 0.0.4).
+        """
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help: str, labelnames: tuple = ()) -> Counter:
+    return REGISTRY.get_or_create(Counter, name, help, labelnames)
+
+
+def gauge(name: str, help: str, labelnames: tuple = ()) -> Gauge:
+    return REGISTRY.get_or_create(Gauge, name, help, labelnames)
+
+
+def histogram(name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.get_or_create(Histogram, name, help, labelnames, buckets=buckets)
+
+
+STAGE_SECONDS = histogram('hawkx_stage_duration_seconds', "Time spent per pipeline stage", ('stage',))
+STAGE_ERRORS = counter('hawkx_stage_errors_total', "Exceptions raised per pipeline stage", ('stage',))
+API_SECONDS = histogram('hawkx_api_request_duration_seconds', "Exchange REST call latency", ('endpoint',))
+API_ERRORS = counter('hawkx_api_errors_total', "Failed exchange REST calls", ('endpoint',))
+
+
+class _StageTimer:
+    __slots__ = ('stage', 'started')
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        STAGE_SECONDS.observe(time.perf_counter() - self.started, stage=self.stage)
+        if exc_type is not None:
+            STAGE_ERRORS.inc(stage=self.stage)
+        return False
+
+
+def timed(stage: str):
+    """
+    Context manager recording the latency (and any exception) of a pipeline stage.
+    Returns a shared no-op context when metrics are disabled.
+    """
+    if not _enabled:
+        return _NULL
+    return _StageTimer(stage)
+
+
+class _InstrumentedCall:
+    # Wrappers of the same call compare equal, so the RequestScheduler still coalesces them
+    __slots__ = ('endpoint', 'fn')
+
+    def __init__(self, endpoint: str, fn):
+        self.endpoint = endpoint
+        self.fn = fn
+
+    def __call__(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self.fn(*args, **kwargs)
+        except Exception:
+            API_ERRORS.inc(endpoint=self.endpoint)
+            raise
+        finally:
+            API_SECONDS.observe(time.perf_counter() - started, endpoint=self.endpoint)
+
+    def __eq__(self, other):
+        return isinstance(other, _InstrumentedCall) and (self.endpoint, self.fn) == (other.endpoint, other.fn)
+
+    def __hash__(self):
+        return hash((self.endpoint, self.fn))
+
+
+def instrument_api(endpoint: str, fn):
+    """
+    Wrap an exchange call so its latency and failures are recorded per endpoint.
+    Returns `fn` unchanged when metrics are disabled.
+    """
+    if not _enabled:
+        return fn
+    return _InstrumentedCall(endpoint, fn)
+
+
+# === Scrape endpoint ===
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port: int = 9108, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """
+    Serve /metrics from a daemon thread.
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"Metrics available at http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def configure(config: dict):
+    """
+    Apply the `metrics` settings section: enable collection and start the scrape endpoint.
+    """
+    if not config or not config.get('enabled'):
+        return None
+    enable()
+    return start_server(config.get('port', 9108), config.get('host', '127.0.0.1'))
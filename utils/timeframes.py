@@ -0,0 +1,36 @@
+# utils/timeframes.py
+
+_UNIT_MS = {
+    'm': 60 * 1000,
+    'h': 60 * 60 * 1000,
+    'd': 24 * 60 * 60 * 1000,
+    'w': 7 * 24 * 60 * 60 * 1000,
+}
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """
+    Convert a ccxt timeframe string such as '5m', '4h' or '1d' to milliseconds.
+    """
+    amount, unit = timeframe[:-1], timeframe[-1]
+    if unit not in _UNIT_MS or not amount.isdigit():
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return int(amount) * _UNIT_MS[unit]
+
+
+def bucket_start(timestamps, timeframe: str, offset_ms: int = 0):
+    """
+    Open time of the `timeframe` candle containing each timestamp (ms).
+    `offset_ms` shifts the bucket grid, e.g. 8h for candles aligned to UTC+8 midnight.
+    Works on ints and numpy arrays alike.
+    """
+    step = timeframe_to_ms(timeframe)
+    return (timestamps - offset_ms) // step * step + offset_ms
+
+
+def candle_offset_ms(timeframe: str, long_offset_hours: int = 0) -> int:
+    """
+    Bucket offset for a timeframe: bars of 6h and longer may be aligned to a
+    non-UTC midnight (OKX's native '1D' is UTC+8); shorter bars are on the UTC grid.
+    """
+    return long_offset_hours * 3600 * 1000 if timeframe_to_ms(timeframe) >= 6 * 3600 * 1000 else 0